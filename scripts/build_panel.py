@@ -2,16 +2,30 @@
 """
 Usage
 -----
-python scripts/build_panel.py --out data/panel.parquet
+python scripts/build_panel.py --out data/panel.parquet --store data/panel
+
+Bars are kept in a per-symbol cache (default data/cache); each run only
+requests the dates not yet covered and rebuilds the panel from the cache.
+Pass --no-cache to pull the full history directly.
+
+With --adjust, prices are back-adjusted incrementally: roll table and
+cumulative offsets live next to the panel (<out>.adj/) and only new bars
+are processed on each run.
+
+Besides the wide Close panel (--out), all OHLCV fields are written to the
+symbol/year partitioned panel store (--store, see lib.panel_store), which
+the backtest scripts read with date-range and column pushdown.
 """
 import argparse
 import pandas as pd
 
-from lib.loaders  import load_prices
-from lib.adjust   import back_adjust
+from lib.loaders  import load_prices, fetch_ohlcv
+from lib.adjust   import back_adjust, back_adjust_incremental, adjust_ohlc
 from lib.filters  import trim_dates, fill_nas
+from lib.cache    import PriceCache, refresh
+from lib.panel_store import PanelStore
 from config.base import BACK_ADJ_METH, START_DATE, END_DATE
-from config.universe import SYMBOLS
+from config.universe import SYMBOLS, YF_TICKERS
 import os
 
 # scripts/build_panel.py
@@ -19,16 +33,43 @@ import os
 if __name__ == "__main__":
     p = argparse.ArgumentParser()
     p.add_argument("--out", default="data/panel.parquet")
+    p.add_argument("--cache", default="data/cache",
+                   help="per-symbol price cache directory")
+    p.add_argument("--no-cache", action="store_true",
+                   help="re-download the full history, bypassing the cache")
+    p.add_argument("--adjust", action="store_true",
+                   help="back-adjust rolls incrementally (BACK_ADJ_METH)")
+    p.add_argument("--store", default="data/panel",
+                   help="symbol/year partitioned OHLCV store ('' to skip)")
     args = p.parse_args()
 
-    raw  = load_prices(START_DATE, END_DATE)
+    if args.no_cache:
+        raw  = load_prices(START_DATE, END_DATE)
+    else:
+        cache = PriceCache(args.cache)
+        refresh(cache, YF_TICKERS, START_DATE, END_DATE,
+                fetch_range=fetch_ohlcv, vendor="yfinance")
+        raw  = cache.panel(YF_TICKERS, START_DATE, END_DATE, field="Close")
 
     # adj  = back_adjust(raw, method=BACK_ADJ_METH)
     # panel = fill_nas(trim_dates(raw))
-    panel = raw.copy()
+    if args.adjust:
+        panel = back_adjust_incremental(raw, args.out, method=BACK_ADJ_METH)
+    else:
+        panel = raw.copy()
 
     os.makedirs(os.path.dirname(args.out), exist_ok=True)
 
     panel.to_parquet(args.out)
     print(f"[✓] Saved {panel.shape[1]} contracts, {len(panel)} rows  →  {args.out}")
 
+    if args.store:
+        if args.no_cache:
+            bars = {sym: raw[[sym]].rename(columns={sym: "Close"}) for sym in raw}
+        else:
+            bars = {sym: cache.load(sym, START_DATE, END_DATE) for sym in raw}
+        if args.adjust:
+            bars = {sym: adjust_ohlc(b, raw[sym], panel[sym], BACK_ADJ_METH)
+                    for sym, b in bars.items() if not b.empty}
+        PanelStore(args.store).write(bars)
+        print(f"[✓] OHLCV store updated  →  {args.store}")
@@ -1,55 +1,105 @@
+#!/usr/bin/env python
+"""
+Alpha / beta of strategy runs against benchmark runs, all read from the
+results store (portfolio_return series) and fitted in one batched OLS.
+
+Usage
+-----
+# two single runs (saved with  test_portfolio.py --run-id …)
+python scripts/check_alpha.py --runs portfolio_trend_weights \
+    --benchmarks portfolio_trend_mask
+
+# every cell of a sweep, with 36-month rolling alpha/beta and plots
+python scripts/check_alpha.py --sweep <sweep_id> --benchmarks portfolio_trend_mask \
+    --window 36 --plot-dir results/alpha --out results/alpha.csv
+"""
+import argparse, os
 import pandas as pd
-import statsmodels.api as sm
-import matplotlib.pyplot as plt
-
-
-#This code compares returns of strategy to benchmark to check for alpha
-def analyze_alpha_beta(strategy_path, benchmark_path):
-    # Load CSVs with date index
-    strategy_df = pd.read_csv(strategy_path, index_col=0, parse_dates=True)
-    benchmark_df = pd.read_csv(benchmark_path, index_col=0, parse_dates=True)
-
-    # Extract daily returns
-    strategy_returns = strategy_df["portfolio_return"]
-    benchmark_returns = benchmark_df["portfolio_return"]
-
-    # Resample to monthly returns
-    monthly_strat = strategy_returns.resample("M").sum()
-    monthly_bench = benchmark_returns.resample("M").sum()
-
-    # Align and drop missing
-    df = pd.concat([monthly_strat, monthly_bench], axis=1).dropna()
-    df.columns = ["strategy", "benchmark"]
-
-    # Run OLS regression
-    X = sm.add_constant(df["benchmark"])
-    y = df["strategy"]
-    model = sm.OLS(y, X).fit()
-
-    # Extract regression stats
-    alpha = model.params["const"]
-    beta = model.params["benchmark"]
-    tstat = model.tvalues["const"]
-    pval  = model.pvalues["const"]
-
-    # Print results
-    print(f"Alpha: {alpha:.4%} per month  (t = {tstat:.2f}, p = {pval:.4f})")
-    print(f"Beta:  {beta:.2f}")
-
-    # Plot regression
-    plt.figure(figsize=(8, 6))
-    plt.scatter(df["benchmark"], df["strategy"], alpha=0.7, label="Monthly Data")
-    plt.plot(df["benchmark"], model.predict(X), color="red", label="Regression Line")
-    plt.xlabel("Benchmark Monthly Return")
-    plt.ylabel("Strategy Monthly Return")
-    plt.title("Monthly Return Regression: Strategy vs Benchmark")
-    plt.legend()
-    plt.grid(True)
-    plt.tight_layout()
-    plt.show()
-
-# === Usage ===
-analyze_alpha_beta("results/portfolio_trend_weights.csv", "results/portfolio_trend_mask.csv")
-
-# Alpha: 0.3514% per month  (t = 2.59, p = 0.0120)
-# Beta:  1.00
+
+from lib.alpha import plot_regression, regress, resample_returns, rolling_regress
+from lib.results_store import ResultsStore
+
+
+def load_returns(store: ResultsStore, run_ids: list[str]) -> pd.DataFrame:
+    """(T, K) portfolio returns, one column per run; runs without them are skipped."""
+    cols = {}
+    for rid in run_ids:
+        try:
+            cols[rid] = store.read_series(rid, ["portfolio_return"], wide=True).iloc[:, 0]
+        except (KeyError, FileNotFoundError):
+            print(f"[+] {rid}: no portfolio_return series, skipped")
+    return pd.DataFrame(cols)
+
+
+def select_runs(store: ResultsStore, runs: list[str] | None,
+                sweep: str | None, strategy: str | None) -> list[str]:
+    if runs:
+        return list(runs)
+    cat = store.runs(strategy)
+    if sweep is not None:
+        if "sweep" not in cat.columns:
+            return []
+        cat = cat[cat["sweep"] == sweep]
+    return sorted(cat["run_id"])
+
+
+def main(runs: list[str] | None, sweep: str | None, strategy: str | None,
+         benchmarks: list[str], freq: str | None, window: int | None,
+         plot_dir: str | None, store_root: str, out: str | None) -> None:
+    store = ResultsStore(store_root)
+    run_ids = select_runs(store, runs, sweep, strategy)
+    strat_rets = load_returns(store, [r for r in run_ids if r not in benchmarks])
+    bench_rets = load_returns(store, benchmarks)
+    if strat_rets.empty or bench_rets.empty:
+        raise SystemExit("no strategy / benchmark returns to compare")
+    if freq:
+        strat_rets = resample_returns(strat_rets, freq)
+        bench_rets = resample_returns(bench_rets, freq)
+    print(f"[+] {strat_rets.shape[1]} strategies vs {bench_rets.shape[1]} benchmarks"
+          f"{'' if not freq else f' ({freq} returns)'}")
+
+    table = regress(strat_rets, bench_rets)
+    print(table.to_string(float_format=lambda v: f"{v:.4g}"))
+
+    if out is not None:
+        os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+        table.to_csv(out)
+        print(f"[✓] Alpha table saved → {out}")
+
+    if window is not None:
+        rolling = rolling_regress(strat_rets, bench_rets, window)
+        rolling = pd.concat(rolling, axis=1, names=["stat", "run_id"])
+        path = os.path.splitext(out or "results/alpha.csv")[0] + "_rolling.parquet"
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        rolling.to_parquet(path)
+        print(f"[✓] Rolling alpha/beta ({window} bars) saved → {path}")
+
+    if plot_dir is not None:
+        bench = bench_rets.iloc[:, 0]
+        for rid in strat_rets.columns:
+            path = plot_regression(strat_rets[rid], bench,
+                                   os.path.join(plot_dir, f"{rid}.png"),
+                                   title=f"{rid} vs {bench.name}")
+        print(f"[✓] {strat_rets.shape[1]} plots saved → {plot_dir}")
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser("Batched alpha/beta vs benchmarks")
+    p.add_argument("--runs",       nargs="*", default=None,
+                   help="strategy run ids (default: all runs matching --sweep / --strategy)")
+    p.add_argument("--sweep",      default=None, help="select the runs of one sweep")
+    p.add_argument("--strategy",   default=None, help="select all runs of one strategy")
+    p.add_argument("--benchmarks", nargs="+", required=True,
+                   help="benchmark run ids, fitted jointly")
+    p.add_argument("--freq",       default="ME",
+                   help='resample returns before fitting ("ME" = monthly, "" = none)')
+    p.add_argument("--window",     default=None, type=int,
+                   help="rolling alpha/beta window (in resampled bars)")
+    p.add_argument("--plot-dir",   default=None,
+                   help="save one regression plot per strategy here")
+    p.add_argument("--store",      default="results/store")
+    p.add_argument("--out",        default=None, help="CSV for the alpha table")
+    args = p.parse_args()
+
+    main(args.runs, args.sweep, args.strategy, args.benchmarks, args.freq,
+         args.window, args.plot_dir, args.store, args.out)
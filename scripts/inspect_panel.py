@@ -1,9 +1,10 @@
 # scripts/inspect_panel.py
-import pandas as pd
+import argparse
+from lib.panel_store import load_panel
 
-def main():
-    # 1) load the parquet
-    df = pd.read_parquet("data/panel.parquet")
+def main(start: str | None, end: str | None, field: str):
+    # 1) load the panel (only the requested dates / field are read)
+    df = load_panel(start, end, field=field)
     
     # 2) basic info
     print("DataFrame shape:", df.shape)
@@ -17,4 +18,11 @@ def main():
     print("Non-null counts per contract:\n", df.count())
 
 if __name__ == "__main__":
-    main()
+    p = argparse.ArgumentParser("Inspect the price panel")
+    p.add_argument("--start", default=None, help="YYYY-MM-DD")
+    p.add_argument("--end",   default=None, help="YYYY-MM-DD")
+    p.add_argument("--field", default="Close",
+                   help="OHLCV field (panel store only)")
+    args = p.parse_args()
+
+    main(args.start, args.end, args.field)
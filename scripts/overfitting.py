@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+"""
+Probability of backtest overfitting (CSCV) and deflated Sharpe for a
+parameter grid of a registered strategy.
+
+Usage
+-----
+python scripts/overfitting.py --strategy portfolio_risk_scaled \
+    --grid '{"target_vol": [0.2, 0.4, 0.6], "lambda_": [0.3, 0.5, 0.7]}' \
+    --blocks 16 --out results/overfitting.csv
+"""
+import argparse, json, os
+import pandas as pd
+
+from lib import STRATEGY_REGISTRY
+from lib.filters import drop_sparse
+from lib.panel_store import load_panel
+from lib.overfitting import deflated_sharpe, overfitting_report
+from lib.sweep import param_grid
+from lib.walkforward import variant_returns
+
+
+def main(start: str, end: str, strategy_name: str, grid: dict, blocks: int,
+         tc: float, workers: int | None, out: str) -> None:
+    price_df = load_panel(start, end)
+    price_df = drop_sparse(price_df, max_nan=0.10)
+
+    cells = param_grid(grid)
+    rets = variant_returns(price_df, strategy_name, cells, tc)
+    report = overfitting_report(rets, n_blocks=blocks, workers=workers)
+
+    table = pd.concat([pd.DataFrame(cells), deflated_sharpe(rets)], axis=1)
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    table.to_csv(out, index=False)
+    print(table.sort_values("dsr", ascending=False).to_string(index=False))
+    for k, v in report.items():
+        print(f"{k:>16}: {v}")
+    print(f"[✓] Deflated Sharpe table saved → {out}")
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser("Backtest overfitting check")
+    p.add_argument("--start",   default="2000-01-01")
+    p.add_argument("--end",     default="2021-01-01")
+    p.add_argument("--strategy", default="portfolio_risk_scaled",
+                   choices=list(STRATEGY_REGISTRY.keys()))
+    p.add_argument("--grid", required=True,
+                   help='JSON object {"param": [values, ...]}')
+    p.add_argument("--blocks",  default=16, type=int, help="CSCV blocks (even)")
+    p.add_argument("--tc",      default=0.0005, type=float)
+    p.add_argument("--workers", default=1, type=int)
+    p.add_argument("--out",     default="results/overfitting.csv")
+    args = p.parse_args()
+
+    main(args.start, args.end, args.strategy, json.loads(args.grid),
+         args.blocks, args.tc, args.workers, args.out)
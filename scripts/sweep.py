@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+"""
+Parameter sweep over a registered strategy, one process per grid cell.
+
+Usage
+-----
+python scripts/sweep.py --strategy portfolio_risk_scaled \
+    --grid '{"target_vol": [0.2, 0.4, 0.6], "lambda_": [0.3, 0.5, 0.7]}' \
+    --checkpoint results/sweep.jsonl
+
+Every cell is appended to the results store as its own run (strategy +
+params + metrics + portfolio returns), tagged with a common `sweep` id –
+e.g. for  scripts/check_alpha.py --sweep <id>.  Rerunning with the same
+--checkpoint resumes the sweep under the id recorded there.
+"""
+import argparse, json, os
+
+from lib import STRATEGY_REGISTRY
+from lib.filters import drop_sparse
+from lib.panel_store import load_panel
+from lib.sweep import run_sweep
+
+
+def main(strategy_name: str, grid: dict, tc: float, workers: int | None,
+         checkpoint: str, out: str | None, store_root: str = "results/store",
+         sweep_id: str | None = None) -> None:
+    price_df = drop_sparse(load_panel(), max_nan=0.10)
+
+    if checkpoint:
+        os.makedirs(os.path.dirname(checkpoint) or ".", exist_ok=True)
+    table = run_sweep(price_df, strategy_name, grid,
+                      transaction_cost=tc, workers=workers,
+                      checkpoint=checkpoint, store=store_root,
+                      sweep_id=sweep_id)
+    sweep_id = table.attrs["sweep_id"]
+
+    print(table.sort_values("sharpe", ascending=False).to_string(index=False))
+    print(f"[✓] Sweep {sweep_id} saved → {store_root}")
+    if out is not None:
+        os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+        table.to_csv(out, index=False)
+        print(f"[✓] Sweep table exported → {out}")
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser("Parallel parameter sweep")
+    p.add_argument("--strategy", default="portfolio_risk_scaled",
+                   choices=list(STRATEGY_REGISTRY.keys()))
+    p.add_argument("--grid", required=True,
+                   help='JSON object {"param": [values, ...]}')
+    p.add_argument("--tc",      default=0.0005, type=float)
+    p.add_argument("--workers", default=None, type=int)
+    p.add_argument("--checkpoint", default="results/sweep.jsonl")
+    p.add_argument("--store",   default="results/store",
+                   help="results store root (see lib.results_store)")
+    p.add_argument("--sweep-id", default=None,
+                   help="sweep id (default: from the checkpoint, else new)")
+    p.add_argument("--out",     default=None,
+                   help="optional CSV export of the sweep table")
+    args = p.parse_args()
+
+    main(args.strategy, json.loads(args.grid), args.tc, args.workers,
+         args.checkpoint, args.out, args.store, args.sweep_id)
@@ -1,31 +1,62 @@
 from lib import STRATEGY_REGISTRY
 from lib.backtester.backtester import backtest_multi_asset
+from lib.filters import drop_sparse
+from lib.panel_store import load_panel
+from lib.precision import as_compact, drift_report
+from lib.results_store import ResultsStore, strategy_params
 import pandas as pd, argparse, os
 
 def main(start: str, end: str, tc: float,
-         strategy_name: str, out: str):
+         strategy_name: str, out: str | None, compact: bool = False,
+         store_root: str = "results/store", run_id: str | None = None):
 
     strategy_cls = STRATEGY_REGISTRY[strategy_name]
     strat        = strategy_cls()
-    price_df     = pd.read_parquet("data/panel.parquet")
-    # Drop columns with >10% NaNs
-    threshold = 0.10  # 10%
-    valid_cols = price_df.columns[price_df.isnull().mean() <= threshold]
-    price_df = price_df[valid_cols]
-
-    # Forward-fill remaining NaNs (e.g., from weekends or illiquid assets)
-    price_df = price_df.ffill()
+    price_df     = load_panel(start, end)
+    # Drop columns with >10% NaNs, forward-fill remaining NaNs
+    # (e.g., from weekends or illiquid assets)
+    price_df     = drop_sparse(price_df, max_nan=0.10)
 
     # no column loop — pass full panel into signal generator
     signals      = strat.generate_signals(price_df)
     results_df, metrics = backtest_multi_asset(price_df, signals, tc)
 
     # save results
-    os.makedirs(os.path.dirname(out), exist_ok=True)
-    results_df.to_csv(out)
-    print("[✓] Equity curve saved")
+    store  = ResultsStore(store_root)
+    run_id = store.append(strategy_name, strategy_params(strat),
+                          series=results_df, metrics=metrics,
+                          run_id=run_id, overwrite=True,
+                          tc=tc, start=start, end=end)
+    print(f"[✓] Equity curve {price_df.index.min()} → {price_df.index.max()} "
+          f"saved → {store.run_dir(run_id)}")
+    if out is not None:
+        os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+        results_df.to_csv(out)
+        print(f"[✓] Exported → {out}")
     print(metrics)
 
+    if compact:
+        # Same run in float32 (strategies that take `precision` use it
+        # internally too), reported as drift against the float64 run above
+        try:
+            strat32 = strategy_cls(precision="float32")
+        except TypeError:
+            strat32 = strategy_cls()
+        prices32 = as_compact(price_df)
+        signals32 = strat32.generate_signals(prices32)
+        results32, metrics32 = backtest_multi_asset(prices32, signals32, tc,
+                                                    dtype=prices32.dtypes.iloc[0])
+        report = drift_report(
+            {"prices": price_df, "signals": signals,
+             "portfolio_return": results_df["portfolio_return"],
+             "equity_curve": results_df["equity_curve"]},
+            {"prices": prices32, "signals": signals32,
+             "portfolio_return": results32["portfolio_return"],
+             "equity_curve": results32["equity_curve"]})
+        print("[+] float32 vs float64 drift")
+        print(report.to_string(float_format=lambda v: f"{v:.3g}"))
+        print(pd.DataFrame({"float64": metrics, "float32": metrics32}))
+
 if __name__ == "__main__":
     p = argparse.ArgumentParser("Run portfolio-level strategy")
     p.add_argument("--start",   default="2000-01-01")
@@ -33,7 +64,16 @@ if __name__ == "__main__":
     p.add_argument("--tc",      default=0.0005, type=float)
     p.add_argument("--strategy", default="portfolio_risk_scaled",
                    choices=list(STRATEGY_REGISTRY.keys()))
-    p.add_argument("--out", default="results/portfolio.csv")
+    p.add_argument("--store", default="results/store",
+                   help="results store root (see lib.results_store)")
+    p.add_argument("--run-id", default=None,
+                   help="run id in the store, e.g. portfolio_trend_mask "
+                        "(default: generated)")
+    p.add_argument("--out", default=None,
+                   help="optional CSV export of the equity curve")
+    p.add_argument("--compact", action="store_true",
+                   help="also run in float32 and report the drift")
     args = p.parse_args()
 
-    main(args.start, args.end, args.tc, args.strategy, args.out)
+    main(args.start, args.end, args.tc, args.strategy, args.out, args.compact,
+         args.store, args.run_id)
@@ -100,55 +100,65 @@ python scripts/run_backtest.py --strategy risk_scaled --tc 0.0005
 """
 import argparse, os, pandas as pd
 from lib import STRATEGY_REGISTRY           # <-- registry from __init__.py
-from lib.backtester.backtester import backtest_strategy
+from lib.backtester.backtester import backtest_per_asset
+from lib.backtester.runner import detail_frame, run_per_symbol
+from lib.panel_store import PanelStore, load_panel
+from lib.results_store import ResultsStore, strategy_params
 # replace with your own loader; must return a dataframe of close prices
 
-def backtest_single_symbol(series: pd.Series, strategy_cls, tc: float):
-    """Generate signals with the chosen strategy and run the backtest."""
+def backtest_universe(price_df: pd.DataFrame, strategy_cls, tc: float):
+    """
+    Generate signals for the whole panel in one call and backtest every
+    column independently in one kernel pass.
+    """
     strat   = strategy_cls()                       # instantiate
-    signals = strat.generate_signals(series)       # pd.Series (positions)
-    results_df, metrics = backtest_strategy(
-        prices=series,
-        signals=signals,
-        transaction_cost=tc
-    )
-    return metrics, results_df                     # dict, pd.DataFrame
+    signals = strat.generate_signals(price_df)     # pd.DataFrame (positions)
+    res, metrics_df = backtest_per_asset(price_df, signals, tc)
+    return metrics_df, detail_frame(price_df.index, price_df.columns, res)
 
 def main(start: str, end: str, tc: float,
-         strategy_name: str, out_path: str) -> None:
+         strategy_name: str, out_path: str | None,
+         workers: int = 1, chunk: int = 16,
+         store_root: str = "results/store", run_id: str | None = None) -> None:
 
     if strategy_name not in STRATEGY_REGISTRY:
         raise KeyError(f"Unknown strategy '{strategy_name}'. "
                        f"Choose from {list(STRATEGY_REGISTRY.keys())}")
 
     strategy_cls = STRATEGY_REGISTRY[strategy_name]
-    price_df = pd.read_parquet("data/panel.parquet")
-    print(f"[+] Loaded {price_df.shape[1]} symbols "
-          f"from {price_df.index.min()} to {price_df.index.max()}")
-
-    metrics_list, pnl_frames = zip(*[
-        backtest_single_symbol(price_df[col], strategy_cls, tc)
-        for col in price_df.columns
-    ])
+    store        = ResultsStore(store_root)
+    run_id       = run_id or store.new_run_id(strategy_name)
+    if workers > 1:
+        # parallel mode: workers read their own symbols and stream the
+        # detail into the run's series partitions; nothing wide is held here
+        source = "data/panel" if PanelStore("data/panel").exists() else "data/panel.parquet"
+        store.remove(run_id)
+        metrics_df = run_per_symbol(source, strategy_name, tc,
+                                    workers=workers, chunk_size=chunk,
+                                    detail_dir=store.series_dir(run_id),
+                                    start=start, end=end)
+        trade_detail = None
+    else:
+        price_df = load_panel(start, end)
+        print(f"[+] Loaded {price_df.shape[1]} symbols "
+              f"from {price_df.index.min()} to {price_df.index.max()}")
+        metrics_df, trade_detail = backtest_universe(price_df, strategy_cls, tc)
 
     # -- metrics summary -------------------------------------------------
-    metrics_df = pd.DataFrame(metrics_list, index=price_df.columns)
     print("\n=== Backtest metrics ===")
     for sym, row in metrics_df.iterrows():
         print(f"[{sym}]  " +
               " | ".join(f"{k}: {v:.4g}" for k, v in row.items()))
 
     # -- persist results -------------------------------------------------
-    os.makedirs(os.path.dirname(out_path), exist_ok=True)
-    metrics_df.to_csv(out_path)
-    print(f"[✓] Metrics saved → {out_path}")
+    store.append(strategy_name, strategy_params(strategy_cls()), series=trade_detail, metrics=metrics_df,
+                 run_id=run_id, overwrite=True, tc=tc, start=start, end=end)
+    print(f"[✓] Metrics and trade‑by‑trade P&L saved → {store.run_dir(run_id)}")
 
-    trade_detail = pd.concat(pnl_frames, axis=1,
-                             keys=price_df.columns,
-                             names=["symbol","series"])
-    detail_path  = os.path.splitext(out_path)[0] + "_detail.csv"
-    trade_detail.to_csv(detail_path)
-    print(f"[✓] Trade‑by‑trade P&L saved → {detail_path}")
+    if out_path is not None:
+        os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+        metrics_df.to_csv(out_path)
+        print(f"[✓] Metrics exported → {out_path}")
 
 if __name__ == "__main__":
     p = argparse.ArgumentParser("Run strategy backtest")
@@ -158,8 +168,17 @@ if __name__ == "__main__":
                                 help="round‑trip transaction cost")
     p.add_argument("--strategy", default="buy_and_hold",
                    choices=list(STRATEGY_REGISTRY.keys()))
-    p.add_argument("--out",     default="results/metrics.csv",
-                   help="CSV for summary metrics")
+    p.add_argument("--store",   default="results/store",
+                   help="results store root (see lib.results_store)")
+    p.add_argument("--run-id",  default=None,
+                   help="run id in the store (default: generated)")
+    p.add_argument("--out",     default=None,
+                   help="optional CSV export of the summary metrics")
+    p.add_argument("--workers", default=1, type=int,
+                   help="> 1: process pool, detail written as partitions")
+    p.add_argument("--chunk",   default=16, type=int,
+                   help="symbols per worker task")
     args = p.parse_args()
 
-    main(args.start, args.end, args.tc, args.strategy, args.out)
+    main(args.start, args.end, args.tc, args.strategy, args.out,
+         args.workers, args.chunk, args.store, args.run_id)
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+"""
+Walk-forward out-of-sample evaluation of a registered strategy.
+
+Usage
+-----
+python scripts/walk_forward.py --strategy portfolio_risk_scaled \
+    --grid '{"target_vol": [0.2, 0.4], "lambda_": [0.3, 0.7]}' \
+    --train 756 --test 126 --out results/walk_forward.csv
+"""
+import argparse, json, os
+
+from lib import STRATEGY_REGISTRY
+from lib.filters import drop_sparse
+from lib.panel_store import load_panel
+from lib.walkforward import run_walk_forward
+
+
+def main(start: str, end: str, strategy_name: str, grid: dict,
+         train: int, test: int, anchored: bool, metric: str,
+         tc: float, out: str) -> None:
+    price_df = load_panel(start, end)
+    price_df = drop_sparse(price_df, max_nan=0.10)
+
+    results_df, selections, metrics = run_walk_forward(
+        price_df, strategy_name, grid,
+        train=train, test=test, anchored=anchored,
+        metric=metric, transaction_cost=tc)
+
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    results_df.to_csv(out)
+    sel_path = os.path.splitext(out)[0] + "_selections.csv"
+    selections.to_csv(sel_path, index=False)
+    print(selections.to_string(index=False))
+    print(metrics)
+    print(f"[✓] OOS equity curve saved → {out}")
+    print(f"[✓] Window selections saved → {sel_path}")
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser("Walk-forward evaluation")
+    p.add_argument("--start",   default="2000-01-01")
+    p.add_argument("--end",     default="2021-01-01")
+    p.add_argument("--strategy", default="portfolio_risk_scaled",
+                   choices=list(STRATEGY_REGISTRY.keys()))
+    p.add_argument("--grid", required=True,
+                   help='JSON object {"param": [values, ...]}')
+    p.add_argument("--train",   default=756, type=int, help="in-sample bars")
+    p.add_argument("--test",    default=126, type=int, help="out-of-sample bars")
+    p.add_argument("--anchored", action="store_true",
+                   help="expanding in-sample window")
+    p.add_argument("--metric",  default="sharpe")
+    p.add_argument("--tc",      default=0.0005, type=float)
+    p.add_argument("--out",     default="results/walk_forward.csv")
+    args = p.parse_args()
+
+    main(args.start, args.end, args.strategy, json.loads(args.grid),
+         args.train, args.test, args.anchored, args.metric, args.tc, args.out)
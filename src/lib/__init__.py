@@ -1,11 +1,75 @@
-from lib.strat.buy_n_hold   import BuyAndHoldStrategy
-from lib.strat.risk_scaled_strategy   import RiskScaledBuyAndHoldStrategy
-from lib.strat.variable_risk_scaled_strategy import VariableRiskScaledBuyAndHoldStrategy
-from lib.strat.portfolio_risk_scaled_strategy import PortfolioRiskScaledStrategy
-
-STRATEGY_REGISTRY = {
-    "buy_and_hold":  BuyAndHoldStrategy,
-    "risk_scaled":   RiskScaledBuyAndHoldStrategy,
-    "variable_risk_scaled": VariableRiskScaledBuyAndHoldStrategy,
-    "portfolio_risk_scaled": PortfolioRiskScaledStrategy
-}
\ No newline at end of file
+# lib/__init__.py  ──────────────────────────────────────────
+"""
+Strategy registry, resolved lazily.
+
+``STRATEGY_REGISTRY`` maps names to ``"module:Class"`` targets; a strategy
+module is only imported when its name is looked up, so ``import lib`` (and
+``list(STRATEGY_REGISTRY)`` for argparse choices) costs nothing.
+
+Third-party strategies can be plugged in through the
+``futures_trend.strategies`` entry-point group::
+
+    [project.entry-points."futures_trend.strategies"]
+    my_trend = "my_pkg.strategies:MyTrendStrategy"
+
+or at runtime with ``STRATEGY_REGISTRY.register(name, cls_or_target)``.
+"""
+from __future__ import annotations
+from collections.abc import Mapping
+from importlib import import_module
+
+ENTRY_POINT_GROUP = "futures_trend.strategies"
+
+_BUILTIN = {
+    "buy_and_hold":          "lib.strat.buy_n_hold:BuyAndHoldStrategy",
+    "risk_scaled":           "lib.strat.risk_scaled_strategy:RiskScaledBuyAndHoldStrategy",
+    "variable_risk_scaled":  "lib.strat.variable_risk_scaled_strategy:VariableRiskScaledBuyAndHoldStrategy",
+    "portfolio_risk_scaled": "lib.strat.portfolio_risk_scaled_strategy:PortfolioRiskScaledStrategy",
+}
+
+
+class StrategyRegistry(Mapping):
+    """Name → strategy class, importing each class on first lookup."""
+
+    def __init__(self, targets: dict[str, object], group: str | None = None):
+        self._targets = dict(targets)     # name → "module:Class" or class
+        self._group = group
+        self._plugins_loaded = group is None
+
+    def _load_plugins(self) -> None:
+        if self._plugins_loaded:
+            return
+        self._plugins_loaded = True
+        from importlib.metadata import entry_points
+        for ep in entry_points(group=self._group):
+            self._targets.setdefault(ep.name, ep)     # built-ins win
+
+    def register(self, name: str, target) -> None:
+        """Add / replace a strategy: a class or a ``"module:Class"`` string."""
+        self._targets[name] = target
+
+    def __getitem__(self, name: str):
+        self._load_plugins()
+        target = self._targets[name]
+        if isinstance(target, str):
+            module, _, attr = target.partition(":")
+            target = getattr(import_module(module), attr)
+        elif hasattr(target, "load"):                 # entry point
+            target = target.load()
+        self._targets[name] = target
+        return target
+
+    def __iter__(self):
+        self._load_plugins()
+        return iter(self._targets)
+
+    def __len__(self) -> int:
+        self._load_plugins()
+        return len(self._targets)
+
+    def __contains__(self, name) -> bool:
+        self._load_plugins()
+        return name in self._targets
+
+
+STRATEGY_REGISTRY = StrategyRegistry(_BUILTIN, group=ENTRY_POINT_GROUP)
@@ -4,95 +4,130 @@ Back-adjust continuous futures to remove roll gaps.
 
 Supported methods
 -----------------
-diff    : subtract price jumps  (point-preserving)
-ratio   : divide by jump ratio  (return-preserving)
+diff    : add each roll jump to all prior prices  (point-preserving)
+ratio   : scale prior prices by the jump ratio    (return-preserving)
 panama  : classical Panama additive adjustment
           (same algebra as diff, but labelled explicitly)
+
+The engine works on the whole (T, N) panel at once: rolls are detected for all
+columns together, and the gaps are applied as a reverse cumulative offset
+(sum for diff, product for ratio) in one NumPy pass.  Each column is handled
+on its own non-NaN observations, so holes and staggered starts are skipped
+exactly like a per-series ``dropna``.
 """
 from __future__ import annotations
+import json
+import os
+
+import numpy as np
 import pandas as pd
 
+ATR_WINDOW = 10
+_METHODS = ("diff", "ratio", "panama")
+
+
+# ---------------------------------------------------------------------
+# 0. Per-column compaction of the non-NaN observations
+# ---------------------------------------------------------------------
+def _compact(values: np.ndarray):
+    """
+    Move each column's valid observations to the top (order preserved).
+
+    Returns (compact, order): ``compact[i, j]`` is the i-th valid value of
+    column j (NaN past the last one) and ``order[i, j]`` its original row.
+    """
+    order = np.argsort(np.isnan(values), axis=0, kind="stable")
+    return np.take_along_axis(values, order, axis=0), order
+
+
+def _expand(compact: np.ndarray, order: np.ndarray) -> np.ndarray:
+    """Inverse of `_compact`: scatter rows back to their original positions."""
+    out = np.empty_like(compact)
+    np.put_along_axis(out, order, compact, axis=0)
+    return out
+
+
 # ---------------------------------------------------------------------
 # 1. Roll-date detector
 # ---------------------------------------------------------------------
-def _detect_roll(series: pd.Series,
-                 thresh: float = 5.0) -> list[pd.Timestamp]:
+def _detect_rolls_compact(compact: np.ndarray, thresh: float) -> np.ndarray:
+    move = np.full_like(compact, np.nan)
+    move[1:] = np.abs(np.diff(compact, axis=0))
+    csum = np.cumsum(np.nan_to_num(move), axis=0)
+    atr = np.full_like(compact, np.nan)
+    atr[ATR_WINDOW:] = (csum[ATR_WINDOW:] - csum[:-ATR_WINDOW]) / ATR_WINDOW
+    atr[np.isnan(move)] = np.nan
+    with np.errstate(invalid="ignore"):
+        return move > thresh * atr
+
+
+def detect_rolls(df: pd.DataFrame, thresh: float = 5.0) -> pd.DataFrame:
     """
+    Boolean (T, N) roll mask for every column of `df` at once.
+
     Heuristic: a roll occurs when the *absolute* daily move exceeds
     (thresh × 10-day ATR).  Works ~90 % of the time for CHRIS generics.
     Because of time and resource limititations we don't use fixed calender dates or OI to find rolls
     and use heurestics instead.
     More robust techniques will be used in future work.
     """
-    atr10 = series.diff().abs().rolling(10).mean()
-    mask  = (series.diff().abs() > thresh * atr10).fillna(False)
-    return list(series.index[mask])
+    compact, order = _compact(df.to_numpy(dtype=float))
+    if len(compact) <= ATR_WINDOW:
+        return pd.DataFrame(False, index=df.index, columns=df.columns)
+    mask = _expand(_detect_rolls_compact(compact, thresh), order)
+    return pd.DataFrame(mask, index=df.index, columns=df.columns)
+
+
+def _detect_roll(series: pd.Series,
+                 thresh: float = 5.0) -> list[pd.Timestamp]:
+    """Roll dates of a single series (see `detect_rolls`)."""
+    mask = detect_rolls(series.to_frame(), thresh).iloc[:, 0]
+    return list(series.index[mask.to_numpy()])
 
 
 # ---------------------------------------------------------------------
-# 2. Adjustment kernels
+# 2. Adjustment engine
 # ---------------------------------------------------------------------
-# def _diff_adjust(s: pd.Series) -> pd.Series:
-#     adj = s.copy()
-#     for rd in _detect_roll(s):
-#         gap = adj.loc[rd] - adj.loc[rd - pd.Timedelta(days=1)]
-#         adj.loc[: rd - pd.Timedelta(days=1)] -= gap
-#     return adj
-
-def _diff_adjust(series: pd.Series) -> pd.Series:
+def roll_gaps(df: pd.DataFrame, method: str = "diff",
+              thresh: float = 5.0) -> pd.DataFrame:
     """
-    Back-adjust by subtracting each roll-gap from all prior prices.
-    Operates only on the non-NaN portion of `series`.
+    Jump at each roll vs. the previous valid bar (price difference for
+    diff/panama, price ratio for ratio); 0 / 1 on non-roll bars, NaN where
+    `df` is NaN.
     """
-    # Work on the contiguous part
-    s = series.dropna().copy()
-    if s.empty:
-        # nothing to do
-        return series * float("nan")
-
-    # Detect roll points
-    rolls = _detect_roll(s)
-
-    # Start from the raw series
-    adj = s.copy()
-    for rd in rolls:
-        # find the bar immediately before rd
-        idx = s.index.get_loc(rd)
-        prev = s.index[idx - 1]
-        gap  = adj.loc[rd] - adj.loc[prev]
-        # subtract that gap from *all* prices up to and including prev
-        adj.loc[:prev] = adj.loc[:prev] - gap
-
-    # re-index back to the original full index (NaNs outside s)
-    print(len(rolls))
-    return adj.reindex(series.index)
-
-
-def _ratio_adjust(s: pd.Series) -> pd.Series:
-    adj = s.copy()
-    for rd in _detect_roll(s):
-        ratio = adj.loc[rd] / adj.loc[rd - pd.Timedelta(days=1)]
-        adj.loc[: rd - pd.Timedelta(days=1)] /= ratio
-    return adj
+    multiplicative = _is_ratio(method)
+    compact, order = _compact(df.to_numpy(dtype=float))
+    gaps = np.full_like(compact, 1.0 if multiplicative else 0.0)
+    if len(compact) > ATR_WINDOW:
+        rolls = _detect_rolls_compact(compact, thresh)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            jump = (compact[1:] / compact[:-1] if multiplicative
+                    else compact[1:] - compact[:-1])
+        gaps[1:] = np.where(rolls[1:], jump, gaps[1:])
+    gaps[np.isnan(compact)] = np.nan
+    return pd.DataFrame(_expand(gaps, order), index=df.index, columns=df.columns)
 
 
-# Panama additive adjustment is numerically identical to _diff_adjust;
-# we expose a separate name for clarity.
-def _panama_adjust(s: pd.Series) -> pd.Series:
-    return _diff_adjust(s)
+def _reverse_offsets(gaps: np.ndarray, multiplicative: bool) -> np.ndarray:
+    """Combined effect of all *later* rolls on each bar (compact layout)."""
+    identity = 1.0 if multiplicative else 0.0
+    g = np.nan_to_num(gaps, nan=identity)
+    acc = np.cumprod if multiplicative else np.cumsum
+    offsets = np.full_like(g, identity)
+    offsets[:-1] = acc(g[::-1], axis=0)[::-1][1:]
+    return offsets
 
 
-# ---------------------------------------------------------------------
-# 3. Public gateway
-# ---------------------------------------------------------------------
-_METHOD_MAP = {
-    "diff":   _diff_adjust,
-    "ratio":  _ratio_adjust,
-    "panama": _panama_adjust,
-}
+def _is_ratio(method: str) -> bool:
+    method = method.lower()
+    if method not in _METHODS:
+        raise ValueError(f"Unknown back-adjust method '{method}'")
+    return method == "ratio"
+
 
 def back_adjust(df: pd.DataFrame,
-                method: str = "diff") -> pd.DataFrame:
+                method: str = "diff",
+                thresh: float = 5.0) -> pd.DataFrame:
     """
     Parameters
     ----------
@@ -101,10 +136,213 @@ def back_adjust(df: pd.DataFrame,
 
     Returns
     -------
-    pd.DataFrame  back-adjusted prices
+    pd.DataFrame  back-adjusted prices (latest contract unchanged,
+                  NaNs kept where the input is NaN)
+
+    Each roll's jump (`roll_gaps`) is added to (ratio: multiplied into) all
+    earlier prices, so the adjusted series has no move on the roll bar.
+    """
+    multiplicative = _is_ratio(method)
+    gaps = roll_gaps(df, method, thresh)
+    compact_gaps, order = _compact(gaps.to_numpy())
+    offsets = _expand(_reverse_offsets(compact_gaps, multiplicative), order)
+    raw = df.to_numpy(dtype=float)
+    adj = raw * offsets if multiplicative else raw + offsets
+    return pd.DataFrame(adj, index=df.index, columns=df.columns)
+
+
+# ---------------------------------------------------------------------
+# 3. Single-series kernels kept for callers that adjust one contract at a time
+# ---------------------------------------------------------------------
+def _diff_adjust(series: pd.Series) -> pd.Series:
+    return back_adjust(series.to_frame(), "diff").iloc[:, 0]
+
+
+def _ratio_adjust(series: pd.Series) -> pd.Series:
+    return back_adjust(series.to_frame(), "ratio").iloc[:, 0]
+
+
+# Panama additive adjustment is numerically identical to _diff_adjust;
+# we expose a separate name for clarity.
+def _panama_adjust(series: pd.Series) -> pd.Series:
+    return _diff_adjust(series)
+
+
+# ---------------------------------------------------------------------
+# 4. Incremental adjustment with persisted offsets
+# ---------------------------------------------------------------------
+class IncrementalAdjuster:
+    """
+    Back-adjustment that only processes new bars.
+
+    Stores the *forward-adjusted* panel  F = raw − C_t  (ratio: raw / C_t),
+    where C_t is the cumulative roll gap up to bar t, plus one scalar
+    C_total per symbol.  Back-adjusted prices are  F + C_total  (ratio:
+    F × C_total), so history never has to be rewritten: a newly detected
+    roll only moves that symbol's C_total.
+
+    Also kept per symbol: the last ATR_WINDOW + 1 raw prices (enough to
+    continue roll detection) and the date of the last processed bar.
+
+    Saved next to the panel as  <panel>.adj/{forward.parquet, rolls.parquet,
+    state.json}  (see `state_dir`).
+    """
+
+    def __init__(self, method: str = "diff", thresh: float = 5.0):
+        self.multiplicative = _is_ratio(method)
+        self.method = method.lower()
+        self.thresh = thresh
+        self.forward = pd.DataFrame(dtype=float)
+        self.rolls = pd.DataFrame({"symbol": pd.Series(dtype=str),
+                                   "date": pd.Series(dtype="datetime64[ns]"),
+                                   "gap": pd.Series(dtype=float)})
+        self.offsets: dict[str, float] = {}
+        self.tails: dict[str, list[float]] = {}
+        self.last_dates: dict[str, pd.Timestamp] = {}
+
+    # --- update ----------------------------------------------------------
+    def update(self, raw: pd.DataFrame) -> pd.DataFrame:
+        """
+        Process the bars of `raw` newer than each symbol's last processed
+        date (older rows are ignored).  Returns the roll rows added.
+        """
+        identity = 1.0 if self.multiplicative else 0.0
+        cols = list(raw.columns)
+        values = raw.to_numpy(dtype=float).copy()
+        for j, col in enumerate(cols):
+            if col in self.last_dates:
+                values[raw.index <= self.last_dates[col], j] = np.nan
+        keep = ~np.isnan(values).all(axis=1)
+        if not keep.any():
+            return self.rolls.iloc[:0]
+        index, values = raw.index[keep], values[keep]
+
+        # prepend each symbol's stored tail so the ATR window carries over
+        width = ATR_WINDOW + 1
+        tails = np.full((width, len(cols)), np.nan)
+        for j, col in enumerate(cols):
+            tail = self.tails.get(col, [])
+            if tail:
+                tails[width - len(tail):, j] = tail
+        stacked = np.vstack([tails, values])
+        compact, order = _compact(stacked)
+
+        gaps = np.full_like(compact, identity)
+        if len(compact) > ATR_WINDOW:
+            rolls = _detect_rolls_compact(compact, self.thresh)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                jump = (compact[1:] / compact[:-1] if self.multiplicative
+                        else compact[1:] - compact[:-1])
+            gaps[1:] = np.where(rolls[1:], jump, gaps[1:])
+        gaps[np.isnan(compact)] = identity
+        gaps = _expand(gaps, order)[width:]          # new rows only
+        gaps[np.isnan(values)] = identity
+
+        start = np.array([self.offsets.get(c, identity) for c in cols])
+        if self.multiplicative:
+            cum = start * np.cumprod(gaps, axis=0)
+            fwd = values / cum
+        else:
+            cum = start + np.cumsum(gaps, axis=0)
+            fwd = values - cum
+
+        new_fwd = pd.DataFrame(fwd, index=index, columns=cols)
+        self.forward = new_fwd.combine_first(self.forward) if not self.forward.empty else new_fwd
+
+        ri, rj = np.nonzero(gaps != identity)
+        added = pd.DataFrame({"symbol": [cols[j] for j in rj],
+                              "date": index[ri],
+                              "gap": gaps[ri, rj]})
+        if not added.empty:
+            self.rolls = (pd.concat([self.rolls, added], ignore_index=True)
+                          .sort_values(["symbol", "date"], ignore_index=True))
+
+        counts = (~np.isnan(stacked)).sum(axis=0)
+        for j, col in enumerate(cols):
+            self.offsets[col] = float(cum[-1, j])
+            self.tails[col] = compact[max(counts[j] - width, 0):counts[j], j].tolist()
+            col_dates = index[~np.isnan(values[:, j])]
+            if len(col_dates):
+                self.last_dates[col] = col_dates[-1]
+        return added
+
+    def adjusted(self) -> pd.DataFrame:
+        """Back-adjusted panel: forward-adjusted history shifted by C_total."""
+        total = pd.Series(self.offsets).reindex(self.forward.columns)
+        if self.multiplicative:
+            return self.forward * total
+        return self.forward + total
+
+    # --- persistence -----------------------------------------------------
+    def save(self, path: str) -> None:
+        os.makedirs(path, exist_ok=True)
+        self.forward.to_parquet(os.path.join(path, "forward.parquet"))
+        self.rolls.to_parquet(os.path.join(path, "rolls.parquet"))
+        state = {
+            "method": self.method,
+            "thresh": self.thresh,
+            "offsets": self.offsets,
+            "tails": self.tails,
+            "last_dates": {c: d.isoformat() for c, d in self.last_dates.items()},
+        }
+        with open(os.path.join(path, "state.json"), "w") as fh:
+            json.dump(state, fh, indent=1)
+
+    @classmethod
+    def load(cls, path: str) -> "IncrementalAdjuster":
+        with open(os.path.join(path, "state.json")) as fh:
+            state = json.load(fh)
+        adj = cls(state["method"], state["thresh"])
+        adj.forward = pd.read_parquet(os.path.join(path, "forward.parquet"))
+        adj.rolls = pd.read_parquet(os.path.join(path, "rolls.parquet"))
+        adj.offsets = {c: float(v) for c, v in state["offsets"].items()}
+        adj.tails = state["tails"]
+        adj.last_dates = {c: pd.Timestamp(d) for c, d in state["last_dates"].items()}
+        return adj
+
+
+def state_dir(panel_path: str) -> str:
+    """Directory holding the incremental adjustment state for a panel file."""
+    return os.path.splitext(panel_path)[0] + ".adj"
+
+
+def back_adjust_incremental(raw: pd.DataFrame,
+                            panel_path: str,
+                            method: str = "diff",
+                            thresh: float = 5.0) -> pd.DataFrame:
+    """
+    Update the persisted adjustment state next to `panel_path` with the new
+    bars of `raw` and return the back-adjusted panel.  A missing state (or a
+    different method) starts from scratch.
+    """
+    path = state_dir(panel_path)
+    adj = None
+    if os.path.exists(os.path.join(path, "state.json")):
+        adj = IncrementalAdjuster.load(path)
+        if adj.method != method.lower() or adj.thresh != thresh:
+            adj = None
+    adj = adj or IncrementalAdjuster(method, thresh)
+    added = adj.update(raw)
+    if len(added):
+        print(f"[+] {len(added)} new roll(s): "
+              + ", ".join(f"{s} {d.date()}" for s, d in zip(added.symbol, added.date)))
+    adj.save(path)
+    return adj.adjusted().reindex(columns=raw.columns)
+
+
+def adjust_ohlc(bars: pd.DataFrame, raw_close: pd.Series, adj_close: pd.Series,
+                method: str = "diff") -> pd.DataFrame:
+    """
+    Carry a back-adjusted close onto the Open/High/Low/Close of the same bars
+    (additive offset for "diff"/"panama", factor for "ratio").  Volume and
+    other columns are left untouched.
     """
-    try:
-        fn = _METHOD_MAP[method.lower()]
-    except KeyError as e:
-        raise ValueError(f"Unknown back-adjust method '{method}'") from e
-    return df.apply(fn, axis=0)
+    raw_close = raw_close.reindex(bars.index)
+    adj_close = adj_close.reindex(bars.index)
+    out = bars.copy()
+    cols = [c for c in ("Open", "High", "Low", "Close") if c in out.columns]
+    if _is_ratio(method):
+        out[cols] = out[cols].mul(adj_close / raw_close, axis=0)
+    else:
+        out[cols] = out[cols].add(adj_close - raw_close, axis=0)
+    return out
@@ -0,0 +1,196 @@
+# lib/alpha.py  ─────────────────────────────────────────────
+"""
+Batched alpha / beta analysis of many strategies against many benchmarks.
+
+`regress` fits every strategy column on all benchmark columns at once
+
+    y_k = α_k + Σ_m β_km · x_m + ε_k
+
+with one batched solve of the normal equations (X' M_k X) θ_k = X' M_k y_k,
+where M_k masks the bars on which strategy k and all benchmarks are
+observed.  No per-strategy Python loop, no statsmodels.
+
+`rolling_regress` gives the same fit over a sliding window from cumulative
+sums of X'X and X'y, so every window costs O(M²) regardless of its length.
+
+p-values use Student t (scipy, imported lazily) and fall back to the normal
+approximation when scipy is not installed.  Plots are only drawn by
+`plot_regression`, headless, straight to a file.
+"""
+from __future__ import annotations
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+
+# ---------------------------------------------------------------------
+# 1. Helpers
+# ---------------------------------------------------------------------
+def _as_frame(x, name: str) -> pd.DataFrame:
+    if isinstance(x, pd.Series):
+        return x.to_frame(x.name if x.name is not None else name)
+    return x
+
+
+def resample_returns(returns, freq: str = "ME") -> pd.DataFrame | pd.Series:
+    """Sum simple returns per period (e.g. "ME" = month end); empty periods stay NaN."""
+    return returns.resample(freq).sum(min_count=1)
+
+
+def _design(strategies, benchmarks):
+    """Aligned Y (T, K), X = [1, benchmarks] (T, P) and observation mask (T, K)."""
+    strategies = _as_frame(strategies, "strategy")
+    benchmarks = _as_frame(benchmarks, "benchmark")
+    index = strategies.index.intersection(benchmarks.index)
+    Y = strategies.loc[index].to_numpy(dtype=float)
+    B = benchmarks.loc[index].to_numpy(dtype=float)
+    X = np.column_stack([np.ones(len(index)), B])
+    mask = ~np.isnan(Y) & ~np.isnan(B).any(axis=1)[:, None]
+    return (index, strategies.columns, benchmarks.columns,
+            np.where(mask, Y, 0.0), np.where(np.isnan(X), 0.0, X), mask.astype(float))
+
+
+def _t_pvalue(t: np.ndarray, dof: np.ndarray) -> np.ndarray:
+    """Two-sided p-value of a t statistic."""
+    try:
+        from scipy import stats
+    except ImportError:                                   # normal approximation
+        erfc = np.vectorize(math.erfc, otypes=[float])
+        return np.where(np.isnan(t), np.nan, erfc(np.abs(np.nan_to_num(t)) / math.sqrt(2)))
+    return 2 * stats.t.sf(np.abs(t), dof)
+
+
+def _solve(G: np.ndarray, b: np.ndarray, ok: np.ndarray) -> np.ndarray:
+    """
+    Batched θ = G⁻¹ b for the systems where `ok` (NaN elsewhere); falls
+    back to the least-norm solution if some of them are singular.
+    """
+    out = np.full(b.shape, np.nan)
+    G, rhs = G[ok], b[ok]
+    try:
+        out[ok] = np.linalg.solve(G, rhs[..., None])[..., 0]
+    except np.linalg.LinAlgError:
+        out[ok] = np.einsum("...ij,...j->...i", np.linalg.pinv(G), rhs)
+    return out
+
+
+# ---------------------------------------------------------------------
+# 2. Full-sample regression
+# ---------------------------------------------------------------------
+def regress(strategies, benchmarks) -> pd.DataFrame:
+    """
+    Parameters
+    ----------
+    strategies : (T, K) returns (DataFrame or Series), one column per strategy
+    benchmarks : (T, M) benchmark returns, fitted jointly
+
+    Returns
+    -------
+    pd.DataFrame  one row per strategy:
+        alpha, alpha_t, alpha_p,
+        beta_<bench>, beta_<bench>_t, beta_<bench>_p  for every benchmark,
+        r2, n_obs
+    """
+    _, names, bench_names, Y, X, m = _design(strategies, benchmarks)
+    P = X.shape[1]
+    XX = (X[:, :, None] * X[:, None, :]).reshape(len(X), P * P)
+    G = (m.T @ XX).reshape(-1, P, P)                          # (K, P, P)
+    b = Y.T @ X                                               # (K, P)  (Y already masked)
+    n = m.sum(axis=0)
+    dof = n - P
+    theta = _solve(G, b, dof > 0)                             # (K, P)
+    resid = (Y - X @ theta.T) * m
+    ssr = np.sum(resid ** 2, axis=0)
+    ybar = Y.sum(axis=0) / np.where(n > 0, n, np.nan)
+    sst = np.sum(((Y - ybar) * m) ** 2, axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sigma2 = ssr / dof
+        G_inv_diag = np.diagonal(np.linalg.pinv(G), axis1=-2, axis2=-1)   # (K, P)
+        se = np.sqrt(G_inv_diag * sigma2[:, None])
+        t = theta / se
+        r2 = 1 - ssr / sst
+    p = _t_pvalue(t, dof[:, None])
+
+    cols = {"alpha": theta[:, 0], "alpha_t": t[:, 0], "alpha_p": p[:, 0]}
+    for j, bench in enumerate(bench_names, start=1):
+        cols[f"beta_{bench}"] = theta[:, j]
+        cols[f"beta_{bench}_t"] = t[:, j]
+        cols[f"beta_{bench}_p"] = p[:, j]
+    cols["r2"] = r2
+    cols["n_obs"] = n.astype(int)
+    return pd.DataFrame(cols, index=names)
+
+
+# ---------------------------------------------------------------------
+# 3. Rolling regression from cumulative sums
+# ---------------------------------------------------------------------
+def rolling_regress(strategies, benchmarks, window: int,
+                    min_periods: int | None = None) -> dict[str, pd.DataFrame]:
+    """
+    Alpha / betas over the trailing `window` bars (inclusive of t).
+
+    Running sums S_t = Σ_{s≤t} x_s x_s' and Σ_{s≤t} x_s y_s are taken once;
+    each window is S_t − S_{t−window}, then all windows are solved in one
+    batch.
+
+    Memory is O(T · K · (M+1)²) for the running sums.  Raises ValueError
+    if `window` is shorter than M + 2 bars (no window could be fitted).
+
+    Returns
+    -------
+    {"alpha": (T, K) frame, "beta_<bench>": (T, K) frame per benchmark}
+    """
+    index, names, bench_names, Y, X, m = _design(strategies, benchmarks)
+    T, P = X.shape
+    if window < P + 1:
+        raise ValueError(f"window={window} is too short to fit alpha and "
+                         f"{P - 1} betas: need at least {P + 1} bars")
+    min_periods = max(min_periods or window, P + 1)
+
+    def windowed(a: np.ndarray) -> np.ndarray:
+        c = np.cumsum(a, axis=0)
+        c[window:] = c[window:] - c[:-window]
+        return c
+
+    XX = (X[:, :, None] * X[:, None, :]).reshape(T, 1, P, P)
+    G = windowed(m[:, :, None, None] * XX)                   # (T, K, P, P)
+    b = windowed(Y[:, :, None] * X[:, None, :])              # (T, K, P)
+    n = windowed(m)                                          # (T, K)
+    theta = _solve(G, b, n >= min_periods)
+
+    out = {"alpha": pd.DataFrame(theta[..., 0], index=index, columns=names)}
+    for j, bench in enumerate(bench_names, start=1):
+        out[f"beta_{bench}"] = pd.DataFrame(theta[..., j], index=index, columns=names)
+    return out
+
+
+# ---------------------------------------------------------------------
+# 4. Plots (headless, on request)
+# ---------------------------------------------------------------------
+def plot_regression(strategy: pd.Series, benchmark: pd.Series,
+                    path: str, title: str | None = None) -> str:
+    """Scatter of strategy vs benchmark returns with the fitted line → `path`."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fit = regress(strategy.rename("strategy"), benchmark.rename("benchmark")).iloc[0]
+    df = pd.concat([strategy, benchmark], axis=1).dropna()
+    x = np.sort(df.iloc[:, 1].to_numpy())
+
+    fig, ax = plt.subplots(figsize=(8, 6))
+    ax.scatter(df.iloc[:, 1], df.iloc[:, 0], alpha=0.7, label="Returns")
+    ax.plot(x, fit["alpha"] + fit["beta_benchmark"] * x, color="red",
+            label=f"α = {fit['alpha']:.4%}  β = {fit['beta_benchmark']:.2f}")
+    ax.set_xlabel("Benchmark return")
+    ax.set_ylabel("Strategy return")
+    ax.set_title(title or "Return regression: strategy vs benchmark")
+    ax.legend()
+    ax.grid(True)
+    fig.tight_layout()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    fig.savefig(path)
+    plt.close(fig)
+    return path
@@ -0,0 +1,86 @@
+"""NumPy backtest kernel shared by the single- and multi-asset backtesters.
+
+Takes the whole (T, N) price and signal matrices and produces per-asset and
+portfolio returns, equity, turnover and costs in one vectorised pass.
+
+Conventions (same as the original per-series backtester):
+    * a signal of 0 means "no new instruction" – the previous position is kept
+    * positions act with a one-bar lag (signal at t is held over bar t+1)
+    * costs = |Δposition| × transaction_cost, charged on the bar of the trade
+
+With ``dtype=np.float32`` the (T, N) per-asset arrays are float32, while
+equity curves and cross-sectional sums are accumulated in float64.
+"""
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+
+def _as_matrix(x, like=None, dtype=np.float64) -> np.ndarray:
+    if isinstance(x, (pd.DataFrame, pd.Series)):
+        if like is not None:
+            x = x.reindex(like.index)
+            if isinstance(x, pd.DataFrame) and isinstance(like, pd.DataFrame):
+                x = x.reindex(columns=like.columns)
+        x = x.to_numpy(dtype=dtype)
+    arr = np.asarray(x, dtype=dtype)
+    return arr.reshape(len(arr), -1)
+
+
+def ffill_rows(values: np.ndarray) -> np.ndarray:
+    """Forward-fill NaNs down axis 0 of a (T, N) array."""
+    rows = np.arange(len(values))[:, None]
+    last = np.maximum.accumulate(np.where(np.isnan(values), 0, rows), axis=0)
+    return np.take_along_axis(values, last, axis=0)
+
+
+def run_backtest_kernel(prices, signals, transaction_cost: float = 0.0,
+                        dtype=np.float64) -> dict:
+    """
+    Parameters
+    ----------
+    prices  : (T, N) prices  (DataFrame, Series or array)
+    signals : (T, N) target positions, aligned to `prices`
+    dtype   : float type of the per-asset arrays (np.float32 = compact)
+
+    Returns
+    -------
+    dict of np.ndarray
+        returns, positions, trades, costs, strategy_returns, equity : (T, N)
+        portfolio_return, portfolio_equity, turnover                 : (T,)
+    """
+    p = _as_matrix(prices, dtype=dtype)
+    s = _as_matrix(signals, like=prices, dtype=dtype)
+    if p.shape != s.shape:
+        raise ValueError(f"prices {p.shape} and signals {s.shape} differ in shape")
+
+    returns = np.zeros_like(p)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns[1:] = p[1:] / p[:-1] - 1
+    returns[np.isnan(returns)] = 0.0
+
+    events = np.where(s == 0, np.nan, s)
+    positions = np.full_like(events, np.nan)
+    positions[1:] = events[:-1]
+    positions = ffill_rows(positions)
+    positions[np.isnan(positions)] = 0.0
+
+    trades = np.zeros_like(positions)
+    trades[1:] = np.abs(np.diff(positions, axis=0))
+    costs = trades * transaction_cost
+
+    strat_returns = positions * returns - costs
+    equity = np.cumprod(1 + strat_returns, axis=0, dtype=np.float64)
+
+    portfolio_return = strat_returns.sum(axis=1, dtype=np.float64)
+    return {
+        "returns":          returns,
+        "positions":        positions,
+        "trades":           trades,
+        "costs":            costs,
+        "strategy_returns": strat_returns,
+        "equity":           equity,
+        "portfolio_return": portfolio_return,
+        "portfolio_equity": np.cumprod(1 + portfolio_return),
+        "turnover":         trades.sum(axis=1, dtype=np.float64),
+    }
@@ -0,0 +1,206 @@
+"""Vectorised performance metrics over a (T, K) matrix of returns.
+
+Each column is one strategy / asset / sweep cell; every statistic is computed
+for all K columns at once with column-wise NumPy reductions, so summarising a
+whole sweep or universe costs a handful of array passes instead of a Python
+loop over series.
+
+Metrics (see notes.txt):
+    total_return, cagr, volatility, sharpe, sortino, skew,
+    lower_tail / upper_tail   – Carver's percentile tail ratios
+                                (1st/30th and 99th/70th percentiles of
+                                demeaned returns, ÷ 4.43 so a Gaussian = 1)
+    max_drawdown, avg_drawdown
+    total_trades, turnover    – Σ|Δposition| and its annualised rate
+    hit_rate                  – share of in-market bars with a positive return
+    avg_holding_period, max_holding_period, n_holdings
+                              – run lengths of consecutive non-zero positions
+
+NaNs in `returns` are treated as missing (leading NaNs of an asset that
+starts trading late are ignored) and as flat bars in the equity curve.
+"""
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+GAUSSIAN_TAIL_RATIO = 4.43      # (1st / 30th) percentile ratio of a normal
+
+
+def _as_2d(x) -> np.ndarray:
+    if isinstance(x, (pd.DataFrame, pd.Series)):
+        x = x.to_numpy(dtype=float)
+    arr = np.asarray(x, dtype=float)
+    return arr.reshape(len(arr), -1)
+
+
+def _safe_div(num, den):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(den != 0, num / den, np.nan)
+
+
+# ---------------------------------------------------------------------
+# 1. Return distribution
+# ---------------------------------------------------------------------
+def _moments(r: np.ndarray) -> dict:
+    """Counts, mean, demeaned values and central moments – one pass each."""
+    valid = ~np.isnan(r)
+    n = valid.sum(axis=0).astype(float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.where(valid, r, 0.0).sum(axis=0) / n
+        d = np.where(valid, r - mean, 0.0)
+        d2 = d * d
+        ss = d2.sum(axis=0)
+        return {"n": n, "mean": mean, "d": d, "valid": valid,
+                "std": np.sqrt(ss / (n - 1)),
+                "m2": ss / n,
+                "m3": (d2 * d).sum(axis=0) / n}
+
+
+def _sharpe(m: dict, annualization: int) -> np.ndarray:
+    return m["mean"] / (m["std"] + 1e-10) * np.sqrt(annualization)
+
+
+def _sortino(r: np.ndarray, m: dict, annualization: int) -> np.ndarray:
+    downside = np.sqrt((np.minimum(np.where(m["valid"], r, 0.0), 0.0) ** 2)
+                       .sum(axis=0) / m["n"])
+    return _safe_div(m["mean"], downside) * np.sqrt(annualization)
+
+
+def _skew(m: dict) -> np.ndarray:
+    n, m2 = m["n"], m["m2"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = np.sqrt(n * (n - 1)) / (n - 2) * m["m3"] / (m2 * np.sqrt(m2))
+    out[n < 3] = np.nan
+    out[(n >= 3) & (m2 == 0)] = 0.0
+    return out
+
+
+def _tail_ratios(m: dict) -> tuple[np.ndarray, np.ndarray]:
+    if m["valid"].all():
+        q = np.percentile(m["d"], [1, 30, 70, 99], axis=0)
+    else:
+        q = np.nanpercentile(np.where(m["valid"], m["d"], np.nan),
+                             [1, 30, 70, 99], axis=0)
+    lower = _safe_div(q[0], q[1]) / GAUSSIAN_TAIL_RATIO
+    upper = _safe_div(q[3], q[2]) / GAUSSIAN_TAIL_RATIO
+    return lower, upper
+
+
+def sharpe(returns, annualization: int = 252) -> np.ndarray:
+    return _sharpe(_moments(_as_2d(returns)), annualization)
+
+
+def sortino(returns, annualization: int = 252) -> np.ndarray:
+    """Mean over downside deviation  √mean(min(r, 0)²), annualised."""
+    r = _as_2d(returns)
+    return _sortino(r, _moments(r), annualization)
+
+
+def skew(returns) -> np.ndarray:
+    """Bias-adjusted sample skewness (same estimator as ``Series.skew``)."""
+    return _skew(_moments(_as_2d(returns)))
+
+
+def tail_ratios(returns) -> tuple[np.ndarray, np.ndarray]:
+    """(lower, upper) percentile tail ratios; > 1 means fatter than Gaussian."""
+    return _tail_ratios(_moments(_as_2d(returns)))
+
+
+# ---------------------------------------------------------------------
+# 2. Equity / drawdowns
+# ---------------------------------------------------------------------
+def equity_curve(returns) -> np.ndarray:
+    return np.cumprod(1 + np.nan_to_num(_as_2d(returns)), axis=0)
+
+
+def drawdowns(equity) -> np.ndarray:
+    eq = _as_2d(equity)
+    return eq / np.maximum.accumulate(eq, axis=0) - 1
+
+
+# ---------------------------------------------------------------------
+# 3. Positions
+# ---------------------------------------------------------------------
+def holding_periods(positions) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (mean, max, count) of run lengths of consecutive non-zero positions per
+    column, found from the edges of the in-market mask in one pass.
+    NaN positions count as flat; columns that never hold a position get
+    mean = max = 0.
+    """
+    held = np.nan_to_num(_as_2d(positions)) != 0
+    T, K = held.shape
+    edges = np.diff(np.pad(held, ((1, 1), (0, 0))).astype(np.int8), axis=0)
+    s_col, s_t = np.nonzero(edges.T == 1)       # sorted by column, then time
+    _, e_t = np.nonzero(edges.T == -1)
+    lengths = (e_t - s_t).astype(float)
+
+    count = np.bincount(s_col, minlength=K)
+    total = np.bincount(s_col, weights=lengths, minlength=K)
+    longest = np.zeros(K)
+    np.maximum.at(longest, s_col, lengths)
+    mean = np.where(count > 0, total / np.maximum(count, 1), 0.0)
+    return mean, longest, count
+
+
+def hit_rate(returns, positions) -> np.ndarray:
+    r = _as_2d(returns)
+    held = np.nan_to_num(_as_2d(positions)) != 0
+    return _safe_div(np.sum(held & (r > 0), axis=0), np.sum(held, axis=0))
+
+
+# ---------------------------------------------------------------------
+# 4. One-shot summary
+# ---------------------------------------------------------------------
+def summarize(returns,
+              positions=None,
+              trades=None,
+              equity=None,
+              annualization: int = 252,
+              columns=None) -> pd.DataFrame:
+    """
+    All metrics for every column of `returns` → DataFrame (K rows).
+
+    Parameters
+    ----------
+    returns   : (T, K) per-bar strategy returns
+    positions : (T, K) held positions – enables hit rate / holding stats
+    trades    : (T, K) |Δposition| – enables trade count / turnover
+    equity    : (T, K) equity curve; compounded from `returns` if omitted
+    columns   : row labels (defaults to the DataFrame columns, else 0..K-1)
+    """
+    r = _as_2d(returns)
+    T, K = r.shape
+    if columns is None:
+        columns = returns.columns if isinstance(returns, pd.DataFrame) else range(K)
+    eq = equity_curve(r) if equity is None else _as_2d(equity)
+    dd = drawdowns(eq)
+    m = _moments(r)
+    periods = m["n"]
+    lower, upper = _tail_ratios(m)
+
+    out = {
+        "total_return": eq[-1] - 1,
+        "cagr":         np.where(periods > 0,
+                                 eq[-1] ** (annualization / np.maximum(periods, 1)) - 1,
+                                 np.nan),
+        "volatility":   m["std"] * np.sqrt(annualization),
+        "sharpe":       _sharpe(m, annualization),
+        "sortino":      _sortino(r, m, annualization),
+        "skew":         _skew(m),
+        "lower_tail":   lower,
+        "upper_tail":   upper,
+        "max_drawdown": dd.min(axis=0),
+        "avg_drawdown": dd.mean(axis=0),
+    }
+    if trades is not None:
+        traded = np.nansum(_as_2d(trades), axis=0)
+        out["total_trades"] = traded
+        out["turnover"] = _safe_div(traded * annualization, periods)
+    if positions is not None:
+        mean_hold, max_hold, n_hold = holding_periods(positions)
+        out["hit_rate"] = hit_rate(r, positions)
+        out["avg_holding_period"] = mean_hold
+        out["max_holding_period"] = max_hold
+        out["n_holdings"] = n_hold
+    return pd.DataFrame(out, index=pd.Index(columns))
@@ -0,0 +1,103 @@
+"""Process-pool runner for per-symbol backtests over a large universe.
+
+The universe is split into chunks of symbols.  Each worker reads only its
+own columns from the panel file, generates signals for the chunk in one call,
+backtests it in one kernel pass and streams the trade-by-trade detail
+straight to its own partition file, in the long results-store format
+(date, symbol, strategy_return, equity_curve; see lib.results_store):
+
+    <detail_dir>/part-00000.parquet, part-00001.parquet, …
+
+Only the small per-symbol metrics table travels back to the parent, so peak
+memory is bounded by ``workers × chunk_size`` symbols rather than by the
+universe size, and wall-clock time scales with the number of cores.
+
+Symbols are backtested independently; use it with single-asset strategies.
+"""
+from __future__ import annotations
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from lib.panel_store import PanelStore
+from lib.results_store import series_long, write_series_part
+from .backtester import backtest_per_asset
+
+
+def panel_symbols(path: str) -> list[str]:
+    """
+    Symbols of a panel – partition names of a `PanelStore` directory, or
+    the data columns of a wide parquet file (read from the schema only).
+    """
+    if os.path.isdir(path):
+        return PanelStore(path).symbols()
+    schema = pq.read_schema(path)
+    meta = schema.pandas_metadata or {}
+    index_cols = {c for c in meta.get("index_columns", []) if isinstance(c, str)}
+    return [name for name in schema.names if name not in index_cols]
+
+
+def detail_frame(index, symbols, res: dict) -> pd.DataFrame:
+    """Long (date, symbol, strategy_return, equity_curve) detail frame."""
+    return series_long(index, symbols,
+                       {"strategy_return": res["strategy_returns"],
+                        "equity_curve": res["equity"]})
+
+
+def _run_chunk(path: str, symbols: list[str], strategy_name: str, tc: float,
+               part_path: str | None, start=None, end=None) -> pd.DataFrame:
+    from lib import STRATEGY_REGISTRY
+    if os.path.isdir(path):
+        prices = PanelStore(path).panel("Close", symbols, start, end)
+    else:
+        prices = pd.read_parquet(path, columns=symbols).loc[start:end]
+    signals = STRATEGY_REGISTRY[strategy_name]().generate_signals(prices)
+    res, metrics_df = backtest_per_asset(prices, signals, tc)
+    if part_path is not None:
+        write_series_part(part_path, detail_frame(prices.index, prices.columns, res))
+    return metrics_df
+
+
+def run_per_symbol(path: str,
+                   strategy_name: str,
+                   transaction_cost: float = 0.0,
+                   workers: int | None = None,
+                   chunk_size: int = 16,
+                   detail_dir: str | None = None,
+                   start=None,
+                   end=None) -> pd.DataFrame:
+    """
+    Parameters
+    ----------
+    path          : `PanelStore` directory (only the chunk's partitions and
+                    the [start, end] years are read) or wide parquet panel
+    strategy_name : key in STRATEGY_REGISTRY
+    workers       : process count (None = os.cpu_count())
+    chunk_size    : symbols per task
+    detail_dir    : directory for the per-chunk detail partitions
+                    (None = metrics only)
+    start, end    : optional date slice applied by every worker
+
+    Returns
+    -------
+    pd.DataFrame  backtest metrics, one row per symbol in panel order
+    """
+    symbols = panel_symbols(path)
+    chunks = [symbols[i:i + chunk_size] for i in range(0, len(symbols), chunk_size)]
+    if detail_dir is not None:
+        os.makedirs(detail_dir, exist_ok=True)
+    print(f"[+] {len(symbols)} symbols in {len(chunks)} chunks")
+
+    parts = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_run_chunk, path, chunk, strategy_name,
+                               transaction_cost,
+                               None if detail_dir is None
+                               else os.path.join(detail_dir, f"part-{i:05d}.parquet"),
+                               start, end)
+                   for i, chunk in enumerate(chunks)]
+        for fut in as_completed(futures):
+            parts.append(fut.result())
+    return pd.concat(parts).reindex(symbols)
@@ -0,0 +1,159 @@
+# lib/cache.py  ─────────────────────────────────────────────
+"""
+Per-symbol on-disk price cache with date-coverage bookkeeping.
+
+Layout
+------
+<root>/<symbol>.parquet   OHLCV bars for one instrument (DatetimeIndex)
+<root>/coverage.json      {symbol: [[start, end], ...]} date ranges already
+                          requested from the vendor (inclusive, ISO dates)
+
+Coverage is tracked separately from the bars themselves so weekends and
+holidays inside a fetched range are not re-requested.  A refresh asks the
+vendor only for the gaps / missing tail of each symbol and appends them.
+"""
+from __future__ import annotations
+import json
+import os
+import re
+from typing import Callable
+
+import pandas as pd
+
+from lib.fetch import fetch_many
+
+_DAY = pd.Timedelta(days=1)
+
+
+def _merge_ranges(ranges: list[tuple[pd.Timestamp, pd.Timestamp]]):
+    """Union of inclusive date ranges (adjacent days are joined)."""
+    merged: list[list[pd.Timestamp]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + _DAY:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [tuple(r) for r in merged]
+
+
+class PriceCache:
+    def __init__(self, root: str = "data/cache"):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._cov_path = os.path.join(root, "coverage.json")
+        self._coverage: dict[str, list[tuple[pd.Timestamp, pd.Timestamp]]] = {}
+        if os.path.exists(self._cov_path):
+            with open(self._cov_path) as fh:
+                raw = json.load(fh)
+            self._coverage = {sym: [(pd.Timestamp(a), pd.Timestamp(b)) for a, b in rngs]
+                              for sym, rngs in raw.items()}
+
+    # --- bookkeeping ---------------------------------------------------
+    def _path(self, symbol: str) -> str:
+        return os.path.join(self.root, re.sub(r"[^\w.=-]", "_", symbol) + ".parquet")
+
+    def _save_coverage(self) -> None:
+        raw = {sym: [[a.date().isoformat(), b.date().isoformat()] for a, b in rngs]
+               for sym, rngs in self._coverage.items()}
+        tmp = self._cov_path + ".tmp"
+        with open(tmp, "w") as fh:
+            json.dump(raw, fh, indent=1, sort_keys=True)
+        os.replace(tmp, self._cov_path)
+
+    def coverage(self, symbol: str) -> list[tuple[pd.Timestamp, pd.Timestamp]]:
+        return list(self._coverage.get(symbol, []))
+
+    def missing(self, symbol: str, start, end) -> list[tuple[pd.Timestamp, pd.Timestamp]]:
+        """Sub-ranges of [start, end] not yet requested for `symbol`."""
+        start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+        gaps, cursor = [], start
+        for a, b in self._coverage.get(symbol, []):
+            if b < cursor:
+                continue
+            if a > end:
+                break
+            if a > cursor:
+                gaps.append((cursor, a - _DAY))
+            cursor = max(cursor, b + _DAY)
+        if cursor <= end:
+            gaps.append((cursor, end))
+        return gaps
+
+    # --- read / write --------------------------------------------------
+    def load(self, symbol: str, start=None, end=None) -> pd.DataFrame:
+        path = self._path(symbol)
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        return pd.read_parquet(path).loc[start:end]
+
+    def append(self, symbol: str, bars: pd.DataFrame, start, end,
+               confirmed_empty: bool = False) -> None:
+        """
+        Merge `bars` (fetched for the inclusive range [start, end]) into the
+        store.  Ranges reaching today are only marked covered up to the last
+        bar received, so the live tail is asked for again next time.
+
+        An empty `bars` only marks the range covered with
+        ``confirmed_empty=True`` (the vendor confirmed there are no bars,
+        e.g. a holiday); otherwise it is treated as a failed fetch and the
+        range is asked for again on the next refresh.
+        """
+        if bars.empty and not confirmed_empty:
+            return
+        start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+        old = self.load(symbol)
+        if not bars.empty:
+            bars = bars.copy()
+            bars.index = pd.DatetimeIndex(bars.index).tz_localize(None)
+            merged = pd.concat([old, bars]) if not old.empty else bars
+            merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+            merged.to_parquet(self._path(symbol))
+
+        today = pd.Timestamp.today().normalize()
+        if end >= today:
+            end = bars.index.max().normalize() if not bars.empty else start - _DAY
+        if end >= start:
+            self._coverage[symbol] = _merge_ranges(
+                self._coverage.get(symbol, []) + [(start, end)])
+            self._save_coverage()
+
+    def panel(self, symbols: list[str], start=None, end=None,
+              field: str = "Close") -> pd.DataFrame:
+        """Wide panel of one field (columns = symbols) rebuilt from the cache."""
+        cols = {}
+        for sym in symbols:
+            bars = self.load(sym, start, end)
+            cols[sym] = bars[field] if field in bars else pd.Series(dtype=float)
+        return pd.concat(cols, axis=1).sort_index()
+
+
+def refresh(cache: PriceCache,
+            symbols: list[str],
+            start, end,
+            fetch_range: Callable[[str, pd.Timestamp, pd.Timestamp], pd.DataFrame],
+            vendor: str,
+            max_workers: int = 8) -> dict[str, str]:
+    """
+    Fetch only the uncovered ranges of every symbol and append them.
+
+    `fetch_range(symbol, start, end)` must return the bars of the inclusive
+    range and raise when it gets none; an empty frame only counts as "no
+    bars in this range" when flagged ``bars.attrs["confirmed_empty"] = True``.
+    Returns per-range failures {"<symbol> <start>:<end>": error}.
+    """
+    tasks = {f"{sym} {a.date()}:{b.date()}": (sym, a, b)
+             for sym in symbols for a, b in cache.missing(sym, start, end)}
+    if not tasks:
+        print("[+] Cache up to date")
+        return {}
+    print(f"[+] Fetching {len(tasks)} missing ranges for "
+          f"{len({t[0] for t in tasks.values()})} symbols")
+    fetched, failures = fetch_many(list(tasks),
+                                   lambda key: fetch_range(*tasks[key]),
+                                   vendor=vendor, max_workers=max_workers,
+                                   require_any=False)
+    for key, bars in fetched.items():
+        sym, a, b = tasks[key]
+        cache.append(sym, bars, a, b,
+                     confirmed_empty=bars.attrs.get("confirmed_empty", False))
+    return failures
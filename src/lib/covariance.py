@@ -0,0 +1,493 @@
+# lib/covariance.py  ────────────────────────────────────────
+"""
+Rolling and EWMA covariance engines for portfolio vol targeting.
+
+The sample engines update the covariance from the previous bar in O(N²)
+instead of re-estimating every window from scratch.  `iter_rolling_cov` /
+`iter_factor_cov` yield one bar at a time, so a position loop only ever
+holds O(N²) (dense) or O(N·k) (factor) state; `rolling_cov` / `ewma_cov`
+stack all windows into a (T, N, N) array for small universes and checks.
+
+Missing returns are handled pairwise (same as ``DataFrame.cov``): each
+entry Σ_ij only uses bars where both i and j are observed.
+
+For large universes `iter_factor_cov` / `rolling_factor_cov` keep Σ as k
+factors + a diagonal (k-factor PCA, optionally Ledoit-Wolf shrunk towards
+μ·I with an explicit intensity, `FactorCovariance`): memory is O(N·k) per
+bar and  w' Σ w  costs O(N·k).  The principal directions are refitted every
+`FACTOR_REFIT` bars rather than by an SVD per bar.  The factor models demean
+each asset over its observed bars and treat gaps as zero returns.
+
+Stacks can be stored compact (``dtype=np.float32``); the running sums
+behind them and every  w' Σ w  are still evaluated in float64.
+"""
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+_BLOCK = 256    # bars per float64 block when evaluating a compact stack
+
+
+def _blocks(n: int):
+    for i in range(0, n, _BLOCK):
+        yield slice(i, i + _BLOCK)
+
+
+# ---------------------------------------------------------------------
+# 1. Incremental engines
+# ---------------------------------------------------------------------
+class RollingCovariance:
+    """
+    Equal-weight covariance over the last `window` bars.
+
+    Keeps pairwise sums  Σx_i·x_j,  Σx_i|j  and pair counts  n_ij  so each
+    new bar is an add + a remove of one outer product.  Add/remove leaves
+    rounding residue in the sums, so they are recomputed exactly from the
+    window buffer every `refresh` bars (default: once per window, which
+    keeps the amortised cost at O(N²) per bar).
+    """
+
+    def __init__(self, n_assets: int, window: int, min_periods: int = 2,
+                 refresh: int | None = None):
+        if window < 2:
+            raise ValueError("window must be >= 2")
+        self.window = window
+        self.min_periods = max(min_periods, 2)
+        self.refresh = refresh or window
+        self._buf = np.full((window, n_assets), np.nan)
+        self._pos = 0
+        self._since_refresh = 0
+        self._sxy = np.zeros((n_assets, n_assets))   # Σ x_i x_j  (both valid)
+        self._sx = np.zeros((n_assets, n_assets))    # Σ x_i      (where j valid)
+        self._n = np.zeros((n_assets, n_assets))     # pair counts
+
+    def _accumulate(self, row: np.ndarray, sign: float) -> None:
+        valid = ~np.isnan(row)
+        x = np.where(valid, row, 0.0)
+        m = valid.astype(float)
+        self._sxy += sign * np.outer(x, x)
+        self._sx += sign * np.outer(x, m)
+        self._n += sign * np.outer(m, m)
+
+    def _recompute(self) -> None:
+        """Exact window sums from the buffer (drops add/remove residue)."""
+        valid = ~np.isnan(self._buf)
+        x = np.where(valid, self._buf, 0.0)
+        m = valid.astype(float)
+        self._sxy = x.T @ x
+        self._sx = x.T @ m
+        self._n = m.T @ m
+        self._since_refresh = 0
+
+    def update(self, row) -> np.ndarray:
+        """Add one bar of returns (length N, NaN = missing); return current Σ."""
+        row = np.asarray(row, dtype=float)
+        self._since_refresh += 1
+        if self._since_refresh >= self.refresh:
+            self._buf[self._pos] = row
+            self._recompute()
+        else:
+            self._accumulate(self._buf[self._pos], -1.0)
+            self._buf[self._pos] = row
+            self._accumulate(row, +1.0)
+        self._pos = (self._pos + 1) % self.window
+        return self.cov
+
+    @property
+    def cov(self) -> np.ndarray:
+        n = self._n
+        with np.errstate(invalid="ignore", divide="ignore"):
+            c = (self._sxy - self._sx * self._sx.T / n) / (n - 1)
+        c[n < self.min_periods] = np.nan
+        return c
+
+
+class EWMACovariance:
+    """
+    Exponentially weighted covariance, deviations taken from the previous
+    mean:
+
+        d_t = x_t - μ_{t-1}
+        Σ_t = (1-α) (Σ_{t-1} + α d_t d_t')
+        μ_t = μ_{t-1} + α d_t
+
+    i.e. ``DataFrame.ewm(alpha=α, adjust=False).cov(bias=True)``.  Missing
+    returns are treated as 0.
+    """
+
+    def __init__(self, n_assets: int, alpha: float):
+        if not 0 < alpha <= 1:
+            raise ValueError("alpha must be in (0, 1]")
+        self.alpha = alpha
+        self.mean = np.zeros(n_assets)
+        self._cov = np.zeros((n_assets, n_assets))
+        self.nobs = 0
+
+    def update(self, row) -> np.ndarray:
+        x = np.nan_to_num(np.asarray(row, dtype=float))
+        if self.nobs == 0:
+            self.mean = x.copy()
+        else:
+            a = self.alpha
+            d = x - self.mean
+            self._cov = (1 - a) * (self._cov + a * np.outer(d, d))
+            self.mean = self.mean + a * d
+        self.nobs += 1
+        return self.cov
+
+    @property
+    def cov(self) -> np.ndarray:
+        if self.nobs < 2:
+            return np.full_like(self._cov, np.nan)
+        return self._cov.copy()
+
+
+# ---------------------------------------------------------------------
+# 2. Per-bar iterators and batch helpers
+# ---------------------------------------------------------------------
+def _as_array(returns) -> np.ndarray:
+    if isinstance(returns, (pd.DataFrame, pd.Series)):
+        returns = returns.to_numpy(dtype=float)
+    arr = np.asarray(returns, dtype=float)
+    return arr.reshape(len(arr), -1)
+
+
+def iter_rolling_cov(returns, window: int, min_periods: int = 2):
+    """
+    Rolling covariance one bar at a time: the t-th (N, N) matrix yielded
+    covers rows ``t-window+1 … t`` (inclusive, like ``DataFrame.rolling``),
+    so the estimate *known before* bar t is the (t-1)-th.  Each matrix is
+    a fresh array the caller may modify.
+    """
+    x = _as_array(returns)
+    eng = RollingCovariance(x.shape[1], window, min_periods)
+    for row in x:
+        yield eng.update(row)
+
+
+def iter_ewma_cov(returns, alpha: float):
+    """EWMA covariance one bar at a time, the t-th matrix includes bar t."""
+    x = _as_array(returns)
+    eng = EWMACovariance(x.shape[1], alpha)
+    for row in x:
+        yield eng.update(row)
+
+
+def _stack(covs, T: int, N: int, dtype) -> np.ndarray:
+    out = np.empty((T, N, N), dtype=dtype)
+    for t, c in enumerate(covs):
+        out[t] = c
+    return out
+
+
+def rolling_cov(returns, window: int, min_periods: int = 2,
+                dtype=np.float64) -> np.ndarray:
+    """
+    Stacked `iter_rolling_cov`: ``out[t]`` is the covariance of rows
+    ``t-window+1 … t``.  O(T·N²) memory – prefer the iterator in loops.
+    """
+    x = _as_array(returns)
+    return _stack(iter_rolling_cov(x, window, min_periods), *x.shape, dtype)
+
+
+def ewma_cov(returns, alpha: float, dtype=np.float64) -> np.ndarray:
+    """Stacked EWMA covariance, ``out[t]`` includes bar t."""
+    x = _as_array(returns)
+    return _stack(iter_ewma_cov(x, alpha), *x.shape, dtype)
+
+
+def portfolio_vol(weights, covs) -> np.ndarray | float:
+    """
+    sqrt(w' Σ w) for one bar (w: (N,), Σ: (N, N)) or for every bar at once
+    (w: (T, N), Σ: (T, N, N)) in a single einsum.
+    A `FactorCovariance` (or a blend of them) is evaluated in factor form,
+    O(N·k) per bar.
+    """
+    if isinstance(covs, (FactorCovariance, BlendedCovariance)):
+        var = covs.portfolio_var(weights)
+        return float(np.sqrt(var)) if np.ndim(var) == 0 else np.sqrt(var)
+    w = np.asarray(weights, dtype=float)
+    c = np.asarray(covs)
+    if w.ndim == 1:
+        return float(np.sqrt(w @ c.astype(float, copy=False) @ w))
+    if c.ndim == 2:
+        var = np.einsum("ti,ij,tj->t", w, c.astype(float, copy=False), w)
+    elif c.dtype == np.float64:
+        var = np.einsum("ti,tij,tj->t", w, c, w)
+    else:
+        # compact stack: upcast one block of bars at a time
+        var = np.empty(len(w))
+        for sl in _blocks(len(w)):
+            var[sl] = np.einsum("ti,tij,tj->t", w[sl], c[sl].astype(float), w[sl])
+    return np.sqrt(var)
+
+
+# ---------------------------------------------------------------------
+# 3. Low-rank + diagonal models  (large universes)
+# ---------------------------------------------------------------------
+FACTOR_REFIT = 21   # bars between full factor re-estimations (≈ monthly)
+
+
+class FactorCovariance:
+    """
+    Σ = (1 − δ) (B Bᵀ + diag(d)) + δ μ I  held as factors, never as an
+    N × N matrix.
+
+    loadings  : (T, N, k) stacked per bar, or (N, k) for a single bar
+    specific  : (T, N) / (N,) diagonal (idiosyncratic) variances
+    shrinkage : δ, (T,) / scalar Ledoit-Wolf intensity (default 0)
+    target    : μ, (T,) / scalar variance of the shrinkage target μ I
+
+    Slicing over bars (``cov[:-1]``) returns another FactorCovariance, and
+    ``portfolio_var`` costs O(N·k) per bar instead of O(N²).  Float32
+    factors are kept as float32.
+    """
+
+    def __init__(self, loadings: np.ndarray, specific: np.ndarray,
+                 shrinkage=0.0, target=0.0):
+        self.loadings = _floating(loadings)
+        self.specific = _floating(specific)
+        self.shrinkage = np.broadcast_to(_floating(shrinkage), self.specific.shape[:-1])
+        self.target = np.broadcast_to(_floating(target), self.specific.shape[:-1])
+
+    def __len__(self) -> int:
+        return len(self.loadings)
+
+    def __getitem__(self, key) -> "FactorCovariance":
+        return FactorCovariance(self.loadings[key], self.specific[key],
+                                self.shrinkage[key], self.target[key])
+
+    @property
+    def n_factors(self) -> int:
+        return self.loadings.shape[-1]
+
+    def blend(self, other, lambda_: float) -> "BlendedCovariance":
+        """(1 - lambda_) · self + lambda_ · other, without copying factors."""
+        return BlendedCovariance([(1 - lambda_, self), (lambda_, other)])
+
+    def portfolio_var(self, weights) -> np.ndarray | float:
+        """
+        w' Σ w = (1 − δ) (|Bᵀw|² + Σ d_i w_i²) + δ μ |w|²  for one bar or
+        every bar at once.
+        """
+        w = np.asarray(weights, dtype=float)
+        if w.ndim == 1:
+            exposure = w @ self.loadings
+            ww = w * w
+            delta, mu = float(self.shrinkage), float(self.target)
+            return float((1 - delta) * (exposure @ exposure + self.specific @ ww)
+                         + delta * mu * ww.sum())
+        var = np.empty(len(w))
+        for sl in _blocks(len(w)):
+            B = self.loadings[sl].astype(float, copy=False)
+            d = self.specific[sl].astype(float, copy=False)
+            delta = self.shrinkage[sl].astype(float, copy=False)
+            mu = self.target[sl].astype(float, copy=False)
+            ww = w[sl] * w[sl]
+            exposure = np.einsum("ti,tik->tk", w[sl], B)
+            var[sl] = ((1 - delta) * (np.einsum("tk,tk->t", exposure, exposure)
+                                      + np.einsum("ti,ti->t", d, ww))
+                       + delta * mu * ww.sum(axis=1))
+        return var
+
+    def dense(self) -> np.ndarray:
+        """Materialise Σ (for checks / small universes)."""
+        B = self.loadings
+        cov = B @ np.swapaxes(B, -1, -2)
+        idx = np.arange(B.shape[-2])
+        cov[..., idx, idx] += self.specific
+        cov *= (1 - self.shrinkage)[..., None, None]
+        cov[..., idx, idx] += (self.shrinkage * self.target)[..., None]
+        return cov
+
+
+class BlendedCovariance:
+    """
+    Σ = Σ_j c_j Σ_j, a weighted sum of factor covariances kept as its parts:
+    blending never concatenates or copies loadings, and ``portfolio_var``
+    is the weighted sum of the parts' O(N·k) evaluations.
+    """
+
+    def __init__(self, parts):
+        self.parts = [(float(c), cov) for c, cov in parts]
+
+    def __len__(self) -> int:
+        return len(self.parts[0][1])
+
+    def __getitem__(self, key) -> "BlendedCovariance":
+        return BlendedCovariance([(c, cov[key]) for c, cov in self.parts])
+
+    def blend(self, other, lambda_: float) -> "BlendedCovariance":
+        return BlendedCovariance([(1 - lambda_, self), (lambda_, other)])
+
+    def portfolio_var(self, weights) -> np.ndarray | float:
+        return sum(c * cov.portfolio_var(weights) for c, cov in self.parts)
+
+    def dense(self) -> np.ndarray:
+        return sum(c * cov.dense() for c, cov in self.parts)
+
+
+def _floating(a) -> np.ndarray:
+    a = np.asarray(a)
+    return a if a.dtype.kind == "f" else a.astype(float)
+
+
+def _demeaned_window(x: np.ndarray, min_periods: int) -> np.ndarray:
+    """Column-demean a (W, N) window over observed values; gaps → 0."""
+    valid = ~np.isnan(x)
+    n = valid.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(valid, x, 0.0).sum(axis=0) / n
+    xc = np.where(valid, x - mean, 0.0)
+    xc[:, n < min_periods] = 0.0
+    return xc
+
+
+def _principal_directions(Xs: np.ndarray, n_factors: int) -> np.ndarray:
+    """(N, n_factors) top right-singular vectors of Xs, zero-padded."""
+    _, _, vt = np.linalg.svd(Xs, full_matrices=False)
+    k = min(n_factors, len(vt))
+    V = np.zeros((Xs.shape[1], n_factors))
+    V[:, :k] = vt[:k].T
+    return V
+
+
+def _project(Xs: np.ndarray, V: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Factor model of S = XsᵀXs on the (orthonormal) directions V: loadings
+    B with B Bᵀ = V (VᵀSV) Vᵀ, and the residual variances as the diagonal,
+    so diag(Σ) equals diag(S).  O(n·N·k).
+    """
+    F = Xs @ V                                          # (n, k) factor returns
+    lam, Q = np.linalg.eigh(F.T @ F)
+    loadings = V @ (Q * np.sqrt(np.maximum(lam, 0.0)))
+    specific = np.maximum(np.sum(Xs * Xs, axis=0) - np.sum(loadings**2, axis=1), 0.0)
+    return loadings, specific
+
+
+def _shrinkage(X: np.ndarray) -> tuple[float, float]:
+    """
+    Ledoit-Wolf (2004) optimal intensity δ and target variance μ for the
+    biased sample covariance S = XᵀX / n of a demeaned (n, N) window, from
+    the n × n Gram matrix – O(n²·N), never O(N²).
+    """
+    n, N = X.shape
+    G = X @ X.T
+    trace_s = np.trace(G) / n
+    mu = trace_s / N
+    frob_s = np.sum(G * G) / n**2                       # ‖S‖²_F
+    d2 = (frob_s - 2 * mu * trace_s + mu * mu * N) / N
+    b2_bar = (np.sum(np.diag(G) ** 2) - np.sum(G * G) / n) / n**2 / N
+    delta = 0.0 if d2 <= 0 else float(np.clip(b2_bar / d2, 0.0, 1.0))
+    return delta, float(mu)
+
+
+def ledoit_wolf(window_returns, n_factors: int = 3,
+                min_periods: int = 2) -> tuple[np.ndarray, np.ndarray, float, float]:
+    """
+    Ledoit-Wolf shrinkage of the sample covariance towards μ·I, as a
+    k-factor model plus diagonal.  With X the demeaned (n, N) window and
+    S = XᵀX / n  ≈  B Bᵀ + diag(d)  (top `n_factors` principal components,
+    residual variances on the diagonal):
+
+        Σ = (1 − δ) (B Bᵀ + diag(d)) + δ μ I
+
+    δ is the Ledoit-Wolf (2004) optimal intensity and μ = tr(S) / N.
+
+    Returns
+    -------
+    (loadings (N, k), specific (N,), delta, mu)
+    """
+    X = _demeaned_window(_as_array(window_returns), min_periods)
+    Xs = X / np.sqrt(len(X))
+    loadings, specific = _project(Xs, _principal_directions(Xs, n_factors))
+    delta, mu = _shrinkage(X)
+    return loadings, specific, delta, mu
+
+
+def pca_factors(window_returns, n_factors: int,
+                min_periods: int = 2) -> tuple[np.ndarray, np.ndarray]:
+    """
+    k-factor PCA model of the (unbiased) sample covariance: the top
+    `n_factors` principal components as loadings, and each asset's residual
+    variance as the diagonal, so diag(Σ) equals the sample variances.
+    Uses the thin SVD of the (n, N) window – O(n²·N).
+
+    Returns
+    -------
+    (loadings (N, k), specific (N,))
+    """
+    X = _demeaned_window(_as_array(window_returns), min_periods)
+    Xs = X / np.sqrt(max(len(X) - 1, 1))
+    return _project(Xs, _principal_directions(Xs, n_factors))
+
+
+def iter_factor_cov(returns, window: int, model: str = "pca",
+                    n_factors: int = 3, min_periods: int = 2,
+                    refit: int = FACTOR_REFIT):
+    """
+    Factor covariance over a rolling window, one bar at a time (same
+    convention as `iter_rolling_cov`).  Yields a single-bar
+    `FactorCovariance`, or None while the window is shorter than
+    `min_periods`.
+
+    model : "ledoit_wolf" (shrunk k-factor model) or "pca" (k-factor model)
+    refit : bars between full fits.  The principal directions (an SVD,
+            O(window²·N)) and the Ledoit-Wolf intensity δ are re-estimated
+            every `refit` bars; in between, each bar projects its window on
+            the last directions (factor variances, residual variances and μ
+            from the current window, O(window·N·k)).  A change in the set of
+            assets with at least `min_periods` observations forces a refit.
+            ``refit=1`` fits every bar.
+    """
+    if model not in ("ledoit_wolf", "pca"):
+        raise ValueError(f"Unknown covariance model '{model}'")
+    if refit < 1:
+        raise ValueError("refit must be >= 1")
+    x = _as_array(returns)
+    V, active, delta, since_fit = None, None, 0.0, 0
+    for t in range(len(x)):
+        win = x[max(0, t - window + 1):t + 1]
+        if len(win) < max(min_periods, 2):
+            yield None
+            continue
+        X = _demeaned_window(win, min_periods)
+        n, N = X.shape
+        Xs = X / np.sqrt(n if model == "ledoit_wolf" else max(n - 1, 1))
+        now_active = (~np.isnan(win)).sum(axis=0) >= min_periods
+        since_fit += 1
+        if V is None or since_fit >= refit or not np.array_equal(now_active, active):
+            V, active = _principal_directions(Xs, n_factors), now_active
+            if model == "ledoit_wolf":
+                delta, _ = _shrinkage(X)
+            since_fit = 0
+        loadings, specific = _project(Xs, V)
+        if model == "pca":
+            yield FactorCovariance(loadings, specific)
+        else:
+            yield FactorCovariance(loadings, specific, delta, np.sum(Xs * Xs) / N)
+
+
+def rolling_factor_cov(returns, window: int, model: str = "pca",
+                       n_factors: int = 3, min_periods: int = 2,
+                       refit: int = FACTOR_REFIT,
+                       dtype=np.float64) -> FactorCovariance:
+    """
+    Stacked `iter_factor_cov`: ``out[t]`` uses rows ``t-window+1 … t``.
+    O(T·N·k) memory – prefer the iterator in loops.
+    """
+    x = _as_array(returns)
+    T, N = x.shape
+    loadings = np.full((T, N, n_factors), np.nan, dtype=dtype)
+    specific = np.full((T, N), np.nan, dtype=dtype)
+    shrinkage = np.zeros(T, dtype=dtype)
+    target = np.zeros(T, dtype=dtype)
+    for t, fc in enumerate(iter_factor_cov(x, window, model, n_factors,
+                                           min_periods, refit)):
+        if fc is None:
+            continue
+        loadings[t] = fc.loadings
+        specific[t] = fc.specific
+        shrinkage[t] = fc.shrinkage
+        target[t] = fc.target
+    return FactorCovariance(loadings, specific, shrinkage, target)
@@ -0,0 +1,214 @@
+# lib/features.py  ──────────────────────────────────────────
+"""
+Memoised feature store for derived panels (returns, EW vols, EWMACs …).
+
+Every feature is keyed by (panel fingerprint, feature name, parameters), so a
+panel's returns / vols / EWMACs are computed once and shared by all
+strategies, indicators and sweep cells in the process.  Entries live in an
+LRU cache bounded by memory (bytes, not entry count) and can optionally be
+persisted to disk so repeated runs on the same panel skip the work entirely.
+
+A panel's fingerprint is computed once per frame object: panels are
+treated as immutable once they have been used as a key – build a new frame
+(or call `forget`) after editing one in place.  Returned frames never alias
+the cached ones: with copy-on-write pandas they are free shallow copies,
+otherwise deep copies; arrays come back as read-only views.
+"""
+from __future__ import annotations
+import hashlib
+import os
+import weakref
+from collections import OrderedDict
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_BYTES = 512 * 2**20     # 512 MB
+
+
+# id(frame) -> (weakref to the frame, digest); entries die with their frame
+_FINGERPRINTS: dict[int, tuple[weakref.ref, str]] = {}
+
+
+def _drop_fingerprint(key: int, ref: weakref.ref) -> None:
+    entry = _FINGERPRINTS.get(key)
+    if entry is not None and entry[0] is ref:
+        del _FINGERPRINTS[key]
+
+
+def fingerprint(frame: pd.DataFrame | pd.Series) -> str:
+    """
+    Content hash of a panel (values, dtypes, index and column labels),
+    cached per frame object so repeated lookups on the same panel do not
+    re-hash it.
+    """
+    key = id(frame)
+    entry = _FINGERPRINTS.get(key)
+    if entry is not None and entry[0]() is frame:
+        return entry[1]
+    digest = _content_hash(frame)
+    ref = weakref.ref(frame, lambda r, key=key: _drop_fingerprint(key, r))
+    _FINGERPRINTS[key] = (ref, digest)
+    return digest
+
+
+def forget(frame: pd.DataFrame | pd.Series) -> None:
+    """Drop the cached fingerprint of a panel that was modified in place."""
+    _FINGERPRINTS.pop(id(frame), None)
+
+
+def _content_hash(frame: pd.DataFrame | pd.Series) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.ascontiguousarray(frame.to_numpy(dtype=float)).tobytes())
+    dtypes = frame.dtypes if isinstance(frame, pd.DataFrame) else [frame.dtype]
+    h.update(repr([str(d) for d in dtypes]).encode())
+    h.update(pd.util.hash_pandas_object(frame.index, index=False).to_numpy().tobytes())
+    names = frame.columns if isinstance(frame, pd.DataFrame) else [frame.name]
+    h.update(repr(list(names)).encode())
+    h.update(str(isinstance(frame, pd.Series)).encode())
+    return h.hexdigest()
+
+
+def _copy_on_write() -> bool:
+    if int(pd.__version__.split(".", 1)[0]) >= 3:
+        return True
+    return pd.get_option("mode.copy_on_write") is True
+
+
+def _detached(value):
+    """A cached value the caller cannot modify the cache through."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=not _copy_on_write())
+    if isinstance(value, np.ndarray):
+        view = value.view()
+        view.flags.writeable = False
+        return view
+    return value
+
+
+def _nbytes(obj) -> int:
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=True))
+    return int(getattr(obj, "nbytes", 0))
+
+
+class FeatureStore:
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES,
+                 disk_dir: str | None = None):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self._cache: OrderedDict[tuple, object] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    # --- cache plumbing --------------------------------------------------
+    def _disk_path(self, key: tuple) -> str:
+        digest = hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+        return os.path.join(self.disk_dir, f"{key[1]}-{digest}.parquet")
+
+    def _insert(self, key: tuple, value) -> None:
+        size = _nbytes(value)
+        if size > self.max_bytes:
+            return
+        self._cache[key] = value
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, old = self._cache.popitem(last=False)
+            self._bytes -= _nbytes(old)
+
+    def get(self, name: str, prices, params: tuple,
+            compute: Callable[[], pd.DataFrame | pd.Series]):
+        """Return feature `name(params)` of `prices`, computing it on a miss."""
+        key = (fingerprint(prices), name, params)
+        if key in self._cache:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return _detached(self._cache[key])
+
+        value = None
+        path = self._disk_path(key) if self.disk_dir else None
+        if path is not None and os.path.exists(path):
+            value = pd.read_parquet(path)
+            if list(value.columns) == ["__series__"]:
+                series_name = prices.name if isinstance(prices, pd.Series) else None
+                value = value["__series__"].rename(series_name)
+        if value is None:
+            self.misses += 1
+            value = compute()
+            if path is not None:
+                os.makedirs(self.disk_dir, exist_ok=True)
+                frame = (value.to_frame("__series__")
+                         if isinstance(value, pd.Series) else value)
+                frame.to_parquet(path)
+        else:
+            self.hits += 1
+        self._insert(key, value)
+        return _detached(value)
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self._bytes = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+
+# Process-wide store used by strategies and indicators
+FEATURES = FeatureStore()
+
+
+def configure(max_bytes: int | None = None, disk_dir: str | None = None) -> FeatureStore:
+    """Adjust the process-wide store (memory budget, on-disk persistence)."""
+    if max_bytes is not None:
+        FEATURES.max_bytes = max_bytes
+    if disk_dir is not None:
+        FEATURES.disk_dir = disk_dir
+    return FEATURES
+
+
+# ---------------------------------------------------------------------
+# Features  (all take the *price* panel as the root input)
+# ---------------------------------------------------------------------
+def returns(prices, fill: float | None = None):
+    """Simple returns (no padding of gaps); NaNs replaced by `fill` if given."""
+    def compute():
+        rets = prices.pct_change(fill_method=None)
+        return rets if fill is None else rets.fillna(fill)
+    return FEATURES.get("returns", prices, (fill,), compute)
+
+
+def ewm_mean(prices, alpha: float, adjust: bool = False,
+             on: str = "returns", fill: float | None = None):
+    """EWMA of prices (``on="prices"``) or of their returns."""
+    def compute():
+        base = prices if on == "prices" else returns(prices, fill)
+        return base.ewm(alpha=alpha, adjust=adjust).mean()
+    return FEATURES.get("ewm_mean", prices, (alpha, adjust, on, fill), compute)
+
+
+def ew_var(prices, alpha: float, adjust: bool = True, fill: float | None = 0.0):
+    """Exponentially weighted variance of returns (bias-corrected)."""
+    def compute():
+        return returns(prices, fill).ewm(alpha=alpha, adjust=adjust).var(bias=False)
+    return FEATURES.get("ew_var", prices, (alpha, adjust, fill), compute)
+
+
+def ew_std(prices, alpha: float, adjust: bool = True, fill: float | None = 0.0):
+    """Exponentially weighted stdev of returns (not annualised)."""
+    def compute():
+        return returns(prices, fill).ewm(alpha=alpha, adjust=adjust).std()
+    return FEATURES.get("ew_std", prices, (alpha, adjust, fill), compute)
+
+
+def ewmac(prices, fast_alpha: float, slow_alpha: float,
+          on: str = "prices", fill: float | None = None):
+    """EWMA crossover  EWMA_fast − EWMA_slow  (adjust=False recursion)."""
+    def compute():
+        return (ewm_mean(prices, fast_alpha, on=on, fill=fill)
+                - ewm_mean(prices, slow_alpha, on=on, fill=fill))
+    return FEATURES.get("ewmac", prices, (fast_alpha, slow_alpha, on, fill), compute)
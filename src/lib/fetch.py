@@ -0,0 +1,195 @@
+# lib/fetch.py  ─────────────────────────────────────────────
+"""
+Concurrent, rate-limited fetch layer shared by all vendor loaders.
+
+* ``RateLimiter``  – thread-safe token bucket, one per vendor
+* ``with_retry``   – exponential backoff with jitter on retryable errors
+* ``get_session``  – one pooled keep-alive ``requests.Session`` per thread
+* ``fetch_many``   – fan a per-symbol fetch out over a thread pool and report
+                     per-symbol failures instead of aborting the whole pull
+                     (FetchError only when every symbol failed)
+
+``requests`` is imported on the first HTTP call, not with this module.
+"""
+from __future__ import annotations
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    import requests
+
+# requests / second allowed per vendor (override via RATE_LIMITS[vendor] = …)
+RATE_LIMITS = {
+    "polygon":  5.0,
+    "chris":    5.0,
+    "yfinance": 2.0,
+}
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class RetryableError(RuntimeError):
+    """Transient vendor failure (throttling, 5xx) worth another attempt."""
+
+
+class EmptyResultError(RetryableError):
+    """Vendor answered with no rows – often a silent throttle, so retried."""
+
+
+class FetchError(RuntimeError):
+    """Every symbol of a `fetch_many` call failed."""
+
+    def __init__(self, vendor: str, failures: dict[str, str]):
+        self.vendor = vendor
+        self.failures = dict(failures)
+        lines = "\n".join(f"  {sym}: {err}" for sym, err in sorted(failures.items()))
+        super().__init__(f"all {len(failures)} symbols failed for {vendor}:\n{lines}")
+
+
+# ---------------------------------------------------------------------
+# 1. Rate limiting
+# ---------------------------------------------------------------------
+class RateLimiter:
+    """Token bucket: at most `rate` acquisitions per second, bursts up to `burst`."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst,
+                                   self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+_LIMITERS: dict[str, RateLimiter] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def get_limiter(vendor: str) -> RateLimiter:
+    """Process-wide limiter for `vendor` (rate from RATE_LIMITS)."""
+    with _LIMITERS_LOCK:
+        if vendor not in _LIMITERS:
+            _LIMITERS[vendor] = RateLimiter(RATE_LIMITS.get(vendor, 5.0))
+        return _LIMITERS[vendor]
+
+
+# ---------------------------------------------------------------------
+# 2. Retry + pooled sessions
+# ---------------------------------------------------------------------
+def with_retry(fn: Callable, *args,
+               attempts: int = 4,
+               backoff: float = 0.5,
+               max_backoff: float = 8.0,
+               retry_on: tuple | None = None,
+               limiter: RateLimiter | None = None,
+               **kwargs):
+    """
+    Call ``fn(*args, **kwargs)``, retrying `retry_on` errors with backoff
+    (default: RetryableError and requests' connection errors / timeouts).
+    """
+    if retry_on is None:
+        retry_on = _default_retry_on()
+    for attempt in range(1, attempts + 1):
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            return fn(*args, **kwargs)
+        except retry_on:
+            if attempt == attempts:
+                raise
+            delay = min(max_backoff, backoff * 2 ** (attempt - 1))
+            time.sleep(delay * (0.5 + random.random() / 2))
+
+
+def _default_retry_on() -> tuple:
+    import requests
+    return (RetryableError, requests.ConnectionError, requests.Timeout)
+
+
+_LOCAL = threading.local()
+
+
+def get_session(pool_size: int = 16) -> requests.Session:
+    """Keep-alive session reused by every request made on this thread."""
+    sess = getattr(_LOCAL, "session", None)
+    if sess is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        sess = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        sess.mount("http://", adapter)
+        sess.mount("https://", adapter)
+        _LOCAL.session = sess
+    return sess
+
+
+def raise_for_status(resp: requests.Response, what: str) -> None:
+    """RetryableError for throttling / 5xx, RuntimeError for other HTTP errors."""
+    if resp.ok:
+        return
+    try:
+        err = resp.json().get("message", resp.text)
+    except Exception:
+        err = resp.text
+    exc = RetryableError if resp.status_code in RETRY_STATUS else RuntimeError
+    raise exc(f"HTTP {resp.status_code} for {what}: {err}")
+
+
+# ---------------------------------------------------------------------
+# 3. Concurrent fan-out
+# ---------------------------------------------------------------------
+def fetch_many(symbols: list[str],
+               fetch_one: Callable[[str], object],
+               vendor: str,
+               max_workers: int = 8,
+               attempts: int = 4,
+               rate_limited: bool = True,
+               require_any: bool = True) -> tuple[dict, dict[str, str]]:
+    """
+    Run ``fetch_one(symbol)`` for every symbol on a thread pool, throttled by
+    the vendor's rate limiter and retried with backoff.  Pass
+    ``rate_limited=False`` when `fetch_one` throttles its own requests.
+
+    Raises FetchError (listing every failure) when all symbols fail, unless
+    ``require_any=False``.
+
+    Returns
+    -------
+    (results, failures)
+        results  : {symbol: fetch_one(symbol)} for successful symbols
+        failures : {symbol: error message} for symbols that gave up
+    """
+    limiter = get_limiter(vendor) if rate_limited else None
+    results: dict = {}
+    failures: dict[str, str] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(with_retry, fetch_one, sym,
+                               attempts=attempts, limiter=limiter): sym
+                   for sym in symbols}
+        for fut in as_completed(futures):
+            sym = futures[fut]
+            try:
+                results[sym] = fut.result()
+            except Exception as e:
+                failures[sym] = f"{type(e).__name__}: {e}"
+    if require_any and symbols and not results:
+        raise FetchError(vendor, failures)
+    for sym, err in failures.items():
+        print(f"Warning: failed to download {sym} from {vendor}: {err}")
+    return results, failures
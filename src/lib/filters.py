@@ -9,3 +9,9 @@ def trim_dates(df: pd.DataFrame) -> pd.DataFrame:
 
 def fill_nas(df: pd.DataFrame) -> pd.DataFrame:
     return df.ffill().dropna()
+
+
+def drop_sparse(df: pd.DataFrame, max_nan: float = 0.10) -> pd.DataFrame:
+    """Drop columns with more than `max_nan` NaNs, forward-fill the rest."""
+    valid_cols = df.columns[df.isnull().mean() <= max_nan]
+    return df[valid_cols].ffill()
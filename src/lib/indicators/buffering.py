@@ -0,0 +1,75 @@
+"""Position buffering / hysteresis stages applied after forecast scaling.
+
+Two ways of not trading on every wiggle of the forecast:
+
+* ``forecast_hysteresis`` – only re-size a position when its forecast moved
+  by more than ``threshold`` (relative) since the previous bar, otherwise hold
+  the last traded position.
+* ``position_buffer`` – Carver’s buffer: hold the current position while it
+  lies within ``target ± width`` and, once outside, trade only to the nearest
+  edge of the buffer.
+
+Both work on the whole (T, N) panel at once; no per-column Python loops.
+"""
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+
+def _wrap(values: np.ndarray, like):
+    if isinstance(like, pd.DataFrame):
+        return pd.DataFrame(values, index=like.index, columns=like.columns)
+    if isinstance(like, pd.Series):
+        return pd.Series(values, index=like.index, name=like.name)
+    return values
+
+
+def hold_unless(values, update_mask):
+    """Sample-and-hold: take ``values[t]`` where ``update_mask[t]`` is True
+    (row 0 is always taken), otherwise repeat the previously taken value.
+    """
+    vals = np.asarray(values, dtype=float)
+    upd = np.asarray(update_mask, dtype=bool).copy()
+    upd[0] = True
+    rows = np.arange(len(vals)).reshape((-1,) + (1,) * (vals.ndim - 1))
+    last = np.maximum.accumulate(np.where(upd, rows, 0), axis=0)
+    if vals.ndim == 1:
+        held = vals[last]
+    else:
+        held = np.take_along_axis(vals, last, axis=0)
+    return _wrap(held, values)
+
+
+def forecast_hysteresis(positions, forecast, threshold: float = 0.05):
+    """Scale ``positions`` by ``forecast`` but only update where the forecast
+    changed by more than ``threshold`` relative to the previous bar.
+    """
+    f = np.asarray(forecast, dtype=float)
+    prev = np.roll(f, 1, axis=0)
+    with np.errstate(invalid="ignore"):
+        rel_change = np.abs(f - prev) / (np.abs(prev) + 1e-12)
+        update = rel_change > threshold
+    update[0] = True
+    scaled = np.asarray(positions, dtype=float) * f
+    return _wrap(hold_unless(scaled, update), positions)
+
+
+def position_buffer(target, width):
+    """Carver position buffer around ``target``.
+
+    ``width`` is the absolute half-width of the no-trade zone (scalar or
+    array broadcastable to ``target``; NaN means no buffer).  Missing
+    targets hold the position.
+    """
+    tgt = np.asarray(target, dtype=float)
+    w = np.broadcast_to(np.nan_to_num(np.abs(np.asarray(width, dtype=float))),
+                        tgt.shape)
+    out = np.empty_like(tgt)
+    held = tgt[0].copy()
+    out[0] = held
+    for t in range(1, len(tgt)):
+        lo, hi = tgt[t] - w[t], tgt[t] + w[t]
+        held = np.where(np.isnan(held), tgt[t], held)
+        held = np.where(np.isnan(tgt[t]), held, np.clip(held, lo, hi))
+        out[t] = held
+    return _wrap(out, target)
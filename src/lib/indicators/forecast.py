@@ -0,0 +1,162 @@
+"""Multi-speed EWMAC forecast engine (Carver’s trend speed ladder).
+
+All speeds are computed for every instrument in one pass and returned as a
+stacked ``(speeds, T, N)`` array:
+
+    1. EWMAs for the unique spans of the ladder (2, 4, 8 … 256), each read
+       from the shared feature store, stacked to ``(spans, T, N)``
+    2. EWMAC_k = EWMA_fast − EWMA_slow by fancy-indexing the stack
+    3. risk-normalise by the instrument’s price-unit vol
+       (price × EW stdev of returns)
+    4. multiply by the per-speed forecast scalar so E|forecast| ≈ 10, cap ±20
+
+Forecast scalars default to Carver's published values, or – for speeds he
+does not publish – to an expanding estimate that only uses bars before t
+(pooled across instruments).  The full-sample estimate is available as
+``scalars="full"`` for in-sample research only: it looks ahead.  Combining
+speeds with forecast weights is a single tensordot.
+"""
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+from lib import features
+
+CARVER_SPEEDS = ((2, 8), (4, 16), (8, 32), (16, 64), (32, 128), (64, 256))
+# Carver’s published scalars, usable instead of the estimated ones
+CARVER_SCALARS = {(2, 8): 10.6, (4, 16): 7.5, (8, 32): 5.3,
+                  (16, 64): 3.75, (32, 128): 2.65, (64, 256): 1.87}
+TARGET_ABS_FORECAST = 10.0
+FORECAST_CAP = 20.0
+VOL_LAMBDA = 0.07           # EW stdev decay, same as the strength overlay
+SCALAR_MIN_PERIODS = 252    # pooled observations before an expanding scalar
+
+
+def _span_alpha(span: int) -> float:
+    return 2.0 / (span + 1)
+
+
+def as_speeds(speeds) -> tuple[tuple[int, int], ...]:
+    """Normalise a speed ladder (e.g. lists of lists from JSON) to hashable pairs."""
+    return tuple((int(f), int(s)) for f, s in speeds)
+
+
+def raw_ewmac_forecasts(prices: pd.DataFrame,
+                        speeds=CARVER_SPEEDS,
+                        vol_lambda: float = VOL_LAMBDA) -> np.ndarray:
+    """Risk-normalised, unscaled EWMACs as a ``(speeds, T, N)`` array."""
+    speeds = as_speeds(speeds)
+    spans = sorted({s for pair in speeds for s in pair})
+    ema = np.stack([features.ewm_mean(prices, _span_alpha(s), on="prices")
+                    .to_numpy(dtype=float) for s in spans])
+    fast = [spans.index(f) for f, _ in speeds]
+    slow = [spans.index(s) for _, s in speeds]
+    macd = ema[fast] - ema[slow]
+
+    pct_sigma = features.ew_std(prices, vol_lambda, adjust=False)
+    vol = (prices * pct_sigma).to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = macd / vol[None]
+    z[~np.isfinite(z)] = np.nan
+    return z
+
+
+def estimate_forecast_scalars(prices: pd.DataFrame,
+                              speeds=CARVER_SPEEDS,
+                              vol_lambda: float = VOL_LAMBDA) -> np.ndarray:
+    """
+    Per-speed scalar  10 / mean|raw forecast|,  pooled over every bar and
+    instrument of `prices` and cached in the feature store.  Uses the
+    whole panel, so only apply it to the bars it was estimated on (e.g. an
+    in-sample slice).
+    """
+    speeds = as_speeds(speeds)
+
+    def compute():
+        raw = raw_ewmac_forecasts(prices, speeds, vol_lambda)
+        mean_abs = np.nanmean(np.abs(raw), axis=(1, 2))
+        scal = np.where(mean_abs > 0, TARGET_ABS_FORECAST / mean_abs, 1.0)
+        return pd.Series(scal, index=[f"{f}/{s}" for f, s in speeds])
+    cached = features.FEATURES.get("forecast_scalars", prices,
+                                   (speeds, vol_lambda), compute)
+    return cached.to_numpy(dtype=float)
+
+
+def expanding_forecast_scalars(raw: np.ndarray,
+                               min_periods: int = SCALAR_MIN_PERIODS) -> np.ndarray:
+    """
+    ``(speeds, T)`` scalars from a raw ``(speeds, T, N)`` stack, where the
+    scalar of bar t only uses the bars before t (pooled over instruments);
+    NaN until `min_periods` observations are available.
+    """
+    absf = np.abs(raw)
+    total = np.nansum(absf, axis=2).cumsum(axis=1)
+    count = (~np.isnan(absf)).sum(axis=2).cumsum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_abs = np.where(count >= min_periods, total / count, np.nan)
+        scal = np.where(mean_abs > 0, TARGET_ABS_FORECAST / mean_abs, np.nan)
+    out = np.full(scal.shape, np.nan)
+    out[:, 1:] = scal[:, :-1]                       # known before bar t
+    return out
+
+
+def ewmac_forecasts(prices: pd.DataFrame,
+                    speeds=CARVER_SPEEDS,
+                    scalars=None,
+                    cap: float = FORECAST_CAP,
+                    vol_lambda: float = VOL_LAMBDA) -> np.ndarray:
+    """
+    Scaled and capped forecasts, ``(speeds, T, N)``; NaNs → 0.
+
+    scalars : None      = "carver" if every speed has a published scalar,
+                          else "expanding"
+              "carver"    published values
+              "expanding" per-bar estimate from the bars before t
+              "full"      full-sample estimate (look-ahead, in-sample only)
+              or an explicit sequence (one per speed)
+    """
+    speeds = as_speeds(speeds)
+    raw = raw_ewmac_forecasts(prices, speeds, vol_lambda)
+    if scalars is None:
+        scalars = ("carver" if all(p in CARVER_SCALARS for p in speeds)
+                   else "expanding")
+    if isinstance(scalars, str):
+        if scalars == "carver":
+            scal = np.array([CARVER_SCALARS[p] for p in speeds])[:, None, None]
+        elif scalars == "expanding":
+            scal = expanding_forecast_scalars(raw)[:, :, None]
+        elif scalars == "full":
+            scal = estimate_forecast_scalars(prices, speeds, vol_lambda)[:, None, None]
+        else:
+            raise ValueError(f"Unknown forecast scalars '{scalars}'")
+    else:
+        scal = np.asarray(scalars, dtype=float).reshape(-1, 1, 1)
+    out = np.clip(raw * scal, -cap, cap)
+    return np.nan_to_num(out, nan=0.0)
+
+
+def combine_forecasts(forecasts: np.ndarray,
+                      weights=None,
+                      fdm: float = 1.0,
+                      cap: float = FORECAST_CAP) -> np.ndarray:
+    """
+    Weighted blend of a ``(speeds, T, N)`` stack → ``(T, N)`` in one
+    tensor contraction, times the forecast diversification multiplier,
+    re-capped at ±cap.  Equal weights when `weights` is None.
+    """
+    n_speeds = forecasts.shape[0]
+    w = (np.full(n_speeds, 1.0 / n_speeds) if weights is None
+         else np.asarray(weights, dtype=float))
+    if w.shape != (n_speeds,):
+        raise ValueError(f"expected {n_speeds} forecast weights, got {w.shape}")
+    return np.clip(np.tensordot(w, forecasts, axes=1) * fdm, -cap, cap)
+
+
+def combined_forecast(prices: pd.DataFrame,
+                      speeds=CARVER_SPEEDS,
+                      weights=None,
+                      fdm: float = 1.0,
+                      scalars=None) -> pd.DataFrame:
+    """Combined multi-speed forecast as a DataFrame shaped like `prices`."""
+    stack = ewmac_forecasts(prices, speeds, scalars)
+    return pd.DataFrame(combine_forecasts(stack, weights, fdm),
+                        index=prices.index, columns=prices.columns)
@@ -0,0 +1,375 @@
+"""Stateful, checkpointable versions of the EW indicators used by the strategies.
+
+Every state object holds one row of per-instrument state and turns
+yesterday’s state + today’s bar into today’s value in O(instruments):
+
+    state = EWMACState(fast_alpha=0.15, slow_alpha=0.03, on="returns")
+    state.warm_up(history)                # or load a saved checkpoint
+    macd_today = state.update(prices_today)
+
+The recursions mirror pandas’ own ``ewm`` kernels (``adjust``, ``bias=False``
+and ``ignore_na=False`` handling included), so a state fed bar by bar matches
+the batch computation to floating-point tolerance.
+
+States save to / load from a single ``.npz`` file (`save_states`,
+`load_states`).
+"""
+from __future__ import annotations
+import json
+
+import numpy as np
+import pandas as pd
+
+ANNUALISATION = np.sqrt(252)
+
+
+def _row(values, n: int | None = None) -> np.ndarray:
+    if isinstance(values, (pd.Series, pd.DataFrame)):
+        values = values.to_numpy(dtype=float)
+    row = np.atleast_1d(np.asarray(values, dtype=float)).ravel()
+    if n is not None and row.shape != (n,):
+        raise ValueError(f"expected a bar of {n} instruments, got {row.shape}")
+    return row
+
+
+class _State:
+    """Base class: generic (de)serialisation of arrays, scalars and sub-states."""
+
+    def _init_arrays(self, n: int) -> None:
+        raise NotImplementedError
+
+    def _ensure(self, n: int) -> None:
+        if getattr(self, "n", None) is None:
+            self.n = n
+            self._init_arrays(n)
+
+    def warm_up(self, history) -> "_State":
+        """Feed every row of `history` (T × N) through `update`."""
+        values = history.to_numpy(dtype=float) if hasattr(history, "to_numpy") else history
+        for row in np.asarray(values, dtype=float).reshape(len(values), -1):
+            self.update(row)
+        return self
+
+    def to_dict(self, prefix: str = "") -> tuple[dict, dict]:
+        arrays, params = {}, {"__class__": type(self).__name__}
+        for key, val in self.__dict__.items():
+            if isinstance(val, _State):
+                sub_arrays, sub_params = val.to_dict(f"{prefix}{key}.")
+                arrays.update(sub_arrays)
+                params[key] = sub_params
+            elif isinstance(val, np.ndarray):
+                arrays[f"{prefix}{key}"] = val
+            else:
+                params[key] = val
+        return arrays, params
+
+    @classmethod
+    def from_dict(cls, arrays: dict, params: dict, prefix: str = "") -> "_State":
+        klass = _STATE_TYPES[params["__class__"]]
+        obj = klass.__new__(klass)
+        for key, val in params.items():
+            if key == "__class__":
+                continue
+            if isinstance(val, dict) and "__class__" in val:
+                val = _State.from_dict(arrays, val, f"{prefix}{key}.")
+            setattr(obj, key, val)
+        for name, arr in arrays.items():
+            if name.startswith(prefix) and "." not in name[len(prefix):]:
+                setattr(obj, name[len(prefix):], np.array(arr))
+        return obj
+
+
+# ---------------------------------------------------------------------
+# 1. Primitive states
+# ---------------------------------------------------------------------
+class PctReturnState(_State):
+    """Simple return vs the previous bar (``pct_change(fill_method=None)``)."""
+
+    def __init__(self, fill: float | None = None):
+        self.fill = fill
+        self.n = None
+
+    def _init_arrays(self, n: int) -> None:
+        self.last = np.full(n, np.nan)
+        self.started = np.zeros(n, dtype=bool)
+
+    def update(self, prices) -> np.ndarray:
+        p = _row(prices)
+        self._ensure(len(p))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ret = np.where(self.started, p / self.last - 1, np.nan)
+        self.last = p
+        self.started[:] = True
+        return ret if self.fill is None else np.where(np.isnan(ret), self.fill, ret)
+
+
+class EWMeanState(_State):
+    """``x.ewm(alpha, adjust).mean()`` one bar at a time."""
+
+    def __init__(self, alpha: float, adjust: bool = False):
+        self.alpha = float(alpha)
+        self.adjust = bool(adjust)
+        self.n = None
+
+    def _init_arrays(self, n: int) -> None:
+        self.mean = np.full(n, np.nan)
+        self.old_wt = np.ones(n)
+
+    def update(self, x) -> np.ndarray:
+        x = _row(x)
+        self._ensure(len(x))
+        new_wt = 1.0 if self.adjust else self.alpha
+        obs = ~np.isnan(x)
+        started = ~np.isnan(self.mean)
+
+        self.old_wt = np.where(started, self.old_wt * (1 - self.alpha), self.old_wt)
+        upd = started & obs
+        with np.errstate(invalid="ignore"):
+            blended = (self.old_wt * self.mean + new_wt * x) / (self.old_wt + new_wt)
+        self.mean = np.where(upd & (self.mean != x), blended, self.mean)
+        self.old_wt = np.where(upd, self.old_wt + new_wt if self.adjust else 1.0,
+                               self.old_wt)
+        self.mean = np.where(~started & obs, x, self.mean)
+        return self.mean.copy()
+
+
+class EWVarState(_State):
+    """``x.ewm(alpha, adjust).var(bias=False)`` one bar at a time."""
+
+    def __init__(self, alpha: float, adjust: bool = True):
+        self.alpha = float(alpha)
+        self.adjust = bool(adjust)
+        self.n = None
+
+    def _init_arrays(self, n: int) -> None:
+        self.mean = np.full(n, np.nan)
+        self.cov = np.zeros(n)
+        self.sum_wt = np.ones(n)
+        self.sum_wt2 = np.ones(n)
+        self.old_wt = np.ones(n)
+        self.nobs = np.zeros(n)
+
+    def update(self, x) -> np.ndarray:
+        x = _row(x)
+        self._ensure(len(x))
+        a, new_wt = self.alpha, (1.0 if self.adjust else self.alpha)
+        decay = 1 - a
+        obs = ~np.isnan(x)
+        started = ~np.isnan(self.mean)
+        self.nobs = self.nobs + obs
+
+        # decay weights for every started column (ignore_na=False)
+        self.sum_wt = np.where(started, self.sum_wt * decay, self.sum_wt)
+        self.sum_wt2 = np.where(started, self.sum_wt2 * decay * decay, self.sum_wt2)
+        self.old_wt = np.where(started, self.old_wt * decay, self.old_wt)
+
+        upd = started & obs
+        with np.errstate(invalid="ignore"):
+            old_mean = self.mean
+            mean = np.where(upd & (old_mean != x),
+                            (self.old_wt * old_mean + new_wt * x) / (self.old_wt + new_wt),
+                            old_mean)
+            d_old, d_new = old_mean - mean, x - mean
+            cov = (self.old_wt * (self.cov + d_old * d_old)
+                   + new_wt * d_new * d_new) / (self.old_wt + new_wt)
+        self.mean = np.where(upd, mean, self.mean)
+        self.cov = np.where(upd, cov, self.cov)
+        sum_wt = self.sum_wt + new_wt
+        sum_wt2 = self.sum_wt2 + new_wt * new_wt
+        old_wt = self.old_wt + new_wt
+        if not self.adjust:
+            sum_wt, sum_wt2, old_wt = sum_wt / old_wt, sum_wt2 / (old_wt * old_wt), np.ones_like(old_wt)
+        self.sum_wt = np.where(upd, sum_wt, self.sum_wt)
+        self.sum_wt2 = np.where(upd, sum_wt2, self.sum_wt2)
+        self.old_wt = np.where(upd, old_wt, self.old_wt)
+        self.mean = np.where(~started & obs, x, self.mean)
+
+        num = self.sum_wt * self.sum_wt
+        den = num - self.sum_wt2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            var = np.where(den > 0, num / den * self.cov, np.nan)
+        return np.where(self.nobs >= 1, var, np.nan)
+
+
+class EWStdState(EWVarState):
+    """``x.ewm(alpha, adjust).std()`` one bar at a time."""
+
+    def update(self, x) -> np.ndarray:
+        var = super().update(x)
+        return np.sqrt(np.where(var < 0, 0.0, var))
+
+
+class RollingStdState(_State):
+    """
+    ``x.rolling(window).std()`` one bar at a time.  Keeps the last `window`
+    bars in a ring buffer and recomputes from it, O(window × instruments)
+    per bar with no running-sum drift.
+    """
+
+    def __init__(self, window: int, min_periods: int | None = None):
+        if window < 2:
+            raise ValueError("window must be >= 2")
+        self.window = int(window)
+        self.min_periods = int(window if min_periods is None else min_periods)
+        self.pos = 0
+        self.n = None
+
+    def _init_arrays(self, n: int) -> None:
+        self.buf = np.full((self.window, n), np.nan)
+
+    def update(self, x) -> np.ndarray:
+        x = _row(x)
+        self._ensure(len(x))
+        self.buf[self.pos] = x
+        self.pos = (self.pos + 1) % self.window
+        count = (~np.isnan(self.buf)).sum(axis=0)
+        out = np.full(len(x), np.nan)
+        ok = (count >= max(self.min_periods, 2))
+        if ok.any():
+            out[ok] = np.nanstd(self.buf[:, ok], axis=0, ddof=1)
+        return out
+
+
+# ---------------------------------------------------------------------
+# 2. Composite states for the strategies / indicators
+# ---------------------------------------------------------------------
+class EWMACState(_State):
+    """
+    EWMA_fast − EWMA_slow (adjust=False) of prices, or of their returns
+    with ``on="returns"`` (``macd_signal`` / ``macd_signal_prices``).
+    """
+
+    def __init__(self, fast_alpha: float, slow_alpha: float, on: str = "prices"):
+        self.on = on
+        self.rets = PctReturnState() if on == "returns" else None
+        self.fast = EWMeanState(fast_alpha)
+        self.slow = EWMeanState(slow_alpha)
+
+    def update(self, prices) -> np.ndarray:
+        x = self.rets.update(prices) if self.rets is not None else _row(prices)
+        return self.fast.update(x) - self.slow.update(x)
+
+
+class TrendMaskState(_State):
+    """Bar-by-bar ``trend_mask``: +1 if MACD > 0, −1 if MACD < −0.3, else 0."""
+
+    def __init__(self, fast_alpha: float = 0.15, slow_alpha: float = 0.03):
+        self.macd = EWMACState(fast_alpha, slow_alpha, on="returns")
+
+    def update(self, prices) -> np.ndarray:
+        macd = self.macd.update(prices)
+        with np.errstate(invalid="ignore"):
+            return np.where(macd > 0, 1, np.where(macd < -0.3, -1, 0)).astype(np.int8)
+
+
+class ReturnVolState(_State):
+    """Annualised EW stdev of zero-filled returns for one decay `alpha`."""
+
+    def __init__(self, alpha: float, adjust: bool = True, annualise: bool = True):
+        self.rets = PctReturnState(fill=0.0)
+        self.std = EWStdState(alpha, adjust)
+        self.annualise = annualise
+
+    def update(self, prices) -> np.ndarray:
+        sigma = self.std.update(self.rets.update(prices))
+        return sigma * ANNUALISATION if self.annualise else sigma
+
+
+class RiskScaledPositionState(_State):
+    """
+    Bar-by-bar ``RiskScaledBuyAndHoldStrategy`` position:
+    target_vol / rolling σ of zero-filled returns (annualised), capped at 5.
+    """
+
+    def __init__(self, target_vol: float = 0.20, vol_window: int = 20):
+        self.target_vol = float(target_vol)
+        self.rets = PctReturnState(fill=0.0)
+        self.std = RollingStdState(vol_window)
+
+    def update(self, prices) -> np.ndarray:
+        sigma = self.std.update(self.rets.update(prices)) * ANNUALISATION
+        with np.errstate(divide="ignore"):
+            return np.minimum(self.target_vol / sigma, 5.0)
+
+
+class VolScaledPositionState(_State):
+    """
+    Bar-by-bar ``MultiAssetStrategyBase.compute_vol_scaled_positions``:
+    1 / (0.7 σ_fast + 0.3 σ_slow), capped at 7, forward-filled, NaN → 0.
+    """
+
+    def __init__(self):
+        self.rets = PctReturnState(fill=0.0)
+        self.fast = EWStdState(1 - np.exp(-1 / 5.0))
+        self.slow = EWStdState(1 - np.exp(-1 / 20.0))
+        self.n = None
+
+    def _init_arrays(self, n: int) -> None:
+        self.last_pos = np.full(n, np.nan)
+
+    def update(self, prices) -> np.ndarray:
+        p = _row(prices)
+        self._ensure(len(p))
+        r = self.rets.update(p)
+        blended = (0.7 * self.fast.update(r) * ANNUALISATION
+                   + 0.3 * self.slow.update(r) * ANNUALISATION)
+        with np.errstate(divide="ignore"):
+            raw = np.minimum(1 / blended, 7.0)
+        self.last_pos = np.where(np.isnan(raw), self.last_pos, raw)
+        return np.nan_to_num(self.last_pos, nan=0.0)
+
+
+class VariableRiskState(_State):
+    """Bar-by-bar ``VariableRiskScaledBuyAndHoldStrategy`` position."""
+
+    def __init__(self, fast_lambda: float = 0.60, slow_lambda: float = 0.97,
+                 max_leverage: float = 7.0):
+        self.rets = PctReturnState(fill=0.0)
+        self.fast = EWVarState(1 - fast_lambda)
+        self.slow = EWVarState(1 - slow_lambda)
+        self.max_leverage = max_leverage
+        self.n = None
+
+    def _init_arrays(self, n: int) -> None:
+        self.last_pos = np.full(n, np.nan)
+
+    def update(self, prices) -> np.ndarray:
+        p = _row(prices)
+        self._ensure(len(p))
+        r = self.rets.update(p)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sigma_fast = np.sqrt(self.fast.update(r)) * ANNUALISATION
+            sigma_slow = np.sqrt(self.slow.update(r)) * ANNUALISATION
+            raw = np.minimum((0.7 * sigma_fast + 0.3 * sigma_slow) / sigma_fast,
+                             self.max_leverage)
+        self.last_pos = np.where(np.isnan(raw), self.last_pos, raw)
+        return self.last_pos.copy()
+
+
+_STATE_TYPES = {cls.__name__: cls for cls in (
+    PctReturnState, EWMeanState, EWVarState, EWStdState, RollingStdState,
+    EWMACState, TrendMaskState, ReturnVolState, RiskScaledPositionState,
+    VolScaledPositionState, VariableRiskState,
+)}
+
+
+# ---------------------------------------------------------------------
+# 3. Checkpoints
+# ---------------------------------------------------------------------
+def save_states(path: str, states: dict[str, _State]) -> None:
+    """Save named states into one ``.npz`` checkpoint."""
+    arrays, meta = {}, {}
+    for name, state in states.items():
+        a, p = state.to_dict(f"{name}/")
+        arrays.update(a)
+        meta[name] = p
+    np.savez(path, __meta__=np.array(json.dumps(meta)), **arrays)
+
+
+def load_states(path: str) -> dict[str, _State]:
+    """Inverse of `save_states`."""
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(str(data["__meta__"]))
+        arrays = {k: data[k] for k in data.files if k != "__meta__"}
+    return {name: _State.from_dict(arrays, params, f"{name}/")
+            for name, params in meta.items()}
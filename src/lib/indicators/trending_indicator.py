@@ -15,6 +15,7 @@ from __future__ import annotations
 import pandas as pd
 import numpy as np
 from typing import Tuple
+from lib import features
 
 # Default lambdas from Carver book (fast ≈ 40‑day half‑life, slow ≈ 160‑day)
 DEFAULT_FAST_LAMBDA = 0.15
@@ -36,10 +37,8 @@ def macd_signal(
     Positive values imply upward trend, negative values downward.
     The magnitude can be interpreted as MACD strength in percent terms.
     """
-    returns = prices.pct_change(fill_method=None)
-    fast    = returns.ewm(alpha=fast_lambda, adjust=False).mean()
-    slow    = returns.ewm(alpha=slow_lambda, adjust=False).mean()
-    return fast - slow
+    # EWMAs of returns come from the shared feature store
+    return features.ewmac(prices, fast_lambda, slow_lambda, on="returns")
 
 def macd_signal_prices(
     prices: pd.DataFrame | pd.Series,
@@ -51,9 +50,7 @@ def macd_signal_prices(
     Positive values imply upward trend, negative values downward.
     The magnitude can be interpreted as MACD strength in percent terms.
     """
-    fast = prices.ewm(alpha=fast_lambda, adjust=False).mean()
-    slow = prices.ewm(alpha=slow_lambda, adjust=False).mean()
-    return fast - slow
+    return features.ewmac(prices, fast_lambda, slow_lambda, on="prices")
 
 def trend_mask(
     prices: pd.DataFrame | pd.Series,
@@ -66,10 +63,13 @@ def trend_mask(
     * +1  → bullish trend (MACD >  threshold)
     * –1  → bearish trend (MACD < –threshold)
     * 0   → no clear trend (|MACD| ≤ threshold)
+
+    Returned as int8 (one byte per cell); NaN MACD maps to 0.
     """
     macd = macd_signal(prices, fast_lambda, slow_lambda)
-    mask = pd.DataFrame(index=macd.index, columns=macd.columns)
-    mask[macd >  0] = 1
-    mask[macd < -0.3] = -1
-    mask = mask.fillna(0)
-    return mask.astype(int)
\ No newline at end of file
+    m = macd.to_numpy()
+    with np.errstate(invalid="ignore"):
+        values = np.select([m > 0, m < -0.3], [1, -1], 0).astype(np.int8)
+    if isinstance(macd, pd.Series):
+        return pd.Series(values, index=macd.index, name=macd.name)
+    return pd.DataFrame(values, index=macd.index, columns=macd.columns)
\ No newline at end of file
@@ -2,20 +2,44 @@
 """
 Pull daily continuous-futures prices from CHRIS (Nasdaq Data Link).
 Bloomberg support can be added later.
+
+Vendor SDKs (nasdaqdatalink, yfinance) and API keys (config.api) are
+imported on first use of that vendor, so importing this module needs
+neither the packages nor the credentials.
 """
 from __future__ import annotations
-import nasdaqdatalink as ndl
-import requests
+import os
 import pandas as pd
 import re
-import yfinance as yf
+from functools import lru_cache
+from typing import Iterator
 
-from config.api import POLYGON_API_KEY, CHRIS_API_KEY
 from config.universe import VENDOR, SYMBOLS, SYMBOLS_POLY, YF_TICKERS
+from lib.fetch import (EmptyResultError, fetch_many, get_limiter,
+                       get_session, raise_for_status, with_retry)
+
+
+@lru_cache(maxsize=None)
+def _ndl():
+    """nasdaqdatalink, keyed with CHRIS_API_KEY on first use."""
+    import nasdaqdatalink as ndl
+    from config.api import CHRIS_API_KEY
+    ndl.ApiConfig.api_key = CHRIS_API_KEY
+    return ndl
+
+
+def _yf():
+    import yfinance as yf
+    return yf
+
+
+def _polygon_key() -> str:
+    from config.api import POLYGON_API_KEY
+    return POLYGON_API_KEY
 
-ndl.ApiConfig.api_key = CHRIS_API_KEY
 
-BASE_URL = "https://api.polygon.io"
+# overridable so the loaders can be pointed at a local stub server
+BASE_URL = os.environ.get("POLYGON_BASE_URL", "https://api.polygon.io")
 
 def _to_polygon_symbol(code: str) -> str:
     """
@@ -32,75 +56,99 @@ def _to_polygon_symbol(code: str) -> str:
     return f"C:{root}"
 
 
-def get_futures_aggregates(symbol: str,
-                           multiplier: int,
-                           timespan: str,
-                           from_date: str,
-                           to_date: str,
-                           adjusted: bool = True,
-                           limit: int = 50000) -> pd.DataFrame:
+_BAR_FIELDS = {"t": "timestamp", "o": "open", "h": "high", "l": "low",
+               "c": "close", "v": "volume"}
+
+
+def _decode_bars(bars: list[dict]) -> pd.DataFrame:
+    """One page of Polygon bars → OHLCV frame (single vectorised timestamp pass)."""
+    df = pd.DataFrame(bars, columns=list(_BAR_FIELDS)).rename(columns=_BAR_FIELDS)
+    df["timestamp"] = pd.to_datetime(df["timestamp"].to_numpy(dtype="int64"), unit="ms")
+    return df.set_index("timestamp")
+
+
+def iter_futures_aggregates(symbol: str,
+                            multiplier: int,
+                            timespan: str,
+                            from_date: str,
+                            to_date: str,
+                            adjusted: bool = True,
+                            limit: int = 50000,
+                            session=None) -> Iterator[pd.DataFrame]:
     """
-    Fetch OHLCV aggregates for a futures symbol via Polygon API.
+    Stream OHLCV aggregates for a futures symbol via Polygon API, one
+    DataFrame per page, following `next_url` until the range is exhausted.
 
-    Returns an empty DataFrame with a DatetimeIndex if no data is returned.
-    Raises RuntimeError on HTTP errors (e.g., 403 for insufficient plan).
+    Every page goes through the Polygon rate limiter and is retried with
+    backoff on throttling / 5xx.  Raises RuntimeError on other HTTP errors
+    (e.g., 403 for insufficient plan).
     """
     url = (
         f"{BASE_URL}/v2/aggs/ticker/{symbol}/range/"
         f"{multiplier}/{timespan}/{from_date}/{to_date}"
     )
+    api_key = _polygon_key()
     params = {
-        "apiKey": POLYGON_API_KEY,
+        "apiKey": api_key,
         "adjusted": str(adjusted).lower(),
         "sort": "asc",
         "limit": limit
     }
-    try:
-        resp = requests.get(url, params=params)
-        resp.raise_for_status()
-    except requests.exceptions.HTTPError as e:
-        # Attempt to extract error message from response
-        try:
-            err = resp.json().get("message", resp.text)
-        except Exception:
-            err = resp.text
-        raise RuntimeError(
-            f"Polygon API error {resp.status_code} for symbol {symbol}: {err}. "
-            f"Check your subscription permissions or timeframe."
-        )
-    bars = resp.json().get("results", [])
-
-    # Transform bars into list of dicts
-    records = [
-        {
-            "timestamp": pd.to_datetime(b["t"], unit="ms"),
-            "open": b["o"],
-            "high": b["h"],
-            "low": b["l"],
-            "close": b["c"],
-            "volume": b["v"]
-        }
-        for b in bars
-    ]
+    session = session or get_session()
+    limiter = get_limiter("polygon")
+
+    def get_page(page_url: str, page_params: dict) -> dict:
+        resp = session.get(page_url, params=page_params, timeout=30)
+        raise_for_status(resp, f"Polygon symbol {symbol} "
+                               f"(check subscription permissions or timeframe)")
+        return resp.json()
+
+    while url:
+        payload = with_retry(get_page, url, params, limiter=limiter)
+        bars = payload.get("results") or []
+        if bars:
+            yield _decode_bars(bars)
+        # next_url already carries the cursor and query; only the key is re-sent
+        url = payload.get("next_url")
+        params = {"apiKey": api_key}
+
+
+def get_futures_aggregates(symbol: str,
+                           multiplier: int,
+                           timespan: str,
+                           from_date: str,
+                           to_date: str,
+                           adjusted: bool = True,
+                           limit: int = 50000,
+                           session=None) -> pd.DataFrame:
+    """
+    Fetch OHLCV aggregates for a futures symbol via Polygon API (all pages).
+
+    Returns an empty DataFrame with a DatetimeIndex if no data is returned.
+    Raises RuntimeError on HTTP errors (e.g., 403 for insufficient plan).
+    """
+    pages = list(iter_futures_aggregates(symbol, multiplier, timespan,
+                                         from_date, to_date, adjusted,
+                                         limit, session))
     # If no data, return empty DataFrame with appropriate index
-    if not records:
+    if not pages:
         empty_index = pd.DatetimeIndex([], name="timestamp")
         return pd.DataFrame([], index=empty_index,
                             columns=["open", "high", "low", "close", "volume"])
-
-    df = pd.DataFrame.from_records(records)
-    df.set_index("timestamp", inplace=True)
-    return df
+    return pd.concat(pages) if len(pages) > 1 else pages[0]
 
 def _chris_single(code: str, field: str = "Settle") -> pd.Series:
-    df = ndl.get(code)[[field]]
+    df = _ndl().get(code)[[field]]
     df.index = pd.to_datetime(df.index)
     return df[field]
 
 
-def _chris_multi(symbols: list[str]) -> pd.DataFrame:
-    frame_dict = {sym.split("_")[-1]: _chris_single("CHRIS/" + sym)
-                  for sym in symbols}
+def _chris_multi(symbols: list[str], max_workers: int = 8) -> pd.DataFrame:
+    """CHRIS settles, one column per root; FetchError if every symbol failed."""
+    fetched, _ = fetch_many(symbols, lambda sym: _chris_single("CHRIS/" + sym),
+                            vendor="chris", max_workers=max_workers)
+    frame_dict = {sym.split("_")[-1]: fetched[sym]
+                  for sym in symbols if sym in fetched}
     return pd.concat(frame_dict, axis=1).sort_index()
 
 
@@ -109,22 +157,28 @@ def _polygon_multi(symbols: list[str],
                    end_date: str,
                    multiplier: int = 1,
                    timespan: str = "day",
-                   adjusted: bool = True) -> pd.DataFrame:
+                   adjusted: bool = True,
+                   max_workers: int = 8) -> pd.DataFrame:
     """
     Fetch multiple futures symbols via Polygon and concat.
     SYMBOLS should contain codes like "C:ES" or specific contract tickers.
+    Failed symbols are reported and left out; FetchError if all failed.
     """
-    dfs = {}
-    for sym in symbols:
-        df = get_futures_aggregates(
+    def fetch_one(sym: str) -> pd.Series:
+        return get_futures_aggregates(
             symbol=sym,
             multiplier=multiplier,
             timespan=timespan,
             from_date=start_date,
             to_date=end_date,
             adjusted=adjusted
-        )
-        dfs[sym] = df["close"]
+        )["close"]
+
+    # pages are throttled and retried inside iter_futures_aggregates
+    fetched, _ = fetch_many(symbols, fetch_one, vendor="polygon",
+                            max_workers=max_workers, attempts=1,
+                            rate_limited=False)
+    dfs = {sym: fetched[sym] for sym in symbols if sym in fetched}
     # align on timestamp index
     return pd.concat(dfs, axis=1).sort_index()
 
@@ -148,29 +202,81 @@ def _polygon_multi(symbols: list[str],
 
 # Map internal SYMBOLS to Yahoo Finance tickers
 
-def load_prices(start_date: str, end_date: str) -> pd.DataFrame:
+def _yf_history(ticker: str, start: str, end: str) -> pd.DataFrame:
+    """
+    Daily bars of one ticker over [start, end) (yfinance's `end` is exclusive).
+
+    Uses a ``yf.Ticker`` per call: ``yf.download`` keeps its results and
+    errors in module-global dicts (``yfinance.shared._DFS`` / ``_ERRORS``),
+    so concurrent calls from `fetch_many`'s threads clobber each other, and
+    it reports failures as an empty frame.  Here errors raise, and an empty
+    answer raises EmptyResultError so it is retried and then reported.
+    """
+    data = _yf().Ticker(ticker).history(start=start, end=end, interval="1d",
+                                        auto_adjust=False, actions=False,
+                                        raise_errors=True)
+    if data is None or data.empty:
+        raise EmptyResultError(f"yfinance returned no bars for {ticker} "
+                               f"{start} → {end}")
+    if data.index.tz is not None:                   # exchange-local midnight
+        data.index = data.index.tz_localize(None)
+    data.index.name = "Date"
+    return data
+
+
+def _yf_close(ticker: str, start_date: str, end_date: str) -> pd.Series:
+    return _yf_history(ticker, start_date, end_date)["Close"].copy()
+
+
+def _ymd(ts) -> str:
+    return pd.Timestamp(ts).strftime("%Y-%m-%d")
+
+
+def fetch_ohlcv(ticker: str, start, end, bracket_days: int = 7) -> pd.DataFrame:
+    """
+    Daily OHLCV bars for one yfinance ticker over the *inclusive* range
+    [start, end].
+
+    An empty answer is double-checked against the `bracket_days` around the
+    range: if the vendor has bars before it and after it (or the range runs
+    up to today), the range really has no bars (holidays) and an empty frame
+    flagged ``attrs["confirmed_empty"]`` is returned.  Otherwise raises
+    EmptyResultError, so the range is retried and reported, never cached
+    as covered.
+    """
+    start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+    try:
+        return _yf_history(ticker, _ymd(start), _ymd(end + pd.Timedelta(days=1)))
+    except EmptyResultError:
+        pad = pd.Timedelta(days=bracket_days)
+        around = _yf_history(ticker, _ymd(start - pad),
+                             _ymd(end + pad + pd.Timedelta(days=1)))
+        live_tail = end >= pd.Timestamp.today().normalize()
+        if not ((around.index < start).any()
+                and (live_tail or (around.index > end).any())):
+            raise
+        empty = around.iloc[:0]
+        empty.attrs["confirmed_empty"] = True
+        return empty
+
+
+def load_prices(start_date: str, end_date: str,
+                tickers: list[str] | None = None,
+                max_workers: int = 8) -> pd.DataFrame:
     """
     Download daily Close prices via yfinance for each ticker in YF_TICKERS.
     Returns a DataFrame indexed by date, columns are the tickers.
+    Failed tickers are reported and kept as empty columns; raises FetchError
+    if every ticker failed.
     """
+    tickers = list(YF_TICKERS if tickers is None else tickers)
+    fetched, _ = fetch_many(tickers,
+                            lambda t: _yf_close(t, start_date, end_date),
+                            vendor="yfinance", max_workers=max_workers)
     closes: dict[str, pd.Series] = {}
 
-    for ticker in YF_TICKERS:
-        try:
-            data = yf.download(
-                ticker,
-                start=start_date,
-                end=end_date,
-                progress=False,
-                auto_adjust=False,
-                actions=False
-            )
-            # Extract Close series if available
-            series = data["Close"].copy()
-        except Exception as e:
-            print(f"Warning: failed to download {ticker}: {e}")
-            series = pd.Series(dtype=float)
-
+    for ticker in tickers:
+        series = fetched.get(ticker, pd.Series(dtype=float))
         # Ensure the series name is the ticker (avoids rename errors)
         series.name = ticker
         closes[ticker] = series
@@ -0,0 +1,234 @@
+# lib/overfitting.py  ───────────────────────────────────────
+"""
+Backtest-overfitting diagnostics for a (T, K) matrix of variant returns.
+
+* ``cscv``            – probability of backtest overfitting (PBO) via
+                        combinatorially symmetric cross-validation
+                        (Bailey, Borwein, López de Prado & Zhu)
+* ``deflated_sharpe`` – Sharpe ratio deflated for the number of variants
+                        tried and for non-normal returns (Bailey & López
+                        de Prado)
+
+CSCV cuts history into S equal blocks and, for every choice of S/2 blocks as
+in-sample, picks the best in-sample variant and looks up its out-of-sample
+rank.  Instead of re-slicing returns C(S, S/2) times, per-block sums / sums
+of squares are computed once; the in-sample statistics of a batch of
+combinations are a single (C, S) @ (S, K) product and the out-of-sample ones
+are the remainder, so the work is a few matmuls and (C, K) comparisons.
+Large combination sets can be split across a process pool.
+"""
+from __future__ import annotations
+import itertools
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+EULER_GAMMA = 0.5772156649015329
+_NORMAL = NormalDist()
+
+
+def _as_2d(x) -> np.ndarray:
+    if isinstance(x, (pd.DataFrame, pd.Series)):
+        x = x.to_numpy(dtype=float)
+    arr = np.asarray(x, dtype=float)
+    return arr.reshape(len(arr), -1)
+
+
+# ---------------------------------------------------------------------
+# 1. CSCV / PBO
+# ---------------------------------------------------------------------
+def block_stats(returns, n_blocks: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Per-block (count, Σr, Σr²) of a (T, K) matrix cut into `n_blocks` equal
+    consecutive blocks; trailing bars that do not fill a block are dropped.
+    NaNs count as missing.
+    """
+    r = _as_2d(returns)
+    size = len(r) // n_blocks
+    if size < 2:
+        raise ValueError(f"{len(r)} bars is too short for {n_blocks} blocks")
+    r = r[:size * n_blocks].reshape(n_blocks, size, -1)
+    valid = ~np.isnan(r)
+    r = np.where(valid, r, 0.0)
+    return valid.sum(axis=1).astype(float), r.sum(axis=1), (r * r).sum(axis=1)
+
+
+def _sharpe_from_sums(n, s1, s2):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = s1 / n
+        var = (s2 - s1 * mean) / (n - 1)
+        return mean / np.sqrt(np.maximum(var, 0.0))
+
+
+def _combination_batches(n_blocks: int, chunk: int):
+    """
+    (≤ chunk, n_blocks/2) arrays of in-sample block indices, walking one
+    ``combinations`` generator of n_blocks choose n_blocks/2 exactly once.
+    """
+    combos = itertools.combinations(range(n_blocks), n_blocks // 2)
+    while True:
+        rows = np.array(list(itertools.islice(combos, chunk)), dtype=np.intp)
+        if not len(rows):
+            return
+        yield rows
+
+
+def _combination_matrix(rows: np.ndarray, n_blocks: int) -> np.ndarray:
+    """0/1 (C, n_blocks) in-sample indicator of a batch of combinations."""
+    mat = np.zeros((len(rows), n_blocks))
+    np.put_along_axis(mat, rows, 1.0, axis=1)
+    return mat
+
+
+def _cscv_chunk(stats, n_blocks: int, combos: np.ndarray) -> dict:
+    n, s1, s2 = stats
+    M = _combination_matrix(combos, n_blocks)
+    is_n, is_s1, is_s2 = M @ n, M @ s1, M @ s2
+    is_sr = _sharpe_from_sums(is_n, is_s1, is_s2)
+    oos_sr = _sharpe_from_sums(n.sum(0) - is_n, s1.sum(0) - is_s1, s2.sum(0) - is_s2)
+
+    rows = np.arange(len(M))
+    best = np.argmax(np.where(np.isnan(is_sr), -np.inf, is_sr), axis=1)
+    chosen = oos_sr[rows, best]
+    others = np.where(np.isnan(oos_sr), -np.inf, oos_sr)
+    below = (others < chosen[:, None]).sum(axis=1)
+    ties = (others == chosen[:, None]).sum(axis=1)
+    rank = below + (ties + 1) / 2                       # 1 … K, ties averaged
+    rank = np.where(np.isnan(chosen), 1.0, rank)        # no OOS Sharpe = worst
+    return {"is_sharpe": is_sr[rows, best], "oos_sharpe": chosen, "rank": rank}
+
+
+def cscv(returns,
+         n_blocks: int = 16,
+         workers: int | None = 1,
+         chunk: int = 4096) -> dict:
+    """
+    Parameters
+    ----------
+    returns  : (T, K) per-bar returns, one column per variant
+    n_blocks : S, even; C(S, S/2) combinations are evaluated
+    workers  : processes for the combination batches (None = os.cpu_count(),
+               1 = run in-process)
+    chunk    : combinations per batch
+
+    Returns
+    -------
+    dict
+        pbo          : share of combinations whose IS-best variant ranks in
+                       the bottom half out-of-sample (logit ≤ 0)
+        logits       : log(ω / (1 − ω)),  ω = OOS rank / (K + 1)
+        is_sharpe, oos_sharpe : per-bar Sharpe of the IS-best variant
+        prob_oos_loss: share of combinations with OOS Sharpe < 0
+        degradation  : slope of OOS on IS Sharpe across combinations
+
+    An IS-best variant without an OOS Sharpe (no or flat OOS returns) counts
+    as a loss: it ranks last and adds to both `pbo` and `prob_oos_loss`.
+    """
+    if n_blocks % 2:
+        raise ValueError("n_blocks must be even")
+    r = _as_2d(returns)
+    K = r.shape[1]
+    stats = block_stats(r, n_blocks)
+    total = math.comb(n_blocks, n_blocks // 2)
+    batches = _combination_batches(n_blocks, chunk)
+
+    if workers == 1 or total <= chunk:
+        parts = [_cscv_chunk(stats, n_blocks, rows) for rows in batches]
+    else:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            parts = list(pool.map(_cscv_chunk, itertools.repeat(stats),
+                                  itertools.repeat(n_blocks), batches))
+
+    out = {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+    omega = out.pop("rank") / (K + 1)
+    logits = np.log(omega / (1 - omega))
+    ok = np.isfinite(out["is_sharpe"]) & np.isfinite(out["oos_sharpe"])
+    slope = (np.polyfit(out["is_sharpe"][ok], out["oos_sharpe"][ok], 1)[0]
+             if ok.sum() > 1 else np.nan)
+    return {
+        "pbo": float(np.mean(logits <= 0)),
+        "logits": logits,
+        "is_sharpe": out["is_sharpe"],
+        "oos_sharpe": out["oos_sharpe"],
+        "prob_oos_loss": float(np.mean(~(out["oos_sharpe"] >= 0))),
+        "degradation": float(slope),
+        "n_combinations": total,
+    }
+
+
+# ---------------------------------------------------------------------
+# 2. Deflated Sharpe ratio
+# ---------------------------------------------------------------------
+def expected_max_sharpe(sr_var: float, trials: int) -> float:
+    """E[max SR] of `trials` independent zero-skill variants (per bar)."""
+    if trials < 2:
+        return 0.0
+    z1 = _NORMAL.inv_cdf(1 - 1 / trials)
+    z2 = _NORMAL.inv_cdf(1 - 1 / (trials * math.e))
+    return math.sqrt(sr_var) * ((1 - EULER_GAMMA) * z1 + EULER_GAMMA * z2)
+
+
+def deflated_sharpe(returns,
+                    trials: int | None = None,
+                    annualization: int = 252) -> pd.DataFrame:
+    """
+    Probabilistic and deflated Sharpe ratio of every column.
+
+    The benchmark SR₀ is the expected maximum Sharpe among `trials` (default
+    K) skill-less variants with the cross-sectional variance of the observed
+    Sharpes; DSR = P(true SR > SR₀) allowing for skew and kurtosis.
+
+    Returns
+    -------
+    DataFrame (K rows): sharpe (annualised), psr (vs 0), dsr, sr0 (annualised)
+    """
+    r = _as_2d(returns)
+    cols = returns.columns if isinstance(returns, pd.DataFrame) else range(r.shape[1])
+    valid = ~np.isnan(r)
+    n = valid.sum(axis=0).astype(float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.where(valid, r, 0.0).sum(axis=0) / n
+        d = np.where(valid, r - mean, 0.0)
+        m2 = (d * d).sum(axis=0) / n
+        sr = mean / np.sqrt(m2 * n / (n - 1))
+        skew = (d ** 3).sum(axis=0) / n / m2 ** 1.5
+        kurt = (d ** 4).sum(axis=0) / n / m2 ** 2
+
+    trials = trials or r.shape[1]
+    sr_var = float(np.nanvar(sr, ddof=1)) if np.isfinite(sr).sum() > 1 else 0.0
+    sr0 = expected_max_sharpe(sr_var, trials)
+
+    def prob(benchmark):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = ((sr - benchmark) * np.sqrt(n - 1)
+                 / np.sqrt(1 - skew * sr + (kurt - 1) / 4 * sr ** 2))
+        return np.array([_NORMAL.cdf(v) if np.isfinite(v) else np.nan for v in z])
+
+    return pd.DataFrame({
+        "sharpe": sr * np.sqrt(annualization),
+        "psr": prob(0.0),
+        "dsr": prob(sr0),
+        "sr0": sr0 * np.sqrt(annualization),
+    }, index=pd.Index(cols))
+
+
+def overfitting_report(returns, n_blocks: int = 16,
+                       workers: int | None = 1, trials: int | None = None) -> dict:
+    """PBO summary plus the deflated Sharpe of the best full-sample variant."""
+    res = cscv(returns, n_blocks, workers)
+    dsr = deflated_sharpe(returns, trials)
+    best = dsr["sharpe"].idxmax()
+    return {
+        "pbo": res["pbo"],
+        "prob_oos_loss": res["prob_oos_loss"],
+        "degradation": res["degradation"],
+        "n_combinations": res["n_combinations"],
+        "best_variant": best,
+        "best_sharpe": float(dsr.loc[best, "sharpe"]),
+        "best_dsr": float(dsr.loc[best, "dsr"]),
+        "sr0": float(dsr.loc[best, "sr0"]),
+    }
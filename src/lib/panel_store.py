@@ -0,0 +1,175 @@
+# lib/panel_store.py  ───────────────────────────────────────
+"""
+Columnar OHLCV panel store, partitioned by symbol and year.
+
+Layout (hive partitioning, symbols URI-encoded)
+------
+<root>/symbol=<SYM>/year=<YYYY>/data.parquet    date + OHLCV columns
+<root>/_symbols.json                            symbols in the order written
+
+Reads go through ``pyarrow.dataset`` so only the needed bytes are touched:
+
+* symbol / year partitions outside the request are never opened
+* the date range is pushed down to parquet row-group statistics
+* only the requested fields are decoded (column projection)
+* ``memory_map=True`` maps the files instead of reading them into buffers
+* ``dtype=np.float32`` returns a compact panel (half the memory)
+
+A narrow backtest window over a large universe therefore costs roughly the
+size of that window, not of the whole history.
+
+The dataset is opened with one fixed schema (`SCHEMA`) rather than the one
+pyarrow infers from the first file, so a field missing from some symbols
+reads as NaN instead of disappearing.  Panels keep the requested symbol
+order, or the order symbols were first written.
+"""
+from __future__ import annotations
+import json
+import os
+from urllib.parse import quote, unquote
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+
+FIELDS = ("Open", "High", "Low", "Close", "Volume")
+_PARTITION_SCHEMA = pa.schema([("symbol", pa.string()), ("year", pa.int32())])
+_PARTITIONING = ds.partitioning(_PARTITION_SCHEMA, flavor="hive")
+SCHEMA = pa.unify_schemas([
+    pa.schema([("date", pa.timestamp("ns"))] + [(f, pa.float64()) for f in FIELDS]),
+    _PARTITION_SCHEMA,
+])
+_MANIFEST = "_symbols.json"     # leading "_": skipped by pyarrow.dataset
+
+
+class PanelStore:
+    def __init__(self, root: str = "data/panel"):
+        self.root = root
+
+    # --- bookkeeping ---------------------------------------------------
+    def _dir(self, symbol: str, year: int) -> str:
+        return os.path.join(self.root, f"symbol={quote(symbol, safe='')}", f"year={year}")
+
+    def exists(self) -> bool:
+        return os.path.isdir(self.root) and bool(self.symbols())
+
+    def symbols(self) -> list[str]:
+        """
+        Symbols present in the store (from the directory names only), in the
+        order they were first written; unlisted ones follow, sorted.
+        """
+        if not os.path.isdir(self.root):
+            return []
+        present = {unquote(d.split("=", 1)[1]) for d in os.listdir(self.root)
+                   if d.startswith("symbol=")}
+        listed = [sym for sym in self._manifest() if sym in present]
+        return listed + sorted(present.difference(listed))
+
+    def _manifest(self) -> list[str]:
+        path = os.path.join(self.root, _MANIFEST)
+        if not os.path.exists(path):
+            return []
+        with open(path) as fh:
+            return json.load(fh)
+
+    def _record_symbols(self, symbols: list[str]) -> None:
+        order = self._manifest()
+        new = [sym for sym in symbols if sym not in set(order)]
+        if not new:
+            return
+        os.makedirs(self.root, exist_ok=True)
+        path = os.path.join(self.root, _MANIFEST)
+        with open(path + ".tmp", "w") as fh:
+            json.dump(order + new, fh)
+        os.replace(path + ".tmp", path)
+
+    # --- write ---------------------------------------------------------
+    def write(self, bars: dict[str, pd.DataFrame]) -> None:
+        """
+        Upsert OHLCV bars ({symbol: DataFrame with DatetimeIndex}).  Only the
+        year partitions touched by the new bars are rewritten; rows already
+        stored for those years are kept unless replaced by a newer bar.
+        New symbols are appended to the store's symbol order.
+        """
+        written = []
+        for sym, frame in bars.items():
+            if frame is None or frame.empty:
+                continue
+            cols = [c for c in FIELDS if c in frame.columns]
+            frame = frame[cols].astype(float)
+            frame.index = pd.DatetimeIndex(frame.index).tz_localize(None).rename("date")
+            for year, part in frame.groupby(frame.index.year):
+                path = os.path.join(self._dir(sym, year), "data.parquet")
+                if os.path.exists(path):
+                    old = pd.read_parquet(path).set_index("date")
+                    part = pd.concat([old, part])
+                    part = part[~part.index.duplicated(keep="last")]
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                part.sort_index().reset_index().to_parquet(path, index=False)
+            written.append(sym)
+        self._record_symbols(written)
+
+    # --- read ----------------------------------------------------------
+    def _dataset(self, memory_map: bool) -> ds.Dataset:
+        return ds.dataset(self.root, format="parquet", schema=SCHEMA,
+                          partitioning=_PARTITIONING,
+                          filesystem=pafs.LocalFileSystem(use_mmap=memory_map))
+
+    def read(self, symbols: list[str] | None = None,
+             start=None, end=None,
+             fields: tuple[str, ...] = ("Close",),
+             memory_map: bool = False) -> pd.DataFrame:
+        """Long frame [date, symbol, *fields] with partition/date/column pushdown."""
+        dataset = self._dataset(memory_map)
+        flt = None
+
+        def _and(a, b):
+            return b if a is None else a & b
+
+        if symbols is not None:
+            flt = _and(flt, ds.field("symbol").isin(list(symbols)))
+        if start is not None:
+            start = pd.Timestamp(start)
+            flt = _and(flt, (ds.field("year") >= start.year)
+                       & (ds.field("date") >= pa.scalar(start, pa.timestamp("ns"))))
+        if end is not None:
+            end = pd.Timestamp(end)
+            flt = _and(flt, (ds.field("year") <= end.year)
+                       & (ds.field("date") <= pa.scalar(end, pa.timestamp("ns"))))
+        cols = ["date", "symbol"] + [f for f in fields if f in SCHEMA.names]
+        return dataset.to_table(columns=cols, filter=flt).to_pandas()
+
+    def panel(self, field: str = "Close",
+              symbols: list[str] | None = None,
+              start=None, end=None,
+              memory_map: bool = False,
+              dtype=np.float64) -> pd.DataFrame:
+        """
+        Wide panel of one field (index = date, columns = symbols in the
+        requested order, else the store's `symbols()` order).
+        """
+        long = self.read(symbols, start, end, (field,), memory_map)
+        wide = long.pivot(index="date", columns="symbol", values=field).sort_index()
+        wide.index.name = None
+        wide.columns.name = None
+        order = list(symbols) if symbols is not None else self.symbols()
+        return wide.reindex(columns=order).astype(dtype)
+
+
+def load_panel(start=None, end=None,
+               field: str = "Close",
+               symbols: list[str] | None = None,
+               store: str = "data/panel",
+               fallback: str = "data/panel.parquet",
+               memory_map: bool = False,
+               dtype=np.float64) -> pd.DataFrame:
+    """
+    Price panel for [start, end] from the partitioned store, or – if no
+    store has been built yet – from the legacy wide parquet file.
+    """
+    ps = PanelStore(store)
+    if ps.exists():
+        return ps.panel(field, symbols, start, end, memory_map, dtype)
+    return pd.read_parquet(fallback, columns=symbols).loc[start:end].astype(dtype)
@@ -0,0 +1,92 @@
+# lib/precision.py  ─────────────────────────────────────────
+"""
+Compact precision mode: float32 panels, int8 masks, float64 accumulators.
+
+``precision="float32"`` halves the memory of every price / return /
+position panel (and of `rolling_cov` stacks when asked for).  Running sums and
+products that compound over the whole history (equity, covariance
+accumulators, portfolio variance) are still carried in float64, so the
+drift against the float64 pipeline stays at float32 rounding level instead
+of growing with the number of bars.
+
+Use `drift_report` to check that drift for a given universe: outputs are
+expected to stay within `DRIFT_TOL` relative (max |Δ| / max |reference|,
+~1000 float32 ulps) with the same NaN cells.
+"""
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+PRECISIONS = {"float64": np.float64, "float32": np.float32}
+DRIFT_TOL = 1e-4
+
+
+def resolve_dtype(precision) -> np.dtype:
+    """"float64" / "float32" (or a numpy float dtype) → np.dtype."""
+    if isinstance(precision, str):
+        if precision not in PRECISIONS:
+            raise ValueError(f"precision must be one of {sorted(PRECISIONS)}, "
+                             f"got '{precision}'")
+        precision = PRECISIONS[precision]
+    return np.dtype(precision)
+
+
+def as_compact(frame, precision="float32"):
+    """Cast a panel (or array) to `precision`; a no-op if it already is."""
+    dtype = resolve_dtype(precision)
+    if isinstance(frame, (pd.DataFrame, pd.Series)):
+        return frame if (np.asarray(frame.dtypes) == dtype).all() else frame.astype(dtype)
+    return np.asarray(frame, dtype=dtype)
+
+
+def nbytes(obj) -> int:
+    """Memory held by the values of a panel or array (index excluded)."""
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=False).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=False))
+    return int(getattr(obj, "nbytes", 0))
+
+
+def drift_report(reference: dict, compact: dict,
+                 tol: float = DRIFT_TOL) -> pd.DataFrame:
+    """
+    Accuracy and memory of compact outputs against their float64 reference.
+
+    Parameters
+    ----------
+    reference, compact : {name: panel / array / scalar} with matching keys
+    tol                : relative tolerance for the `ok` column
+
+    Returns
+    -------
+    pd.DataFrame  one row per name:
+        max_abs   largest absolute difference
+        max_rel   max_abs / max |reference|
+        rmse      root-mean-square difference
+        nan_diff  cells NaN in exactly one of the two
+        mb_ref, mb_compact  value memory in MB (NaN for scalars)
+        ok        max_abs ≤ tol × max |reference| and nan_diff == 0
+    """
+    rows = {}
+    for name, ref in reference.items():
+        cmp_ = compact[name]
+        a = np.asarray(ref, dtype=np.float64)
+        b = np.asarray(cmp_, dtype=np.float64)
+        if a.shape != b.shape:
+            raise ValueError(f"'{name}': shapes {a.shape} and {b.shape} differ")
+        both = ~(np.isnan(a) | np.isnan(b))
+        diff = np.abs(a - b)[both]
+        scale = np.abs(a[both]).max() if both.any() else np.nan
+        max_abs = diff.max() if diff.size else 0.0
+        nan_diff = int((np.isnan(a) != np.isnan(b)).sum())
+        rows[name] = {
+            "max_abs":    max_abs,
+            "max_rel":    max_abs / scale if scale else np.nan,
+            "rmse":       float(np.sqrt(np.mean(diff ** 2))) if diff.size else 0.0,
+            "nan_diff":   nan_diff,
+            "mb_ref":     nbytes(ref) / 2**20 if np.ndim(ref) else np.nan,
+            "mb_compact": nbytes(cmp_) / 2**20 if np.ndim(cmp_) else np.nan,
+            "ok":         bool(max_abs <= tol * np.nan_to_num(scale) and nan_diff == 0),
+        }
+    return pd.DataFrame.from_dict(rows, orient="index")
@@ -0,0 +1,241 @@
+# lib/results_store.py  ─────────────────────────────────────
+"""
+Appendable, columnar store for backtest results.
+
+Layout (one directory per run; appending a run never rewrites another)
+------
+<root>/<run_id>/run.parquet          one-row catalog entry
+                                     run_id, created, strategy, params (JSON),
+                                     params_key, meta (JSON)
+<root>/<run_id>/metrics.parquet      index = symbol ("portfolio" for
+                                     portfolio-level runs), one column per metric
+<root>/<run_id>/series/part-NNNNN.parquet
+                                     long series: date, symbol, then one column
+                                     per series (portfolio_return, equity_curve,
+                                     strategy_return …)
+
+Series are stored long – (date, symbol) rows, series as columns – so a
+10 000-symbol detail is 2 + k columns instead of a 2·N-wide MultiIndex, and
+reading one series decodes only that column.  Several writers (e.g. the
+per-symbol runner's workers) can add partitions to the same run in parallel.
+
+Runs are keyed by run_id; `runs()` filters the catalog by strategy and
+params (matched on a hash of the canonical params JSON).
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+PORTFOLIO = "portfolio"     # symbol label of portfolio-level rows
+
+
+def params_json(params: dict | None) -> str:
+    """Canonical JSON of a params dict (sorted keys)."""
+    return json.dumps(params or {}, sort_keys=True, default=str)
+
+
+def params_key(params: dict | None) -> str:
+    return hashlib.blake2b(params_json(params).encode(), digest_size=8).hexdigest()
+
+
+def strategy_params(strategy) -> dict:
+    """Public attributes of a strategy instance (its constructor params)."""
+    return {k: v for k, v in vars(strategy).items() if not k.startswith("_")}
+
+
+def series_long(index, symbols, series: dict[str, np.ndarray]) -> pd.DataFrame:
+    """
+    Long (date, symbol, *series) frame from (T, N) arrays, row-major so
+    each date's symbols are contiguous.  Symbols are categorical.
+    """
+    index = pd.DatetimeIndex(index)
+    symbols = [str(s) for s in symbols]
+    T, N = len(index), len(symbols)
+    out = {"date": np.repeat(index.to_numpy(), N),
+           "symbol": pd.Categorical.from_codes(np.tile(np.arange(N), T), symbols)}
+    for name, values in series.items():
+        out[name] = np.asarray(values).reshape(T, N).ravel()
+    return pd.DataFrame(out)
+
+
+def write_series_part(path: str, frame: pd.DataFrame) -> None:
+    """Write one long series partition (see `series_long`)."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pq.write_table(pa.Table.from_pandas(frame, preserve_index=False), path)
+
+
+class ResultsStore:
+    def __init__(self, root: str = "results/store"):
+        self.root = root
+
+    # --- bookkeeping ---------------------------------------------------
+    def run_dir(self, run_id: str) -> str:
+        return os.path.join(self.root, run_id)
+
+    def series_dir(self, run_id: str) -> str:
+        """Partition directory of a run's series (for parallel writers)."""
+        return os.path.join(self.run_dir(run_id), "series")
+
+    def run_ids(self) -> list[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(d for d in os.listdir(self.root)
+                      if os.path.exists(os.path.join(self.root, d, "run.parquet")))
+
+    @staticmethod
+    def new_run_id(strategy: str) -> str:
+        return f"{strategy}-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+    # --- write ---------------------------------------------------------
+    def append(self, strategy: str,
+               params: dict | None = None,
+               series: pd.DataFrame | None = None,
+               metrics: pd.DataFrame | dict | None = None,
+               run_id: str | None = None,
+               overwrite: bool = False,
+               **meta) -> str:
+        """
+        Add one run and return its run_id.
+
+        Parameters
+        ----------
+        series   : portfolio-level DataFrame (index = date, columns = series),
+                   or an already long (date, symbol, *series) frame
+        metrics  : dict of portfolio metrics, or DataFrame indexed by symbol
+        run_id   : default `new_run_id(strategy)`; an existing run with the
+                   same id raises unless `overwrite`
+        meta     : extra catalog fields (tc, start, end, …), stored as JSON
+
+        With `series=None`, partitions already written to `series_dir(run_id)`
+        (e.g. by the parallel runner) are kept as the run's series.
+        """
+        run_id = run_id or self.new_run_id(strategy)
+        path = self.run_dir(run_id)
+        if os.path.exists(os.path.join(path, "run.parquet")):
+            if not overwrite:
+                raise FileExistsError(f"run '{run_id}' already exists in {self.root}")
+            if series is not None:
+                self.remove(run_id)
+        os.makedirs(path, exist_ok=True)
+
+        if series is not None:
+            if "symbol" not in series.columns:
+                series = series.rename_axis("date").reset_index()
+                series.insert(1, "symbol", PORTFOLIO)
+            write_series_part(os.path.join(self.series_dir(run_id), "part-00000.parquet"),
+                              series)
+        if metrics is not None:
+            if isinstance(metrics, dict):
+                metrics = pd.DataFrame([metrics], index=[PORTFOLIO])
+            metrics = metrics.copy()
+            metrics.index = metrics.index.astype(str).rename("symbol")
+            metrics.to_parquet(os.path.join(path, "metrics.parquet"))
+
+        entry = pd.DataFrame([{
+            "run_id": run_id,
+            "created": pd.Timestamp.now(),
+            "strategy": strategy,
+            "params": params_json(params),
+            "params_key": params_key(params),
+            "meta": json.dumps(meta, sort_keys=True, default=str),
+        }])
+        # catalog entry last: a run is only listed once it is complete
+        entry.to_parquet(os.path.join(path, "run.parquet"), index=False)
+        return run_id
+
+    def remove(self, run_id: str) -> None:
+        """Delete a run (catalog entry, metrics and series)."""
+        shutil.rmtree(self.run_dir(run_id), ignore_errors=True)
+
+    # --- read ----------------------------------------------------------
+    def runs(self, strategy: str | None = None,
+             params: dict | None = None) -> pd.DataFrame:
+        """Catalog (one row per run, meta fields expanded), oldest first."""
+        files = [os.path.join(self.root, r, "run.parquet") for r in self.run_ids()]
+        if not files:
+            return pd.DataFrame(columns=["run_id", "created", "strategy",
+                                         "params", "params_key"])
+        cat = ds.dataset(files, format="parquet").to_table().to_pandas()
+        if strategy is not None:
+            cat = cat[cat["strategy"] == strategy]
+        if params is not None:
+            cat = cat[cat["params_key"] == params_key(params)]
+        meta = pd.DataFrame([json.loads(m) for m in cat["meta"]], index=cat.index)
+        cat = pd.concat([cat.drop(columns="meta"), meta], axis=1)
+        return cat.sort_values("created").reset_index(drop=True)
+
+    def latest(self, strategy: str, params: dict | None = None) -> str:
+        """run_id of the most recent run of `strategy` (and `params`)."""
+        cat = self.runs(strategy, params)
+        if cat.empty:
+            raise KeyError(f"no run of '{strategy}' with params {params_json(params)}")
+        return cat["run_id"].iloc[-1]
+
+    def read_series(self, run_id: str,
+                    series: list[str] | None = None,
+                    symbols: list[str] | None = None,
+                    start=None, end=None,
+                    wide: bool = False) -> pd.DataFrame:
+        """
+        Series of one run with column projection and symbol / date pushdown.
+
+        wide=False : long frame [date, symbol, *series]
+        wide=True  : one series (exactly one name in `series`) pivoted to
+                     index = date, columns = symbols; portfolio runs come
+                     back as a single column
+        """
+        dataset = ds.dataset(self.series_dir(run_id), format="parquet")
+        names = [n for n in dataset.schema.names if n not in ("date", "symbol")]
+        if series is not None:
+            missing = set(series) - set(names)
+            if missing:
+                raise KeyError(f"run '{run_id}' has no series {sorted(missing)}")
+            names = list(series)
+        flt = None
+
+        def _and(a, b):
+            return b if a is None else a & b
+
+        if symbols is not None:
+            flt = _and(flt, ds.field("symbol").isin([str(s) for s in symbols]))
+        if start is not None:
+            flt = _and(flt, ds.field("date") >= pa.scalar(pd.Timestamp(start), pa.timestamp("ns")))
+        if end is not None:
+            flt = _and(flt, ds.field("date") <= pa.scalar(pd.Timestamp(end), pa.timestamp("ns")))
+        long = (dataset.to_table(columns=["date", "symbol"] + names, filter=flt)
+                .to_pandas().sort_values("date", kind="stable"))   # keeps symbol order
+        if not wide:
+            return long.reset_index(drop=True)
+        if len(names) != 1:
+            raise ValueError("wide=True needs exactly one series")
+        out = long.pivot(index="date", columns="symbol", values=names[0])
+        out.index.name = None
+        out.columns = out.columns.astype(str)
+        out.columns.name = None
+        if symbols is not None:
+            out = out.reindex(columns=[str(s) for s in symbols])
+        return out
+
+    def read_metrics(self, run_ids: list[str] | str | None = None,
+                     metrics: list[str] | None = None) -> pd.DataFrame:
+        """Metrics of the given runs (default all), indexed by (run_id, symbol)."""
+        if isinstance(run_ids, str):
+            run_ids = [run_ids]
+        parts = {}
+        for rid in run_ids if run_ids is not None else self.run_ids():
+            path = os.path.join(self.run_dir(rid), "metrics.parquet")
+            if os.path.exists(path):
+                parts[rid] = pd.read_parquet(path, columns=metrics)
+        if not parts:
+            return pd.DataFrame()
+        return pd.concat(parts, names=["run_id", "symbol"])
@@ -0,0 +1,194 @@
+# lib/robustness.py  ────────────────────────────────────────
+"""
+Block-bootstrap robustness test for any strategy in STRATEGY_REGISTRY.
+
+A single backtest is one draw from history; picking strategies on it is
+fitting the sample.  Here the daily return panel is resampled with the
+stationary bootstrap (Politis & Romano: blocks of geometric length, mean
+`mean_block`, rows resampled jointly so cross-asset correlation survives),
+turned back into synthetic price paths, and the strategy + backtest kernel
+are re-run on every path.  The result is a distribution of Sharpe, CAGR,
+drawdown … instead of a single equity curve.
+
+* Paths are processed in chunks on a process pool; the price panel is
+  shared once via shared memory (``lib.shared_panel``).
+* Every path has its own child ``SeedSequence``, so results are identical
+  for a given seed whatever the worker count or chunk size.
+* Chunk size follows from `max_bytes`, a cap on the memory taken by the
+  paths being simulated at any one time across all workers – the chunk's
+  wide arrays plus one strategy run (its (T, N) temporaries and (N, N)
+  covariance state) per worker.
+* Every path is a new panel, so its features can never be reused: the
+  worker's feature store is cleared after each path instead of filling
+  its LRU.
+* Within a chunk all paths go through the backtest kernel and the metrics
+  engine as one wide (T, paths × N) matrix.
+"""
+from __future__ import annotations
+import os
+from concurrent.futures import as_completed
+
+import numpy as np
+import pandas as pd
+
+from lib import features
+from lib.backtester.kernel import run_backtest_kernel
+from lib.backtester.metrics import summarize
+from lib.shared_panel import attached_panel, panel_pool
+
+DEFAULT_MAX_BYTES = 1 * 2**30       # 1 GB of paths in flight
+_ARRAYS_PER_PATH = 10               # (T, N) float arrays per path of a chunk
+                                    # (wide prices / signals + kernel outputs)
+_STRATEGY_ARRAYS = 12               # (T, N) temporaries of one generate_signals
+_COV_MATRICES = 8                   # (N, N) matrices of the streamed covariance
+                                    # (two rolling engines' sums + blend)
+
+
+# ---------------------------------------------------------------------
+# 1. Resampling
+# ---------------------------------------------------------------------
+def stationary_bootstrap_indices(n_obs: int, length: int, n_paths: int,
+                                 mean_block: float,
+                                 rng: np.random.Generator) -> np.ndarray:
+    """
+    (n_paths, length) row indices into a sample of `n_obs` rows.
+
+    Each bar starts a new block with probability 1 / mean_block (always at
+    bar 0); inside a block indices advance by one, wrapping circularly.
+    """
+    p_new = 1.0 / max(mean_block, 1.0)
+    new_block = rng.random((n_paths, length)) < p_new
+    new_block[:, 0] = True
+    starts = rng.integers(0, n_obs, size=(n_paths, length))
+
+    t = np.arange(length)
+    block_t0 = np.maximum.accumulate(np.where(new_block, t, 0), axis=1)
+    start_of_block = np.take_along_axis(starts, block_t0, axis=1)
+    return (start_of_block + (t - block_t0)) % n_obs
+
+
+def synthetic_prices(prices: np.ndarray, rets: np.ndarray,
+                     idx: np.ndarray) -> np.ndarray:
+    """
+    Rebuild a price path from resampled return rows.
+
+    prices : (T, N) original panel – gives the starting levels and the
+             NaN (not-yet-listed / missing) pattern, which is kept in place
+    rets   : (T-1, N) simple returns, NaNs already set to 0
+    idx    : (T-1,) resampled row indices into `rets`
+    """
+    first = pd.DataFrame(prices).bfill().to_numpy()[0]
+    path = np.empty_like(prices)
+    path[0] = first
+    path[1:] = first * np.cumprod(1 + rets[idx], axis=0)
+    path[np.isnan(prices)] = np.nan
+    return path
+
+
+# ---------------------------------------------------------------------
+# 2. Worker
+# ---------------------------------------------------------------------
+def _run_paths(strategy_name: str, params: dict, tc: float,
+               path_ids: list[int], seeds: list[np.random.SeedSequence],
+               mean_block: float, annualization: int) -> pd.DataFrame:
+    from lib import STRATEGY_REGISTRY
+    panel = attached_panel()
+    prices = panel.to_numpy(dtype=float)
+    T, N = prices.shape
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rets = np.nan_to_num(prices[1:] / prices[:-1] - 1, nan=0.0,
+                             posinf=0.0, neginf=0.0)
+
+    strat = STRATEGY_REGISTRY[strategy_name](**params)
+    wide_prices = np.empty((T, len(path_ids) * N))
+    wide_signals = np.empty_like(wide_prices)
+    for k, seed in enumerate(seeds):
+        rng = np.random.default_rng(seed)
+        idx = stationary_bootstrap_indices(T - 1, T - 1, 1, mean_block, rng)[0]
+        path = pd.DataFrame(synthetic_prices(prices, rets, idx),
+                            index=panel.index, columns=panel.columns)
+        cols = slice(k * N, (k + 1) * N)
+        wide_prices[:, cols] = path.to_numpy()
+        wide_signals[:, cols] = (pd.DataFrame(strat.generate_signals(path))
+                                 .reindex(index=panel.index, columns=panel.columns)
+                                 .to_numpy(dtype=float))
+        features.FEATURES.clear()           # keyed by this path only
+
+    res = run_backtest_kernel(wide_prices, wide_signals, tc)
+    port = res["strategy_returns"].reshape(T, len(path_ids), N).sum(axis=2)
+    turnover = res["trades"].reshape(T, len(path_ids), N).sum(axis=2)
+    return summarize(port, trades=turnover, annualization=annualization,
+                     columns=pd.Index(path_ids, name="path"))
+
+
+# ---------------------------------------------------------------------
+# 3. Public runner
+# ---------------------------------------------------------------------
+def chunk_size(T: int, N: int, n_paths: int, workers: int, max_bytes: int) -> int:
+    """
+    Paths per chunk so that every worker's chunk arrays plus one strategy
+    run (its (T, N) temporaries and (N, N) covariance state) fit in
+    `max_bytes / workers`; at least 1, at most an even split of the paths.
+    """
+    per_path = T * N * 8 * _ARRAYS_PER_PATH
+    per_worker = T * N * 8 * _STRATEGY_ARRAYS + N * N * 8 * _COV_MATRICES
+    budget = max_bytes // workers - per_worker
+    return int(max(1, min(budget // per_path, -(-n_paths // workers))))
+
+
+def run_bootstrap(prices: pd.DataFrame,
+                  strategy_name: str,
+                  params: dict | None = None,
+                  n_paths: int = 1000,
+                  mean_block: float = 20.0,
+                  transaction_cost: float = 0.0,
+                  seed: int | None = 0,
+                  workers: int | None = None,
+                  max_bytes: int = DEFAULT_MAX_BYTES,
+                  annualization: int = 252) -> pd.DataFrame:
+    """
+    Parameters
+    ----------
+    prices        : cleaned price panel (columns = symbols)
+    strategy_name : key in STRATEGY_REGISTRY
+    params        : constructor kwargs for the strategy
+    n_paths       : number of bootstrap paths
+    mean_block    : mean block length in bars (≈ autocorrelation horizon)
+    seed          : root seed; one child SeedSequence per path
+    workers       : process count (None = os.cpu_count())
+    max_bytes     : cap on memory used by paths in flight across workers
+
+    Returns
+    -------
+    pd.DataFrame  one row of portfolio metrics per path (index "path")
+    """
+    params = params or {}
+    workers = workers or os.cpu_count() or 1
+    T, N = prices.shape
+    chunk = chunk_size(T, N, n_paths, workers, max_bytes)
+    seeds = np.random.SeedSequence(seed).spawn(n_paths)
+    print(f"[+] Bootstrap {strategy_name}: {n_paths} paths × {T} bars, "
+          f"{workers} workers, {chunk} paths per chunk")
+
+    parts = []
+    with panel_pool(prices, workers) as pool:
+        futures = [pool.submit(_run_paths, strategy_name, params,
+                               transaction_cost,
+                               list(range(lo, min(lo + chunk, n_paths))),
+                               seeds[lo:lo + chunk], mean_block, annualization)
+                   for lo in range(0, n_paths, chunk)]
+        for fut in as_completed(futures):
+            parts.append(fut.result())
+    return pd.concat(parts).sort_index()
+
+
+def distribution_summary(paths: pd.DataFrame,
+                         metrics=("sharpe", "cagr", "max_drawdown", "avg_drawdown"),
+                         quantiles=(0.05, 0.25, 0.5, 0.75, 0.95)) -> pd.DataFrame:
+    """Mean, std and quantiles of each metric across bootstrap paths."""
+    cols = [m for m in metrics if m in paths.columns]
+    table = paths[cols].quantile(list(quantiles)).T
+    table.columns = [f"q{int(q * 100):02d}" for q in quantiles]
+    table.insert(0, "std", paths[cols].std())
+    table.insert(0, "mean", paths[cols].mean())
+    return table
@@ -0,0 +1,91 @@
+# lib/shared_panel.py  ──────────────────────────────────────
+"""
+Read-only price panel shared with worker processes through shared memory.
+
+The parent copies the panel once into a shared segment; every worker maps
+the same buffer instead of receiving a pickled copy per task.  Used by the
+parameter sweep, the bootstrap and anything else that fans one panel out
+over a process pool:
+
+    with panel_pool(prices, max_workers=8) as pool:
+        pool.submit(task, ...)        # task reads attached_panel()
+"""
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+import pandas as pd
+
+_PANEL: pd.DataFrame | None = None
+_SHM: shared_memory.SharedMemory | None = None
+
+
+def share_panel(prices: pd.DataFrame):
+    """
+    Copy `prices` into a new shared segment.
+
+    Returns
+    -------
+    (shm, meta)  the parent's segment (pass it to `release_panel`) and the
+                 `attach_panel` arguments for the workers
+    """
+    values = prices.to_numpy(dtype=float)
+    shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+    np.ndarray(values.shape, dtype=float, buffer=shm.buf)[:] = values
+    meta = (shm.name, values.shape, prices.index, prices.columns)
+    return shm, meta
+
+
+def _attach_untracked(name: str) -> shared_memory.SharedMemory:
+    """
+    Map an existing segment without registering it with the resource
+    tracker: the parent owns and unlinks it, a worker must never do so.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)   # Python ≥ 3.13
+    except TypeError:
+        pass
+    shm = shared_memory.SharedMemory(name=name)                # registers on attach
+    resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+def attach_panel(name, shape, index, columns) -> None:
+    """Worker initializer: map the shared panel read-only (see `attached_panel`)."""
+    global _PANEL, _SHM
+    _SHM = _attach_untracked(name)
+    arr = np.ndarray(shape, dtype=float, buffer=_SHM.buf)
+    arr.flags.writeable = False
+    _PANEL = pd.DataFrame(arr, index=index, columns=columns, copy=False)
+
+
+def attached_panel() -> pd.DataFrame:
+    """The panel mapped by `attach_panel` in this worker."""
+    if _PANEL is None:
+        raise RuntimeError("no shared panel attached in this process")
+    return _PANEL
+
+
+def release_panel(shm: shared_memory.SharedMemory) -> None:
+    """Close and unlink the parent's segment."""
+    # Workers started by multiprocessing share the parent's tracker, so
+    # their unregister also dropped the parent's entry; re-register it
+    # (idempotent) so unlink's own unregister finds it
+    resource_tracker.register(shm._name, "shared_memory")
+    shm.close()
+    shm.unlink()
+
+
+@contextmanager
+def panel_pool(prices: pd.DataFrame, max_workers: int | None = None):
+    """ProcessPoolExecutor whose workers see `prices` as `attached_panel()`."""
+    shm, meta = share_panel(prices)
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 initializer=attach_panel,
+                                 initargs=meta) as pool:
+            yield pool
+    finally:
+        release_panel(shm)
@@ -31,11 +31,13 @@ class BuyAndHoldStrategy(StrategyBase):
     def __init__(self):
         super().__init__(target_vol=None, vol_window=None)
 
-    def generate_signals(self, prices: pd.Series) -> pd.Series:
+    def generate_signals(self, prices: pd.Series | pd.DataFrame) -> pd.Series | pd.DataFrame:
         if prices.empty:
             raise ValueError("Empty price series")
-        signals = pd.Series(0.0, index=prices.index)
-        signals.iloc[0]  = +1.0   # enter long
-        signals.fillna(method="ffill")
+        if isinstance(prices, pd.DataFrame):
+            signals = pd.DataFrame(0.0, index=prices.index, columns=prices.columns)
+        else:
+            signals = pd.Series(0.0, index=prices.index)
+        signals.iloc[0]  = +1.0   # enter long (every column)
         signals.iloc[-1] = -1.0   # exit
         return signals.cumsum()   # converts discrete trades → position size
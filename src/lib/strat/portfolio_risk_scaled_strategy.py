@@ -2,6 +2,10 @@ import pandas as pd
 import numpy as np
 from .strategy_base import MultiAssetStrategyBase
 from lib.indicators.trending_indicator import trend_mask, macd_signal, macd_signal_prices
+from lib.indicators.buffering import forecast_hysteresis, position_buffer
+from lib.indicators.forecast import combined_forecast
+from lib import features
+from lib.precision import as_compact, resolve_dtype
 
 #Sharpe above 1...first such strategy
 #Sharpe remains constant for all target vols....Higher target vols have higher cagr and returns along with higher mdd and vol
@@ -9,7 +13,10 @@ from lib.indicators.trending_indicator import trend_mask, macd_signal, macd_sign
 
 #This follows dynamic positioning, even after trend starts the position will be continued to change according to the volatility
 class PortfolioRiskScaledStrategy(MultiAssetStrategyBase):
-    def __init__(self, target_vol=0.60, short_lookback=20, long_lookback=60, lambda_=0.5, rebalance=True, trend_mode: str = "strength"): #Traget vol can be easily half of the expected sharpe
+    def __init__(self, target_vol=0.60, short_lookback=20, long_lookback=60, lambda_=0.5, rebalance=True, trend_mode: str = "strength",
+                 forecast_threshold=0.05, buffer_fraction=None,
+                 forecast_speeds=None, forecast_weights=None, forecast_scalars=None,
+                 cov_model="sample", n_factors=3, precision="float64"): #Traget vol can be easily half of the expected sharpe
         #When I increased target vol from 20% to 40% the returns and cagr increase signififcantly with minimum change in vol, mdd and sharpe
         #Follow trend improves overall algororithm
         super().__init__()
@@ -19,6 +26,25 @@ class PortfolioRiskScaledStrategy(MultiAssetStrategyBase):
         self.lambda_ = lambda_  # 0 = use only long-term cov, 1 = use only short-term cov
         self.rebalance = rebalance
         self.trend_mode = trend_mode.lower()         # ← NEW FLAG: "none" | "mask" | "strength"
+        # "strength" buffering: re-size only when the forecast moves > threshold,
+        # or (buffer_fraction set) Carver buffer of ±fraction × unscaled position
+        self.forecast_threshold = forecast_threshold
+        self.buffer_fraction = buffer_fraction
+        # "strength" forecast: None = single slow EWMAC(64,256) below, else a
+        # list of (fast, slow) spans blended by the multi-speed engine
+        self.forecast_speeds = forecast_speeds
+        self.forecast_weights = forecast_weights
+        # None = Carver's published scalars / expanding estimate (no
+        # look-ahead); "full" = full-sample estimate, in-sample only
+        self.forecast_scalars = forecast_scalars
+        # Portfolio vol covariance: "sample" (dense N×N) or, for large
+        # universes, "ledoit_wolf" / "pca" (factors + diagonal, O(N·k))
+        self.cov_model = cov_model
+        self.n_factors = n_factors
+        # "float32": compact prices / returns / positions, covariance,
+        # equity and w'Σw still accumulated in float64 (see lib.precision)
+        self.precision = precision
+        self._dtype = resolve_dtype(precision)
         # Strategy‑7 constants (used only when trend_mode == "strength")
         self._VOL_LAMBDA   = 0.07   # EW stdev half‑life ≈ 20 days
         self._SCALE_K      = 4.0    # 1 σ ↦ ~5 forecast units
@@ -28,31 +54,47 @@ class PortfolioRiskScaledStrategy(MultiAssetStrategyBase):
         self._SCALAR = 1.9          # Carver’s empirical scalar for slow EWMAC
 
     def generate_signals(self, prices, initial_capital=1.0):
+        prices = as_compact(prices, self._dtype)
         raw_weights = self.compute_vol_scaled_positions(prices, self.target_vol)
-        returns = prices.pct_change(fill_method=None)
-        returns.fillna(0.0)
-
-        positions = pd.DataFrame(index=raw_weights.index, columns=raw_weights.columns)
+        returns = features.returns(prices)
+
+        # Typed (T, N) buffer filled row by row; row 0 stays NaN (flat)
+        rw = raw_weights.to_numpy(dtype=float)
+        pos = np.full(rw.shape, np.nan, dtype=self._dtype)
+        # Running equity state for the rebalance path: updated with one bar of
+        # P&L per step instead of re-cumprodding the whole history every bar
+        asset_rets = returns.fillna(0.0).to_numpy(dtype=float)
+        held = np.full(asset_rets.shape[1], np.nan)   # positions.iloc[t-1]
+        equity = float(initial_capital)
+
+        # Blended covariance streamed bar by bar: bar t is sized with the
+        # covariance of the returns *before* t (the (t-1)-th yielded)
+        covs = self.iter_blended_cov(returns, self.short_lookback,
+                                     self.long_lookback, self.lambda_,
+                                     self.cov_model, self.n_factors)
         max_vol = 0
         min_vol = 100
         # if self.trend_mode == "strength":
         #     forecast_df = self._trend_strength_forecast(prices)
         #     positions *=  forecast_df / 10 # –2 … +2
 
-        for t in range(1, len(raw_weights)):
+        for t, cov in zip(range(1, len(raw_weights)), covs):
+            # P&L of bar t-1 earned on the weights held into it
+            if t >= 2:
+                equity *= 1.0 + np.nansum(prev_held * asset_rets[t - 1])
+            prev_held = held
             if t < self.short_lookback or t < self.long_lookback:
-                w0 = raw_weights.iloc[t].copy()
+                w0 = rw[t]
                 # ── normalise so |weights| sum to 1 ─────────────────────────  Very crucial to improce results...put in notes
-                nom = w0.abs().sum()
+                nom = np.nansum(np.abs(w0))
                 if nom > 0:
                     w0 = w0 / nom
                 else:
-                    w0[:] = 0.0          # all NaN or zero ‑‑ stay flat
+                    w0 = np.zeros_like(w0)   # all NaN or zero ‑‑ stay flat
 
                 # optional: respect per‑asset leverage cap
-                w0 = w0.clip(upper=1.0)  # or your chosen cap
-
-                positions.iloc[t] = w0
+                pos[t] = np.minimum(w0, 1.0)  # or your chosen cap
+                held = pos[t].astype(float)
                 continue
             # w0 = raw_weights.iloc[t].copy()
             # # ── normalise so |weights| sum to 1 ─────────────────────────  Very crucial to improce results...put in notes
@@ -65,14 +107,7 @@ class PortfolioRiskScaledStrategy(MultiAssetStrategyBase):
             # # optional: respect per‑asset leverage cap
             # w_t = w0.clip(upper=1.0)  # or your chosen cap
 
-            short_cov = returns.iloc[t - self.short_lookback:t].cov()
-            long_cov = returns.iloc[t - self.long_lookback:t].cov()
-
-            # Blend covariances
-            cov = ((1 - self.lambda_) * long_cov + self.lambda_ * short_cov).values
-
-            w_t = raw_weights.iloc[t].values.reshape(-1, 1)
-            port_vol = np.sqrt(w_t.T @ cov @ w_t).item()
+            port_vol = np.nan if cov is None else self.compute_portfolio_vol(rw[t], cov)
             port_vol_annual = port_vol * np.sqrt(252)
             if port_vol_annual > max_vol:
                 max_vol = port_vol_annual
@@ -82,10 +117,12 @@ class PortfolioRiskScaledStrategy(MultiAssetStrategyBase):
 
             # Adjust for equity drawdowns (optional)
             if self.rebalance:
-                equity = self._equity_over_time(t, positions, prices, initial_capital)
                 scale *= initial_capital / equity
 
-            positions.iloc[t] = (raw_weights.iloc[t] * scale).clip(upper=5.0)
+            pos[t] = np.minimum(rw[t] * scale, 5.0)
+            held = pos[t].astype(float)
+        positions = pd.DataFrame(pos, index=raw_weights.index,
+                                 columns=raw_weights.columns)
         # ------------- TREND OVERLAY ----------------------------------------
         if self.trend_mode == "mask":
             positions *= trend_mask(prices)                        # ±1 / 0
@@ -110,36 +147,16 @@ class PortfolioRiskScaledStrategy(MultiAssetStrategyBase):
         #     positions = new_positions
         if self.trend_mode == "strength":
             forecast_df = self._trend_strength_forecast(prices) / 10
-            rel_change = (forecast_df - forecast_df.shift(1)).abs() / (forecast_df.shift(1).abs() + 1e-12)
-            update_mask = rel_change > 0.05
-
-            new_positions = positions.copy()
-            new_positions.iloc[0] = positions.iloc[0] * forecast_df.iloc[0]
-            for col in positions.columns:
-                for t in range(1, len(positions)):
-                    col_idx = positions.columns.get_loc(col)
-                    if update_mask.iloc[t, col_idx]:
-                        # Update to the *new* value based on forecast
-                        new_positions.iloc[t, col_idx] = positions.iloc[t, col_idx] * forecast_df.iloc[t, col_idx]
-                    else:
-                        # Hold previous position
-                        new_positions.iloc[t, col_idx] = new_positions.iloc[t-1, col_idx]
-            positions = new_positions
-
-        return positions.fillna(0.0).ffill()
-
-    def _equity_over_time(self, t, positions, prices, initial_capital):
-        # Approximate portfolio equity up to time t for rebalancing
-        # pnl = ((positions.shift(1) * prices.pct_change(fill_method=None).fillna(0.0)).iloc[:t]).sum(axis=1)
-        # return initial_capital + pnl.sum()
-        # daily % returns per asset
-        rets = prices.pct_change(fill_method=None).fillna(0.0)
-        # # portfolio daily return (weights × returns), use yesterday’s weights
-        port_ret = (positions.shift(1) * rets).sum(axis=1)
-        if t <= 1:
-            return float(initial_capital)
-        equity_path = (1.0 + port_ret.iloc[:t]).cumprod()
-        return float(initial_capital * equity_path.iloc[-1])
+            if self.buffer_fraction is None:
+                # Update to the *new* value only when the forecast moved enough,
+                # otherwise hold previous position
+                positions = forecast_hysteresis(positions, forecast_df,
+                                                self.forecast_threshold)
+            else:
+                positions = position_buffer(positions * forecast_df,
+                                            self.buffer_fraction * positions.abs())
+
+        return as_compact(positions.fillna(0.0).ffill(), self._dtype)
 
     def _trend_strength_forecast(self, prices: pd.DataFrame) -> pd.DataFrame:
         """
@@ -150,10 +167,16 @@ class PortfolioRiskScaledStrategy(MultiAssetStrategyBase):
         3. risk‑adjust MACD by vol  (z_t)
         4. scale by SCALAR so E|forecast| ≈10
         5. clip to ±20, replace NaNs with 0
+        With `forecast_speeds` set, returns the scaled, weighted blend of those
+        EWMAC speeds from lib.indicators.forecast instead.
         """
+        if self.forecast_speeds is not None:
+            return combined_forecast(prices, self.forecast_speeds,
+                                     self.forecast_weights,
+                                     scalars=self.forecast_scalars)
+
         # ---------- Step‑0 : returns & price‑vol ----------
-        rets = prices.pct_change(fill_method=None).fillna(0.0)
-        pct_sigma = rets.ewm(alpha=self._VOL_LAMBDA, adjust=False).std()   # %
+        pct_sigma = features.ew_std(prices, self._VOL_LAMBDA, adjust=False)  # %
         vol = prices * pct_sigma                                           # σ in price units
 
         # ---------- Step‑1 : slow MACD (64 / 256 half‑lives) ----------
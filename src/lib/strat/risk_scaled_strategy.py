@@ -1,10 +1,12 @@
 # src/lib/strat/risk_scaled_strategy.py
 import pandas as pd
 from .strategy_base import StrategyBase
+from lib import features
 
 class RiskScaledBuyAndHoldStrategy(StrategyBase):
     """
     Strategy 2 – always long, but scale exposure to hit constant vol.
+    Works column-wise on a (T, N) panel as well as on a single series.
     """
 
     def __init__(self,
@@ -12,10 +14,10 @@ class RiskScaledBuyAndHoldStrategy(StrategyBase):
                  vol_window: int  = 20):     # 1‑month look‑back
         super().__init__(target_vol, vol_window)
 
-    def generate_signals(self, prices: pd.Series) -> pd.Series:
+    def generate_signals(self, prices: pd.Series | pd.DataFrame) -> pd.Series | pd.DataFrame:
         if prices.empty:
             raise ValueError("Empty price series")
-        returns = prices.pct_change().fillna(0.0)
+        returns = features.returns(prices, fill=0.0)
         sigma   = self._rolling_vol(returns)
         # position = target / realised σ; clip huge gearings
         raw_pos = self.target_vol / sigma
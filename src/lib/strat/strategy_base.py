@@ -2,6 +2,8 @@
 from abc import ABC, abstractmethod
 import pandas as pd
 import numpy as np
+from lib.covariance import iter_factor_cov, iter_rolling_cov, portfolio_vol
+from lib import features
 
 class StrategyBase(ABC):
     """
@@ -9,6 +11,10 @@ class StrategyBase(ABC):
     Every subclass must implement `generate_signals`.
     A ‘signal’ is a pandas Series whose values are the *target position*
     (can be fractional, negative, or zero) at each timestamp.
+
+    `generate_signals` accepts either one price Series or a full (T, N)
+    panel; for a panel it returns a DataFrame of positions with the same
+    index and columns, column i equal to the single-series result for i.
     """
 
     def __init__(self,
@@ -18,12 +24,12 @@ class StrategyBase(ABC):
         self.vol_window  = vol_window      # e.g. 20 trading days
 
     @abstractmethod
-    def generate_signals(self, prices: pd.Series) -> pd.Series:
-        """Return a position series indexed like `prices`."""
+    def generate_signals(self, prices: pd.Series | pd.DataFrame) -> pd.Series | pd.DataFrame:
+        """Return positions shaped like `prices` (Series or DataFrame)."""
         ...
 
     # --- shared utilities everyone will need -------------------------
-    def _rolling_vol(self, returns: pd.Series) -> pd.Series:
+    def _rolling_vol(self, returns: pd.Series | pd.DataFrame) -> pd.Series | pd.DataFrame:
         """
         Annualised rolling stdev of daily returns using the window set
         in `self.vol_window`. 252≈trading days per year.
@@ -39,16 +45,47 @@ class MultiAssetStrategyBase(StrategyBase):
         Compute per-asset risk-scaled raw positions using the same logic
         as in RiskScaledBuyAndHoldStrategy (individual scaling only).
         """
-        returns = prices.pct_change(fill_method=None).fillna(0.0)
-        sigma_fast = returns.ewm(alpha=1 - np.exp(-1 / 5.0)).std() * np.sqrt(252)
-        sigma_slow = returns.ewm(alpha=1 - np.exp(-1 / 20.0)).std() * np.sqrt(252)
+        sigma_fast = features.ew_std(prices, alpha=1 - np.exp(-1 / 5.0)) * np.sqrt(252)
+        sigma_slow = features.ew_std(prices, alpha=1 - np.exp(-1 / 20.0)) * np.sqrt(252)
         blended_vol = 0.7 * sigma_fast + 0.3 * sigma_slow
 
         raw_positions = (1 / blended_vol).clip(upper=7.0)
         return raw_positions.ffill().fillna(0.0)
 
+    def iter_blended_cov(self, returns, short_lookback, long_lookback, lambda_,
+                         cov_model="sample", n_factors=3):
+        """
+        Blend of short and long rolling covariances,
+        (1 - lambda_) * long + lambda_ * short, yielded one bar at a time;
+        the t-th matrix uses returns up to and including bar t.  Only the
+        current bar's covariance is held, never a (T, N, N) stack.
+
+        cov_model="ledoit_wolf" | "pca" yields the same blend as a
+        `BlendedCovariance` of two k-factor models (factors + diagonal,
+        refitted every `FACTOR_REFIT` bars), None during warm-up.
+        """
+        if cov_model != "sample":
+            longs = iter_factor_cov(returns, long_lookback, cov_model, n_factors)
+            shorts = iter_factor_cov(returns, short_lookback, cov_model, n_factors)
+            for long_cov, short_cov in zip(longs, shorts):
+                if long_cov is None or short_cov is None:
+                    yield None
+                else:
+                    yield long_cov.blend(short_cov, lambda_)
+            return
+        longs = iter_rolling_cov(returns, long_lookback)
+        shorts = iter_rolling_cov(returns, short_lookback)
+        for cov, short_cov in zip(longs, shorts):
+            cov *= (1 - lambda_)
+            short_cov *= lambda_
+            cov += short_cov
+            yield cov
+
     def compute_portfolio_vol(self, weights, cov_matrix):
         """
         Compute portfolio volatility: sqrt(w^T * C * w)
+        Takes one bar (w: (N,), C: (N, N)) or a whole history
+        (w: (T, N), C: (T, N, N) or a FactorCovariance), evaluated in one
+        batched pass.
         """
-        return np.sqrt((weights.T @ cov_matrix @ weights).sum(axis=1))
+        return portfolio_vol(weights, cov_matrix)
@@ -2,6 +2,7 @@
 from __future__ import annotations
 import pandas as pd
 from .strategy_base import StrategyBase
+from lib import features
 
 class VariableRiskScaledBuyAndHoldStrategy(StrategyBase):
     """
@@ -11,7 +12,8 @@ class VariableRiskScaledBuyAndHoldStrategy(StrategyBase):
       TargetVol_t = 0.7 × σ_fast + 0.3 × σ_slow
       Position_t  = TargetVol_t / σ_fast
 
-    All vols are annualised, and EWMA smoothed.
+    All vols are annualised, and EWMA smoothed.  Works column-wise on a
+    (T, N) panel as well as on a single series.
     """
 
     def __init__(self,
@@ -23,20 +25,20 @@ class VariableRiskScaledBuyAndHoldStrategy(StrategyBase):
         self.slow_lambda = slow_lambda
         self.max_leverage = max_leverage
 
-    def _ewma_vol(self, returns: pd.Series, lambda_: float) -> pd.Series:
+    def _ewma_vol(self, prices: pd.Series | pd.DataFrame,
+                  lambda_: float) -> pd.Series | pd.DataFrame:
         """
-        EWMA volatility (annualised) for given decay λ.
+        EWMA volatility (annualised) of returns for given decay λ.
         """
-        ewma_var = returns.ewm(alpha=1 - lambda_).var(bias=False)
+        ewma_var = features.ew_var(prices, alpha=1 - lambda_)
         return (ewma_var**0.5) * (252**0.5)
 
-    def generate_signals(self, prices: pd.Series) -> pd.Series:
+    def generate_signals(self, prices: pd.Series | pd.DataFrame) -> pd.Series | pd.DataFrame:
         if prices.empty:
             raise ValueError("Empty price series passed to strategy")
 
-        returns = prices.pct_change().fillna(0.0)
-        sigma_fast = self._ewma_vol(returns, self.fast_lambda)
-        sigma_slow = self._ewma_vol(returns, self.slow_lambda)
+        sigma_fast = self._ewma_vol(prices, self.fast_lambda)
+        sigma_slow = self._ewma_vol(prices, self.slow_lambda)
 
         # Carver's dynamic blended volatility target
         blended_vol = 0.7 * sigma_fast + 0.3 * sigma_slow
@@ -44,7 +46,7 @@ class VariableRiskScaledBuyAndHoldStrategy(StrategyBase):
 
         # Position sizing
         raw_pos = (blended_vol / sigma_fast).clip(upper=self.max_leverage)
-        position = raw_pos.fillna(method="ffill")
+        position = raw_pos.ffill()
         # raw_pos = (1.0 / blended_vol).clip(upper=self.max_leverage)
         # position = raw_pos.ffill()
         # print(f"position:{position}")
@@ -0,0 +1,153 @@
+# lib/sweep.py  ─────────────────────────────────────────────
+"""
+Parallel parameter sweeps for any strategy in STRATEGY_REGISTRY.
+
+* The price panel is copied once into shared memory (``lib.shared_panel``);
+  every worker maps the same read-only buffer instead of receiving a pickled
+  copy per task.
+* Each finished grid cell is appended to a JSON-lines checkpoint, so an
+  interrupted sweep resumes with only the missing cells.
+* Metrics from ``backtest_multi_asset`` are collected into one table.
+* With ``store`` set, every cell is also appended to the results store as
+  its own run (params, metrics and portfolio return / equity series),
+  written by the worker that ran it.  The sweep id is recorded in the
+  checkpoint, so a resumed sweep keeps writing under the same id.
+"""
+from __future__ import annotations
+import itertools
+import json
+import os
+from concurrent.futures import as_completed
+
+import pandas as pd
+
+from lib.backtester.backtester import backtest_multi_asset
+from lib.results_store import ResultsStore
+from lib.shared_panel import attached_panel, panel_pool
+
+
+# ---------------------------------------------------------------------
+# 1. Grid helpers
+# ---------------------------------------------------------------------
+def param_grid(grid: dict[str, list]) -> list[dict]:
+    """Cartesian product of a {param: [values]} grid."""
+    keys = list(grid)
+    return [dict(zip(keys, combo))
+            for combo in itertools.product(*(grid[k] for k in keys))]
+
+
+def cell_key(params: dict) -> str:
+    """Stable identifier of one grid cell."""
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+def checkpoint_sweep_id(done: dict[str, dict]) -> str | None:
+    """Sweep id recorded in a loaded checkpoint (None if it has none)."""
+    ids = {rec["sweep_id"] for rec in done.values() if rec.get("sweep_id")}
+    if len(ids) > 1:
+        raise ValueError(f"checkpoint mixes several sweeps: {sorted(ids)}")
+    return ids.pop() if ids else None
+
+
+def load_checkpoint(path: str | None) -> dict[str, dict]:
+    """Finished cells from a checkpoint file, keyed by `cell_key`."""
+    done: dict[str, dict] = {}
+    if path is None or not os.path.exists(path):
+        return done
+    with open(path) as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError:      # half-written last line
+                continue
+            done[cell_key(rec["params"])] = rec
+    return done
+
+
+# ---------------------------------------------------------------------
+# 2. Worker
+# ---------------------------------------------------------------------
+def _run_cell(strategy_name: str, params: dict, tc: float,
+              store: str | None = None, run_id: str | None = None,
+              sweep_id: str | None = None) -> dict:
+    from lib import STRATEGY_REGISTRY
+    strat = STRATEGY_REGISTRY[strategy_name](**params)
+    panel = attached_panel()
+    signals = strat.generate_signals(panel)
+    results_df, metrics = backtest_multi_asset(panel, signals, tc)
+    if store is not None:
+        ResultsStore(store).append(strategy_name, params, series=results_df,
+                                   metrics=metrics, run_id=run_id,
+                                   overwrite=True, sweep=sweep_id, tc=tc)
+    return {"params": params,
+            "metrics": {k: float(v) for k, v in metrics.items()},
+            "sweep_id": sweep_id}
+
+
+# ---------------------------------------------------------------------
+# 3. Public runner
+# ---------------------------------------------------------------------
+def run_sweep(prices: pd.DataFrame,
+              strategy_name: str,
+              grid: dict[str, list] | list[dict],
+              transaction_cost: float = 0.0,
+              workers: int | None = None,
+              checkpoint: str | None = None,
+              store: str | None = None,
+              sweep_id: str | None = None) -> pd.DataFrame:
+    """
+    Parameters
+    ----------
+    prices          : cleaned price panel (columns = symbols)
+    strategy_name   : key in STRATEGY_REGISTRY
+    grid            : {param: [values]} or an explicit list of param dicts
+    workers         : process count (None = os.cpu_count())
+    checkpoint      : JSON-lines file; finished cells are skipped on rerun
+    store           : results store root; cell i is saved as run
+                      "<sweep_id>-<i:05d>" (cells taken from the checkpoint
+                      are not re-saved)
+    sweep_id        : tag shared by the sweep's runs (default: the id recorded
+                      in the checkpoint, else generated); ValueError if it
+                      differs from the checkpoint's
+
+    Returns
+    -------
+    pd.DataFrame  one row per cell, param columns followed by metric columns;
+                  ``attrs["sweep_id"]`` holds the sweep id
+    """
+    cells = param_grid(grid) if isinstance(grid, dict) else list(grid)
+    done = load_checkpoint(checkpoint)
+    todo = [(i, p) for i, p in enumerate(cells) if cell_key(p) not in done]
+    resumed = checkpoint_sweep_id(done)
+    if resumed is not None:
+        if sweep_id is not None and sweep_id != resumed:
+            raise ValueError(f"checkpoint {checkpoint} belongs to sweep "
+                             f"'{resumed}', not '{sweep_id}'")
+        sweep_id = resumed
+    if store is not None and sweep_id is None:
+        sweep_id = ResultsStore.new_run_id(f"sweep-{strategy_name}")
+    print(f"[+] Sweep {strategy_name}: {len(cells)} cells, "
+          f"{len(cells) - len(todo)} from checkpoint, {len(todo)} to run")
+
+    if todo:
+        with panel_pool(prices, workers) as pool:
+            futures = [pool.submit(_run_cell, strategy_name, p, transaction_cost,
+                                   store,
+                                   None if store is None else f"{sweep_id}-{i:05d}",
+                                   sweep_id)
+                       for i, p in todo]
+            for fut in as_completed(futures):
+                rec = fut.result()
+                done[cell_key(rec["params"])] = rec
+                if checkpoint is not None:
+                    with open(checkpoint, "a") as fh:
+                        fh.write(json.dumps(rec, default=str) + "\n")
+
+    rows = [{**done[cell_key(p)]["params"], **done[cell_key(p)]["metrics"]}
+            for p in cells]
+    table = pd.DataFrame(rows)
+    table.attrs["sweep_id"] = sweep_id
+    return table
@@ -0,0 +1,163 @@
+# lib/walkforward.py  ───────────────────────────────────────
+"""
+Walk-forward (rolling or anchored) out-of-sample evaluation.
+
+History is cut into consecutive in-sample / out-of-sample windows.  On each
+in-sample window the parameter set with the best metric is chosen; its
+returns over the following out-of-sample window are kept, and the
+out-of-sample segments are stitched into one return / equity curve.
+
+All strategies are causal (the signal at t only uses prices up to t), so
+each parameter variant is run once over the full panel and every window is
+just a slice of that result:
+
+    1. signals per variant – ``generate_signals`` on the whole panel, cached
+       in the feature store under (panel, strategy, params)
+    2. portfolio returns per variant – one ``backtest_multi_asset`` call
+    3. per window – metrics of all variants at once on the (T_is, V) slice
+
+Cost therefore grows with the number of bars and variants, not windows.
+Turnover from switching variant at a window boundary is not charged.
+
+Forecast scalars estimated on the full sample (``forecast_scalars="full"``)
+break that assumption – every window would see out-of-sample bars – so such
+variants are rejected; the default scalars (Carver's published values, or an
+expanding estimate from past bars only) are causal.
+"""
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+from lib import features
+from lib.backtester.backtester import backtest_multi_asset
+from lib.backtester.metrics import summarize
+from lib.sweep import param_grid, cell_key
+
+
+# ---------------------------------------------------------------------
+# 1. Windows
+# ---------------------------------------------------------------------
+def walk_forward_windows(n_bars: int, train: int, test: int,
+                         step: int | None = None,
+                         anchored: bool = False) -> list[tuple[int, int, int, int]]:
+    """
+    Positional windows ``(is_start, is_end, oos_start, oos_end)`` with
+    half-open ranges; the out-of-sample window follows its in-sample one.
+    `step` defaults to `test` (non-overlapping OOS segments).
+    """
+    step = step or test
+    windows = []
+    is_end = train
+    while is_end < n_bars:
+        is_start = 0 if anchored else is_end - train
+        windows.append((is_start, is_end, is_end, min(is_end + test, n_bars)))
+        is_end += step
+    return windows
+
+
+# ---------------------------------------------------------------------
+# 2. Cached per-variant results
+# ---------------------------------------------------------------------
+LOOKAHEAD_PARAMS = {"forecast_scalars": "full"}
+
+
+def check_causal(cells: list[dict]) -> None:
+    """ValueError if a variant is built with full-sample (look-ahead) estimates."""
+    for params in cells:
+        for key, value in LOOKAHEAD_PARAMS.items():
+            if isinstance(params.get(key), str) and params[key] == value:
+                raise ValueError(
+                    f"{key}={value!r} uses the full sample (look-ahead) and "
+                    f"cannot be evaluated out of sample: {cell_key(params)}")
+
+
+def variant_signals(prices: pd.DataFrame, strategy_name: str,
+                    params: dict) -> pd.DataFrame:
+    """Signals of one parameter set over the full panel (memoised)."""
+    from lib import STRATEGY_REGISTRY
+
+    def compute():
+        sig = STRATEGY_REGISTRY[strategy_name](**params).generate_signals(prices)
+        return pd.DataFrame(sig).astype(float)
+    return features.FEATURES.get("signals", prices,
+                                 (strategy_name, cell_key(params)), compute)
+
+
+def variant_returns(prices: pd.DataFrame, strategy_name: str,
+                    cells: list[dict], tc: float) -> pd.DataFrame:
+    """(T, V) portfolio returns, one column per parameter set."""
+    check_causal(cells)
+    cols = {}
+    for i, params in enumerate(cells):
+        signals = variant_signals(prices, strategy_name, params)
+        results_df, _ = backtest_multi_asset(prices, signals, tc)
+        cols[i] = results_df["portfolio_return"]
+    return pd.DataFrame(cols, index=prices.index)
+
+
+# ---------------------------------------------------------------------
+# 3. Public runner
+# ---------------------------------------------------------------------
+def run_walk_forward(prices: pd.DataFrame,
+                     strategy_name: str,
+                     grid: dict[str, list] | list[dict],
+                     train: int = 756,
+                     test: int = 126,
+                     step: int | None = None,
+                     anchored: bool = False,
+                     metric: str = "sharpe",
+                     transaction_cost: float = 0.0,
+                     annualization: int = 252):
+    """
+    Parameters
+    ----------
+    prices          : cleaned price panel (columns = symbols)
+    strategy_name   : key in STRATEGY_REGISTRY
+    grid            : {param: [values]} or an explicit list of param dicts;
+                      look-ahead variants raise ValueError (`check_causal`)
+    train, test     : in-sample / out-of-sample window lengths in bars
+    step            : bars between successive windows (default = test)
+    anchored        : expanding in-sample window starting at bar 0
+    metric          : column of ``metrics.summarize`` to maximise in-sample
+
+    Returns
+    -------
+    (results_df, selections, metrics)
+        results_df : OOS ``portfolio_return`` / ``equity_curve`` / ``variant``
+        selections : one row per window – dates, chosen params, IS metric
+        metrics    : summary metrics of the stitched OOS returns
+    """
+    cells = param_grid(grid) if isinstance(grid, dict) else list(grid)
+    windows = walk_forward_windows(len(prices), train, test, step, anchored)
+    if not windows:
+        raise ValueError(f"panel of {len(prices)} bars is shorter than train={train}")
+    print(f"[+] Walk-forward {strategy_name}: {len(cells)} variants × "
+          f"{len(windows)} windows")
+
+    rets = variant_returns(prices, strategy_name, cells, transaction_cost)
+    values = rets.to_numpy()
+
+    oos = pd.Series(np.nan, index=prices.index)
+    chosen = pd.Series(-1, index=prices.index)
+    rows = []
+    for is_start, is_end, oos_start, oos_end in windows:
+        scores = summarize(values[is_start:is_end],
+                           annualization=annualization)[metric].to_numpy()
+        best = int(np.nanargmax(np.where(np.isnan(scores), -np.inf, scores)))
+        oos.iloc[oos_start:oos_end] = values[oos_start:oos_end, best]
+        chosen.iloc[oos_start:oos_end] = best
+        rows.append({"is_start": prices.index[is_start],
+                     "is_end": prices.index[is_end - 1],
+                     "oos_start": prices.index[oos_start],
+                     "oos_end": prices.index[oos_end - 1],
+                     **cells[best],
+                     f"is_{metric}": scores[best]})
+
+    oos = oos.iloc[windows[0][2]:]
+    results_df = pd.DataFrame({
+        "portfolio_return": oos,
+        "equity_curve": (1 + oos).cumprod(),
+        "variant": chosen.iloc[windows[0][2]:],
+    })
+    metrics = summarize(oos.to_numpy(), annualization=annualization).iloc[0].to_dict()
+    return results_df, pd.DataFrame(rows), metrics
@@ -0,0 +1,22 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def make_panel(T: int = 160, N: int = 4, seed: int = 0,
+               nan_lead: bool = True) -> pd.DataFrame:
+    """Random-walk price panel; with `nan_lead` two columns start late."""
+    rng = np.random.default_rng(seed)
+    r = rng.normal(0.0003, 0.015, size=(T, N))
+    p = 100 * np.cumprod(1 + r, axis=0)
+    idx = pd.bdate_range("2015-01-01", periods=T)
+    df = pd.DataFrame(p, index=idx, columns=[f"S{i}" for i in range(N)])
+    if nan_lead:
+        df.iloc[:30, 1] = np.nan
+        df.iloc[:75, N - 1] = np.nan
+    return df
+
+
+@pytest.fixture
+def panel() -> pd.DataFrame:
+    return make_panel()
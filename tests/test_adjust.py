@@ -0,0 +1,130 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from lib.adjust import (IncrementalAdjuster, back_adjust, back_adjust_incremental,
+                        detect_rolls, roll_gaps, state_dir)
+
+ROLLS = {"A": [100, 200], "B": [150, 126], "C": [90]}
+
+
+def make_raw(T=300, seed=0):
+    """Random walks around 100 with planted roll jumps and NaN gaps."""
+    rng = np.random.default_rng(seed)
+    idx = pd.bdate_range("2019-01-01", periods=T)
+    raw = pd.DataFrame(100 + np.cumsum(rng.normal(0, 0.5, (T, 3)), axis=0),
+                       index=idx, columns=list("ABC"))
+    raw.iloc[100:, 0] += 15.0
+    raw.iloc[200:, 0] -= 12.0
+    raw.iloc[150:, 1] += 20.0
+    raw.iloc[126:, 1] += 10.0                  # first bar after a hole
+    raw.iloc[90:, 2] *= 1.2
+    raw.iloc[:40, 1] = np.nan                  # late start
+    raw.iloc[120:126, 1] = np.nan              # interior hole
+    raw.iloc[60:63, 2] = np.nan
+    raw.iloc[:5, 2] = np.nan
+    return raw
+
+
+def reference_detect_roll(series: pd.Series, thresh: float = 5.0) -> list:
+    """Pre-vectorisation detector, applied to the series' valid bars."""
+    s = series.dropna()
+    atr10 = s.diff().abs().rolling(10).mean()
+    mask = (s.diff().abs() > thresh * atr10).fillna(False)
+    return list(s.index[mask])
+
+
+def test_detect_rolls_matches_per_series_detector():
+    raw = make_raw()
+    mask = detect_rolls(raw)
+    for col in raw:
+        got = list(raw.index[mask[col].to_numpy()])
+        assert got == reference_detect_roll(raw[col])
+        assert got == sorted(raw.index[ROLLS[col]])
+    assert not mask.to_numpy()[raw.isna().to_numpy()].any()
+
+
+@pytest.mark.parametrize("method", ["diff", "panama", "ratio"])
+def test_back_adjust_is_continuous_across_rolls(method):
+    raw = make_raw()
+    adj = back_adjust(raw, method)
+    rolls = detect_rolls(raw)
+    assert adj.isna().equals(raw.isna())
+    for col in raw:
+        r, a = raw[col].dropna(), adj[col].dropna()
+        is_roll = rolls[col].loc[r.index].to_numpy()
+        if method == "ratio":
+            raw_move, adj_move = r.pct_change(), a.pct_change()
+        else:
+            raw_move, adj_move = r.diff(), a.diff()
+        # the roll jump is removed …
+        np.testing.assert_allclose(adj_move[is_roll], 0.0, atol=1e-9)
+        # … every other move (over NaN holes too) is kept
+        np.testing.assert_allclose(adj_move[~is_roll].iloc[1:],
+                                   raw_move[~is_roll].iloc[1:], rtol=1e-9, atol=1e-9)
+        # the latest contract is unchanged
+        last = r.index[is_roll][-1]
+        np.testing.assert_allclose(a.loc[last:], r.loc[last:], rtol=1e-12)
+
+
+def test_roll_gaps_sign_and_layout():
+    raw = make_raw()
+    diff_gaps = roll_gaps(raw, "diff")
+    ratio_gaps = roll_gaps(raw, "ratio")
+    assert diff_gaps["A"].iloc[100] == pytest.approx(raw["A"].iloc[100] - raw["A"].iloc[99])
+    assert diff_gaps["A"].iloc[100] > 10 and diff_gaps["A"].iloc[200] < -10
+    # the gap after a hole is taken against the last valid bar
+    assert diff_gaps["B"].iloc[126] == pytest.approx(raw["B"].iloc[126] - raw["B"].iloc[119])
+    assert ratio_gaps["C"].iloc[90] == pytest.approx(raw["C"].iloc[90] / raw["C"].iloc[89])
+    assert diff_gaps.isna().equals(raw.isna())
+    non_roll = (~detect_rolls(raw) & raw.notna()).to_numpy()
+    assert (diff_gaps.to_numpy()[non_roll] == 0).all()
+    assert (ratio_gaps.to_numpy()[non_roll] == 1).all()
+
+
+def test_unknown_method_raises():
+    with pytest.raises(ValueError, match="Unknown back-adjust method"):
+        back_adjust(make_raw(), "nearest")
+
+
+# ---------------------------------------------------------------------
+# incremental adjustment (persisted state)
+# ---------------------------------------------------------------------
+# chunk edges: rows 100 (A) and 150 (B) are rolls on the first bar of a chunk
+EDGES = [0, 60, 100, 150, 230, 300]
+
+
+@pytest.mark.parametrize("method", ["diff", "ratio"])
+def test_incremental_chunks_match_full_recompute(tmp_path, method):
+    raw = make_raw()
+    full = back_adjust(raw, method)
+    adj = IncrementalAdjuster(method)
+    for k, (lo, hi) in enumerate(zip(EDGES[:-1], EDGES[1:])):
+        adj.update(raw.iloc[lo:hi])
+        path = str(tmp_path / f"state{k}")
+        adj.save(path)
+        adj = IncrementalAdjuster.load(path)
+        want = back_adjust(raw.iloc[:hi], method)
+        pd.testing.assert_frame_equal(adj.adjusted().reindex(columns=raw.columns),
+                                      want, check_freq=False, rtol=1e-12, atol=1e-9)
+    pd.testing.assert_frame_equal(adj.adjusted(), full, check_freq=False,
+                                  rtol=1e-12, atol=1e-9)
+    assert sorted(zip(adj.rolls.symbol, adj.rolls.date)) == sorted(
+        (col, raw.index[i]) for col, rows in ROLLS.items() for i in rows)
+
+
+def test_back_adjust_incremental_resumes_from_state_dir(tmp_path):
+    raw = make_raw()
+    panel_path = str(tmp_path / "panel.parquet")
+    for hi in EDGES[1:]:
+        # callers pass the whole history so far; processed rows are skipped
+        got = back_adjust_incremental(raw.iloc[:hi], panel_path, "diff")
+    assert os.path.exists(os.path.join(state_dir(panel_path), "state.json"))
+    pd.testing.assert_frame_equal(got, back_adjust(raw, "diff"), check_freq=False,
+                                  rtol=1e-12, atol=1e-9)
+    # a different method ignores the stored state and starts over
+    ratio = back_adjust_incremental(raw, panel_path, "ratio")
+    pd.testing.assert_frame_equal(ratio, back_adjust(raw, "ratio"), check_freq=False,
+                                  rtol=1e-12, atol=1e-9)
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from lib.alpha import regress, resample_returns, rolling_regress
+
+
+def _returns(T=120, seed=0):
+    rng = np.random.default_rng(seed)
+    idx = pd.bdate_range("2020-01-01", periods=T)
+    bench = pd.DataFrame(rng.normal(0, 0.01, (T, 2)), index=idx, columns=["SPX", "AGG"])
+    strat = pd.DataFrame({"s": 0.001 + 0.5 * bench["SPX"] - 0.2 * bench["AGG"]
+                               + rng.normal(0, 0.001, T)}, index=idx)
+    return strat, bench
+
+
+def test_rolling_regress_matches_full_fit_on_last_window():
+    strat, bench = _returns()
+    rolled = rolling_regress(strat, bench, window=60)
+    full = regress(strat.iloc[-60:], bench.iloc[-60:])
+    assert rolled["alpha"]["s"].iloc[-1] == pytest.approx(full.loc["s", "alpha"])
+    assert rolled["beta_SPX"]["s"].iloc[-1] == pytest.approx(full.loc["s", "beta_SPX"])
+    assert rolled["alpha"]["s"].iloc[:59].isna().all()
+
+
+def test_rolling_regress_rejects_windows_shorter_than_the_model():
+    strat, bench = _returns()
+    rolling_regress(strat, bench, window=4)                 # alpha + 2 betas + 1
+    with pytest.raises(ValueError, match="window=3"):
+        rolling_regress(strat, bench, window=3)
+
+
+def test_resample_returns_month_end():
+    strat, _ = _returns()
+    monthly = resample_returns(strat["s"])
+    assert monthly.index.is_month_end.all()
+    assert monthly.sum() == pytest.approx(strat["s"].sum())
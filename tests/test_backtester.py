@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from lib.backtester.backtester import (PORTFOLIO_METRICS, SINGLE_METRICS,
+                                       backtest_multi_asset, backtest_per_asset,
+                                       backtest_strategy, compute_strategy_returns)
+
+
+def gapped(panel: pd.DataFrame, seed: int = 1):
+    """Panel with interior NaN holes and sparse signals (0 = hold, NaN = hold)."""
+    rng = np.random.default_rng(seed)
+    prices = panel.copy()
+    prices.iloc[50:55, 0] = np.nan
+    prices.iloc[100, 2] = np.nan
+    signals = pd.DataFrame(rng.choice([-1.0, 0.0, 0.0, 0.5, 1.0], size=panel.shape),
+                           index=panel.index, columns=panel.columns)
+    signals.iloc[20:24, 1] = np.nan
+    return prices, signals
+
+
+def reference_strategy_returns(prices: pd.Series, signals: pd.Series, tc: float):
+    """Pre-kernel per-series computation."""
+    returns = prices.pct_change(fill_method=None).fillna(0.0)
+    positions = signals.replace(0, np.nan).shift(1).ffill().fillna(0.0)
+    trades = positions.diff().abs().fillna(0.0)
+    trade_cost = trades * tc
+    strat_returns = positions * returns
+    strat_returns[trades != 0] -= trade_cost[trades != 0]
+    return strat_returns, (1 + strat_returns).cumprod(), positions, trades
+
+
+def reference_single_metrics(prices, signals, tc, annualization=252) -> dict:
+    sr, eq, positions, trades = reference_strategy_returns(prices, signals, tc)
+    mask = positions != 0
+    holdings = mask.astype(float)
+    groups = (holdings != holdings.shift()).cumsum()
+    lengths = holdings.groupby(groups).sum()[holdings.groupby(groups).first().eq(1)]
+    return {
+        "total_return": eq.iloc[-1] - 1,
+        "cagr": eq.iloc[-1] ** (annualization / len(sr)) - 1,
+        "volatility": sr.std() * np.sqrt(annualization),
+        "sharpe": sr.mean() / (sr.std() + 1e-10) * np.sqrt(annualization),
+        "max_drawdown": (eq / eq.cummax() - 1).min(),
+        "total_trades": int(trades.sum()),
+        "hit_rate": sr[mask].gt(0).sum() / mask.sum() if mask.sum() > 0 else np.nan,
+        "avg_holding_period": lengths.mean() if not lengths.empty else 0,
+    }
+
+
+@pytest.mark.parametrize("tc", [0.0, 0.002])
+def test_kernel_matches_per_series_computation(panel, tc):
+    prices, signals = gapped(panel)
+    for col in prices:
+        got = compute_strategy_returns(prices[col], signals[col], tc)
+        want = reference_strategy_returns(prices[col], signals[col], tc)
+        for g, w in zip(got, want):
+            pd.testing.assert_series_equal(g, w, check_names=False,
+                                           rtol=1e-12, atol=1e-15)
+
+        _, metrics = backtest_strategy(prices[col], signals[col], tc)
+        ref = reference_single_metrics(prices[col], signals[col], tc)
+        for key in SINGLE_METRICS:
+            assert metrics[key] == pytest.approx(ref[key], rel=1e-10, abs=1e-12), (col, key)
+
+
+@pytest.mark.parametrize("tc", [0.0, 0.002])
+def test_single_multi_and_per_asset_backtests_agree(panel, tc):
+    prices, signals = gapped(panel)
+    res, per_asset = backtest_per_asset(prices, signals, tc)
+    multi_df, multi = backtest_multi_asset(prices, signals, tc)
+
+    singles = {}
+    for j, col in enumerate(prices):
+        df, metrics = backtest_strategy(prices[col], signals[col], tc)
+        singles[col] = df["strategy_return"]
+        np.testing.assert_allclose(df["strategy_return"], res["strategy_returns"][:, j],
+                                   rtol=1e-12, atol=1e-15)
+        np.testing.assert_allclose(df["equity_curve"], res["equity"][:, j], rtol=1e-12)
+        for key, value in metrics.items():
+            assert per_asset.loc[col, key] == pytest.approx(value, rel=1e-12, nan_ok=True)
+
+    # the portfolio is the sum of the single-asset strategy returns
+    portfolio = pd.DataFrame(singles).sum(axis=1)
+    np.testing.assert_allclose(multi_df["portfolio_return"], portfolio,
+                               rtol=1e-12, atol=1e-15)
+    np.testing.assert_allclose(multi_df["equity_curve"], (1 + portfolio).cumprod(),
+                               rtol=1e-12)
+    eq = (1 + portfolio).cumprod()
+    want = {
+        "total_return": eq.iloc[-1] - 1,
+        "cagr": eq.iloc[-1] ** (252 / len(portfolio)) - 1,
+        "volatility": portfolio.std() * np.sqrt(252),
+        "sharpe": portfolio.mean() / (portfolio.std() + 1e-10) * np.sqrt(252),
+        "max_drawdown": (eq / eq.cummax() - 1).min(),
+    }
+    for key in PORTFOLIO_METRICS:
+        assert multi[key] == pytest.approx(want[key], rel=1e-10, abs=1e-12), key
+    assert multi["total_trades"] == int(signals.diff().abs().sum().sum())
+
+
+def test_costs_are_charged_on_the_trade_bar(panel):
+    prices = panel[["S0"]]
+    signals = pd.DataFrame(0.0, index=prices.index, columns=prices.columns)
+    signals.iloc[[10, 40]] = [[1.0], [-1.0]]
+    res, _ = backtest_per_asset(prices, signals, transaction_cost=0.01)
+    # one-bar lag: enter on bar 11 (|Δ| = 1), flip on bar 41 (|Δ| = 2)
+    np.testing.assert_array_equal(np.flatnonzero(res["trades"][:, 0]), [11, 41])
+    np.testing.assert_allclose(res["costs"][[11, 41], 0], [0.01, 0.02])
+    assert res["positions"][-1, 0] == -1.0
@@ -0,0 +1,72 @@
+import pandas as pd
+import pytest
+
+from lib import loaders
+from lib.cache import PriceCache, refresh
+from lib.fetch import EmptyResultError
+
+
+def _bars(dates) -> pd.DataFrame:
+    idx = pd.DatetimeIndex(pd.to_datetime(dates))
+    return pd.DataFrame({"Close": range(len(idx))}, index=idx, dtype=float)
+
+
+def test_empty_past_range_is_not_covered_unless_confirmed(tmp_path):
+    cache = PriceCache(str(tmp_path))
+    cache.append("X", _bars([]), "2020-01-01", "2020-01-31")
+    assert cache.coverage("X") == []
+    cache.append("X", _bars([]), "2020-01-01", "2020-01-31", confirmed_empty=True)
+    assert cache.coverage("X") == [(pd.Timestamp("2020-01-01"), pd.Timestamp("2020-01-31"))]
+
+
+def test_refresh_only_covers_ranges_with_bars_or_confirmation(tmp_path):
+    cache = PriceCache(str(tmp_path))
+
+    def fetch_range(sym, a, b):
+        if sym == "FULL":
+            return _bars(pd.bdate_range(a, b))
+        if sym == "HOLIDAY":
+            empty = _bars([])
+            empty.attrs["confirmed_empty"] = True
+            return empty
+        return _bars([])                      # silent vendor failure
+
+    refresh(cache, ["FULL", "HOLIDAY", "SILENT"], "2020-01-06", "2020-01-10",
+            fetch_range, vendor="test")
+    assert cache.missing("FULL", "2020-01-06", "2020-01-10") == []
+    assert cache.missing("HOLIDAY", "2020-01-06", "2020-01-10") == []
+    assert cache.missing("SILENT", "2020-01-06", "2020-01-10") == [
+        (pd.Timestamp("2020-01-06"), pd.Timestamp("2020-01-10"))]
+
+
+class _FakeTicker:
+    def __init__(self, bars: pd.DataFrame):
+        self.bars = bars
+
+    def history(self, start, end, **kwargs):
+        return self.bars.loc[pd.Timestamp(start):pd.Timestamp(end) - pd.Timedelta(days=1)]
+
+
+@pytest.fixture
+def fake_yf(monkeypatch):
+    class _YF:
+        bars = _bars([])
+
+        def Ticker(self, ticker):
+            return _FakeTicker(self.bars)
+
+    yf = _YF()
+    monkeypatch.setattr(loaders, "_yf", lambda: yf)
+    return yf
+
+
+def test_fetch_ohlcv_confirms_holiday_gaps(fake_yf):
+    fake_yf.bars = _bars(["2020-12-23", "2020-12-24", "2020-12-28"])
+    out = loaders.fetch_ohlcv("ES=F", "2020-12-25", "2020-12-25")
+    assert out.empty and out.attrs["confirmed_empty"]
+
+
+def test_fetch_ohlcv_raises_when_vendor_has_nothing_around(fake_yf):
+    fake_yf.bars = _bars(["2020-01-02"])
+    with pytest.raises(EmptyResultError):
+        loaders.fetch_ohlcv("ES=F", "2020-12-25", "2020-12-25")
@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from lib.covariance import (EWMACovariance, FactorCovariance, RollingCovariance,
+                            iter_ewma_cov, iter_factor_cov, iter_rolling_cov,
+                            ledoit_wolf, rolling_cov, rolling_factor_cov)
+
+
+def _pandas_cov(returns, t, window):
+    return returns.iloc[max(0, t - window + 1):t + 1].cov().to_numpy()
+
+
+def test_iter_rolling_cov_matches_pandas(panel):
+    returns = panel.pct_change(fill_method=None)
+    for t, cov in enumerate(iter_rolling_cov(returns, 20)):
+        if t >= 80:                         # every column observed
+            np.testing.assert_allclose(cov, _pandas_cov(returns, t, 20),
+                                       rtol=1e-9, atol=1e-15)
+
+
+def test_pairwise_nan_handling(panel):
+    returns = panel.pct_change(fill_method=None)
+    t = 40                                  # last column not started yet
+    cov = rolling_cov(returns, 20)[t]
+    want = _pandas_cov(returns, t, 20)
+    np.testing.assert_array_equal(np.isnan(cov), np.isnan(want))
+    np.testing.assert_allclose(cov, want, rtol=1e-9, atol=1e-15)
+
+
+def test_refresh_removes_add_remove_drift():
+    # a large level makes add/remove cancellation lose digits
+    rng = np.random.default_rng(1)
+    x = 1e4 + rng.normal(size=(3000, 3))
+    exact = np.cov(x[-10:], rowvar=False)
+    drifting = RollingCovariance(3, 10, refresh=10**9)
+    refreshed = RollingCovariance(3, 10)
+    for row in x:
+        a, b = drifting.update(row), refreshed.update(row)
+    assert np.max(np.abs(b - exact)) < np.max(np.abs(a - exact))
+    np.testing.assert_allclose(b, exact, rtol=1e-6)
+
+
+def test_ewma_cov_matches_pandas(panel):
+    returns = panel.pct_change(fill_method=None).iloc[80:]      # no gaps
+    N = returns.shape[1]
+    want = (returns.ewm(alpha=0.1, adjust=False).cov(bias=True)
+            .to_numpy().reshape(len(returns), N, N))
+    covs = list(iter_ewma_cov(returns, 0.1))
+    assert np.isnan(covs[0]).all()
+    np.testing.assert_allclose(np.stack(covs[1:]), want[1:], rtol=1e-9, atol=1e-18)
+
+
+def test_ewma_covariance_single_series():
+    x = [1.0, 2.0, 3.0, 4.0, 5.0]
+    eng = EWMACovariance(1, alpha=0.1)
+    for v in x:
+        cov = eng.update([v])
+    want = pd.Series(x).ewm(alpha=0.1, adjust=False).var(bias=True).iloc[-1]
+    assert cov[0, 0] == pytest.approx(want)
+
+
+def _factor_returns(T=300, N=12, seed=0):
+    rng = np.random.default_rng(seed)
+    loadings = rng.normal(size=(N, 2)) * 0.01
+    return rng.normal(size=(T, 2)) @ loadings.T + rng.normal(size=(T, N)) * 0.005
+
+
+def test_ledoit_wolf_is_low_rank_plus_shrunk_diagonal():
+    x = _factor_returns()[-60:]
+    B, d, delta, mu = ledoit_wolf(x, n_factors=12)      # k = N: no truncation
+    X = x - x.mean(axis=0)
+    S = X.T @ X / len(X)
+    want = (1 - delta) * S + delta * mu * np.eye(S.shape[0])
+    cov = FactorCovariance(B, d, delta, mu)
+    np.testing.assert_allclose(cov.dense(), want, rtol=1e-9, atol=1e-15)
+    B3, d3, delta3, _ = ledoit_wolf(x, n_factors=3)
+    assert B3.shape == (12, 3) and delta3 == delta
+    np.testing.assert_allclose(np.diag(FactorCovariance(B3, d3, delta, mu).dense()),
+                               np.diag(want), rtol=1e-9)
+
+
+def test_factor_refit_and_blend():
+    x = _factor_returns()
+    exact = list(iter_factor_cov(x, 60, "pca", 2, refit=1))
+    t = 200
+    np.testing.assert_allclose(exact[t].dense(), _pca_cov_reference(x[t - 59:t + 1], 2),
+                               rtol=1e-9, atol=1e-15)
+    # between refits the window is projected on stale directions: close
+    stale = list(iter_factor_cov(x, 60, "pca", 2))
+    w = np.ones(x.shape[1])
+    vol_ratio = [np.sqrt(stale[s].portfolio_var(w) / exact[s].portfolio_var(w))
+                 for s in range(100, 300)]
+    np.testing.assert_allclose(vol_ratio, 1.0, rtol=0.06)
+
+    stack = rolling_factor_cov(x, 60, "ledoit_wolf", 2)
+    short = list(iter_factor_cov(x, 20, "ledoit_wolf", 2))
+    blend = stack[t].blend(short[t], 0.3)
+    np.testing.assert_allclose(blend.portfolio_var(w), w @ blend.dense() @ w, rtol=1e-12)
+    np.testing.assert_allclose(blend.dense(),
+                               0.7 * stack[t].dense() + 0.3 * short[t].dense(), rtol=1e-12)
+
+
+def _pca_cov_reference(window, k):
+    X = window - window.mean(axis=0)
+    S = X.T @ X / (len(X) - 1)
+    vals, vecs = np.linalg.eigh(S)
+    top = vecs[:, -k:] * vals[-k:]
+    low_rank = top @ vecs[:, -k:].T
+    return low_rank + np.diag(np.diag(S - low_rank))
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from lib import features
+from lib.features import FeatureStore, fingerprint
+
+
+def test_fingerprint_is_hashed_once_per_frame(panel, monkeypatch):
+    calls = []
+    real = features._content_hash
+    monkeypatch.setattr(features, "_content_hash",
+                        lambda f: calls.append(1) or real(f))
+    a = fingerprint(panel)
+    assert fingerprint(panel) == a and len(calls) == 1
+    assert fingerprint(panel.copy()) == a and len(calls) == 2   # same content
+
+
+def test_fingerprint_entry_dies_with_frame(panel):
+    frame = panel.copy()
+    key = id(frame)
+    fingerprint(frame)
+    assert key in features._FINGERPRINTS
+    del frame
+    assert key not in features._FINGERPRINTS
+
+
+def test_forget_after_in_place_edit(panel):
+    frame = panel.copy()
+    before = fingerprint(frame)
+    frame.iloc[-1, 0] = 1.0
+    features.forget(frame)
+    assert fingerprint(frame) != before
+
+
+def test_returned_values_do_not_alias_the_cache(panel):
+    store = FeatureStore()
+    compute = lambda: panel.pct_change(fill_method=None)
+    first = store.get("returns", panel, (), compute)
+    first.iloc[5, 0] = 123.0
+    again = store.get("returns", panel, (), compute)
+    assert again.iloc[5, 0] != 123.0 and store.hits == 1
+
+    arr = store.get("arr", panel, (), lambda: np.arange(3.0))
+    assert not arr.flags.writeable
@@ -0,0 +1,123 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import pytest
+
+from lib import fetch, loaders
+from lib.fetch import FetchError, RateLimiter, fetch_many
+
+
+def _bars(day0: int, n: int) -> list[dict]:
+    ms = 86_400_000
+    return [{"t": (day0 + i) * ms, "o": 1.0, "h": 1.0, "l": 1.0,
+             "c": float(day0 + i), "v": 10} for i in range(n)]
+
+
+class _Stub(BaseHTTPRequestHandler):
+    """
+    /v2/aggs/ticker/<sym>/...  Polygon aggregates for a few canned symbols:
+      C:OK     two pages linked by next_url
+      C:FLAKY  429, then 503, then one page
+      C:BAD    403 forever
+    """
+    hits: list = []
+    lock = threading.Lock()
+    flaky_calls = 0
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        with self.lock:
+            self.hits.append((time.monotonic(), path))
+        if path == "/page2":
+            return self._send(200, {"results": _bars(2, 2)})
+        sym = path.split("/")[4]
+        if sym == "C:OK":
+            host = f"http://{self.headers['Host']}"
+            return self._send(200, {"results": _bars(0, 2),
+                                    "next_url": f"{host}/page2?cursor=abc"})
+        if sym == "C:FLAKY":
+            with self.lock:
+                type(self).flaky_calls += 1
+                n = self.flaky_calls
+            if n == 1:
+                return self._send(429, {"message": "slow down"})
+            if n == 2:
+                return self._send(503, {"message": "unavailable"})
+            return self._send(200, {"results": _bars(0, 3)})
+        return self._send(403, {"message": "not entitled"})
+
+
+@pytest.fixture
+def polygon_stub(monkeypatch):
+    _Stub.hits = []
+    _Stub.flaky_calls = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Stub)
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    monkeypatch.setattr(loaders, "BASE_URL", f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setattr(loaders, "_polygon_key", lambda: "test-key")
+    monkeypatch.setitem(fetch._LIMITERS, "polygon", RateLimiter(1000.0, burst=100))
+    yield _Stub
+    server.shutdown()
+    server.server_close()
+
+
+def test_pagination_follows_next_url(polygon_stub):
+    df = loaders.get_futures_aggregates("C:OK", 1, "day", "1970-01-01", "1970-01-10")
+    assert df["close"].tolist() == [0.0, 1.0, 2.0, 3.0]
+    assert [p for _, p in polygon_stub.hits][-1] == "/page2"
+
+
+def test_retry_with_backoff_on_429_and_5xx(polygon_stub, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(fetch.time, "sleep", sleeps.append)
+    df = loaders.get_futures_aggregates("C:FLAKY", 1, "day", "1970-01-01", "1970-01-10")
+    assert len(df) == 3
+    assert polygon_stub.flaky_calls == 3
+    # jittered exponential backoff: 0.5·[0.5, 1), then 1.0·[0.5, 1)
+    assert len(sleeps) == 2
+    assert 0.25 <= sleeps[0] < 0.5 and 0.5 <= sleeps[1] < 1.0
+
+
+def test_rate_limiter_spaces_requests(polygon_stub, monkeypatch):
+    monkeypatch.setitem(fetch._LIMITERS, "polygon", RateLimiter(20.0))
+    for _ in range(3):
+        loaders.get_futures_aggregates("C:OK", 1, "day", "1970-01-01", "1970-01-10")
+    times = [t for t, _ in polygon_stub.hits]
+    assert len(times) == 6                     # 3 × two pages
+    assert times[-1] - times[0] >= 5 / 20 * 0.9
+
+
+def test_per_symbol_failures_are_reported(polygon_stub, capsys):
+    df = loaders._polygon_multi(["C:OK", "C:BAD"], "1970-01-01", "1970-01-10")
+    assert list(df.columns) == ["C:OK"]
+    assert "failed to download C:BAD from polygon" in capsys.readouterr().out
+
+
+def test_all_symbols_failing_raises_listing_them(polygon_stub):
+    with pytest.raises(FetchError) as err:
+        loaders._polygon_multi(["C:BAD", "C:BAD2"], "1970-01-01", "1970-01-10")
+    assert set(err.value.failures) == {"C:BAD", "C:BAD2"}
+    assert "HTTP 403" in str(err.value)
+
+
+def test_fetch_many_can_allow_all_failures():
+    def boom(sym):
+        raise RuntimeError(sym)
+    results, failures = fetch_many(["a", "b"], boom, "test", attempts=1,
+                                   require_any=False)
+    assert results == {} and set(failures) == {"a", "b"}
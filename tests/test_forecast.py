@@ -0,0 +1,37 @@
+import json
+
+import numpy as np
+import pytest
+
+from lib.indicators.forecast import (CARVER_SCALARS, estimate_forecast_scalars,
+                                     ewmac_forecasts)
+
+
+def test_speeds_from_json_are_accepted(panel):
+    speeds = json.loads("[[8, 32], [16, 64]]")
+    a = ewmac_forecasts(panel, speeds)
+    b = ewmac_forecasts(panel, ((8, 32), (16, 64)))
+    np.testing.assert_array_equal(a, b)
+    assert estimate_forecast_scalars(panel, speeds).shape == (2,)
+
+
+def test_default_uses_published_scalars(panel):
+    speeds = [(8, 32)]
+    got = ewmac_forecasts(panel, speeds)
+    want = ewmac_forecasts(panel, speeds, scalars=[CARVER_SCALARS[(8, 32)]])
+    np.testing.assert_array_equal(got, want)
+
+
+@pytest.mark.parametrize("scalars", [None, "expanding"])
+def test_default_scalars_do_not_look_ahead(panel, scalars):
+    speeds = [(3, 12), (8, 32)]               # (3, 12) has no published scalar
+    head = ewmac_forecasts(panel.iloc[:100], speeds, scalars)
+    full = ewmac_forecasts(panel, speeds, scalars)
+    np.testing.assert_allclose(full[:, :100], head, atol=1e-12)
+    assert np.abs(full[:, -1]).sum() > 0
+
+
+def test_full_sample_scalars_look_ahead(panel):
+    head = ewmac_forecasts(panel.iloc[:100], [(8, 32)], "full")
+    full = ewmac_forecasts(panel, [(8, 32)], "full")
+    assert not np.allclose(full[:, :100], head)
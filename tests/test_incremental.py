@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from lib import features
+from lib.indicators import incremental as inc
+from lib.indicators.trending_indicator import macd_signal, macd_signal_prices, trend_mask
+from lib.strat.portfolio_risk_scaled_strategy import PortfolioRiskScaledStrategy
+from lib.strat.risk_scaled_strategy import RiskScaledBuyAndHoldStrategy
+from lib.strat.variable_risk_scaled_strategy import VariableRiskScaledBuyAndHoldStrategy
+
+
+def _stream(state, frame) -> np.ndarray:
+    return np.vstack([state.update(row) for row in frame.to_numpy(dtype=float)])
+
+
+def _check(state, frame, batch, rtol=1e-9, atol=1e-12):
+    got = _stream(state, frame)
+    want = np.asarray(batch, dtype=float)
+    np.testing.assert_array_equal(np.isnan(got), np.isnan(want))
+    np.testing.assert_allclose(got, want, rtol=rtol, atol=atol)
+
+
+@pytest.fixture
+def returns(panel):
+    rets = panel.pct_change(fill_method=None)
+    rets.iloc[50:53, 0] = np.nan                 # gaps inside a live column
+    return rets
+
+
+@pytest.mark.parametrize("fill", [None, 0.0])
+def test_pct_return(panel, fill):
+    want = panel.pct_change(fill_method=None)
+    _check(inc.PctReturnState(fill), panel, want if fill is None else want.fillna(fill))
+
+
+@pytest.mark.parametrize("adjust", [False, True])
+def test_ew_mean(returns, adjust):
+    _check(inc.EWMeanState(0.1, adjust), returns, returns.ewm(alpha=0.1, adjust=adjust).mean())
+
+
+@pytest.mark.parametrize("adjust", [False, True])
+def test_ew_var(returns, adjust):
+    _check(inc.EWVarState(0.1, adjust), returns,
+           returns.ewm(alpha=0.1, adjust=adjust).var(bias=False))
+
+
+@pytest.mark.parametrize("adjust", [False, True])
+def test_ew_std(returns, adjust):
+    _check(inc.EWStdState(0.1, adjust), returns, returns.ewm(alpha=0.1, adjust=adjust).std())
+
+
+@pytest.mark.parametrize("min_periods", [None, 5])
+def test_rolling_std(returns, min_periods):
+    _check(inc.RollingStdState(20, min_periods), returns,
+           returns.rolling(20, min_periods=min_periods).std())
+
+
+def test_ewmac_prices(panel):
+    _check(inc.EWMACState(0.15, 0.03, on="prices"), panel, macd_signal_prices(panel))
+
+
+def test_ewmac_returns(panel):
+    _check(inc.EWMACState(0.15, 0.03, on="returns"), panel, macd_signal(panel))
+
+
+def test_trend_mask(panel):
+    _check(inc.TrendMaskState(), panel, trend_mask(panel))
+
+
+def test_return_vol(panel):
+    _check(inc.ReturnVolState(0.1), panel, features.ew_std(panel, 0.1) * np.sqrt(252))
+
+
+def test_risk_scaled_position(panel):
+    _check(inc.RiskScaledPositionState(0.2, 20), panel,
+           RiskScaledBuyAndHoldStrategy(0.2, 20).generate_signals(panel))
+
+
+def test_vol_scaled_position(panel):
+    _check(inc.VolScaledPositionState(), panel,
+           PortfolioRiskScaledStrategy().compute_vol_scaled_positions(panel, 0.6))
+
+
+def test_variable_risk_position(panel):
+    _check(inc.VariableRiskState(), panel,
+           VariableRiskScaledBuyAndHoldStrategy().generate_signals(panel))
+
+
+def test_checkpoint_round_trip_resumes_stream(panel, tmp_path):
+    head, tail = panel.iloc[:100], panel.iloc[100:]
+    states = {"pos": inc.RiskScaledPositionState(), "mask": inc.TrendMaskState()}
+    for st in states.values():
+        st.warm_up(head)
+    path = str(tmp_path / "states.npz")
+    inc.save_states(path, states)
+    loaded = inc.load_states(path)
+    for name, st in states.items():
+        np.testing.assert_array_equal(_stream(loaded[name], tail), _stream(st, tail))
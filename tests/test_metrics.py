@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from lib.backtester.metrics import holding_periods, summarize
+
+
+def returns_frame(panel: pd.DataFrame) -> pd.DataFrame:
+    """Panel returns (S1 / S3 start late with NaNs) plus an all-zero column."""
+    r = panel.pct_change(fill_method=None)
+    r.iloc[0] = r.iloc[0].fillna(0.0)
+    r.iloc[0, [1, 3]] = np.nan
+    r["flat"] = 0.0
+    return r
+
+
+def positions_frame(panel: pd.DataFrame, seed: int = 3) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    pos = pd.DataFrame(rng.choice([-1.0, 0.0, 0.0, 1.0, 2.0], size=panel.shape),
+                       index=panel.index, columns=panel.columns)
+    pos.iloc[:30, 1] = np.nan                       # not trading yet
+    pos.iloc[-5:, 2] = 1.0                          # run open at the end
+    pos["flat"] = 0.0
+    return pos
+
+
+def reference_holding(pos: pd.Series) -> tuple[float, float, int]:
+    """Plain run-length loop over the in-market bars."""
+    runs, length = [], 0
+    for p in pos.fillna(0.0):
+        if p != 0:
+            length += 1
+        elif length:
+            runs.append(length)
+            length = 0
+    if length:
+        runs.append(length)
+    if not runs:
+        return 0.0, 0.0, 0
+    return float(np.mean(runs)), float(max(runs)), len(runs)
+
+
+def test_summarize_matches_pandas(panel):
+    r = returns_frame(panel)
+    out = summarize(r)
+    assert list(out.index) == list(r.columns)
+    for col in r:
+        s = r[col]
+        eq = (1 + s.fillna(0.0)).cumprod()
+        std = s.std(ddof=1)
+        assert out.loc[col, "skew"] == pytest.approx(s.skew(), rel=1e-9, abs=1e-12)
+        assert out.loc[col, "volatility"] == pytest.approx(std * np.sqrt(252), rel=1e-12)
+        assert out.loc[col, "sharpe"] == pytest.approx(
+            s.mean() / (std + 1e-10) * np.sqrt(252), rel=1e-12, abs=1e-12)
+        assert out.loc[col, "max_drawdown"] == pytest.approx(
+            (eq / eq.cummax() - 1).min(), rel=1e-12, abs=1e-15)
+        assert out.loc[col, "total_return"] == pytest.approx(eq.iloc[-1] - 1, rel=1e-12)
+    # late starters: leading NaNs are not counted as flat bars
+    assert r["S3"].count() < len(r)
+    assert out.loc["S3", "cagr"] == pytest.approx(
+        (1 + r["S3"]).prod() ** (252 / r["S3"].count()) - 1, rel=1e-12)
+    # all-zero column
+    assert out.loc["flat", ["volatility", "sharpe", "skew", "max_drawdown"]].eq(0).all()
+
+
+def test_skew_needs_three_observations():
+    r = pd.DataFrame({"a": [np.nan, np.nan, 0.01, 0.02], "b": [0.01, -0.02, 0.0, 0.03]})
+    out = summarize(r)
+    assert np.isnan(out.loc["a", "skew"]) and np.isnan(r["a"].skew())
+    assert out.loc["b", "skew"] == pytest.approx(r["b"].skew(), rel=1e-12)
+
+
+def test_holding_periods_match_run_length_loop(panel):
+    pos = positions_frame(panel)
+    mean, longest, count = holding_periods(pos)
+    for j, col in enumerate(pos):
+        want = reference_holding(pos[col])
+        assert (mean[j], longest[j], count[j]) == pytest.approx(want), col
+    assert (mean[-1], longest[-1], count[-1]) == (0.0, 0.0, 0)
+
+
+def test_summarize_position_stats(panel):
+    r = returns_frame(panel)
+    pos = positions_frame(panel)
+    out = summarize(r, positions=pos, trades=pos.diff().abs())
+    for col in r:
+        held = pos[col].fillna(0.0) != 0
+        want = (r[col][held] > 0).sum() / held.sum() if held.any() else np.nan
+        assert out.loc[col, "hit_rate"] == pytest.approx(want, nan_ok=True), col
+        assert out.loc[col, "avg_holding_period"] == pytest.approx(
+            reference_holding(pos[col])[0]), col
+        assert out.loc[col, "total_trades"] == pytest.approx(pos[col].diff().abs().sum())
+    assert np.isnan(out.loc["flat", "hit_rate"])
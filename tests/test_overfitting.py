@@ -0,0 +1,33 @@
+import math
+
+import numpy as np
+
+from lib.overfitting import _combination_batches, cscv
+
+
+def test_combination_batches_walk_every_combination_once():
+    rows = np.concatenate(list(_combination_batches(8, chunk=9)))
+    assert len(rows) == math.comb(8, 4)
+    assert len({tuple(r) for r in rows}) == len(rows)
+
+
+def test_missing_oos_sharpe_counts_as_a_loss():
+    rng = np.random.default_rng(0)
+    r = rng.normal(0.0, 0.01, (400, 3))
+    # variant 0 is the best in-sample wherever it trades and flat elsewhere
+    r[:200, 0] = 0.01 + rng.normal(0.0, 1e-4, 200)
+    r[200:, 0] = np.nan
+    res = cscv(r, n_blocks=4)
+    no_oos = np.isnan(res["oos_sharpe"])
+    assert no_oos.any()
+    assert (res["logits"][no_oos] < 0).all()
+    assert res["prob_oos_loss"] >= no_oos.mean()
+
+
+def test_pool_and_batching_do_not_change_the_result():
+    r = np.random.default_rng(1).normal(0.0003, 0.01, (600, 5))
+    ref = cscv(r, n_blocks=8)
+    for workers, chunk in [(1, 7), (2, 11)]:
+        res = cscv(r, n_blocks=8, workers=workers, chunk=chunk)
+        np.testing.assert_array_equal(res["logits"], ref["logits"])
+        assert res["pbo"] == ref["pbo"]
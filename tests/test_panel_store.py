@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+from lib.panel_store import PanelStore
+
+
+def _bars(fields, start="2020-12-28", periods=6, level=1.0):
+    idx = pd.bdate_range(start, periods=periods)
+    return pd.DataFrame({f: level + np.arange(periods, dtype=float) for f in fields},
+                        index=idx)
+
+
+def test_fields_missing_from_the_first_symbol_are_still_read(tmp_path):
+    store = PanelStore(str(tmp_path))
+    store.write({"AAA": _bars(["Close"])})                      # no Open
+    store.write({"BBB": _bars(["Open", "Close"], level=10.0)})
+    opens = store.panel("Open")
+    assert list(opens.columns) == ["AAA", "BBB"]
+    assert opens["AAA"].isna().all()
+    assert opens["BBB"].iloc[0] == 10.0
+
+
+def test_panel_keeps_written_or_requested_symbol_order(tmp_path):
+    store = PanelStore(str(tmp_path))
+    store.write({"ZZ": _bars(["Close"]), "AA": _bars(["Close"]),
+                 "MM": _bars(["Close"])})
+    store.write({"AA": _bars(["Close"], start="2021-02-01")})   # existing symbol
+    assert store.symbols() == ["ZZ", "AA", "MM"]
+    assert list(store.panel().columns) == ["ZZ", "AA", "MM"]
+    assert list(store.panel(symbols=["MM", "ZZ"]).columns) == ["MM", "ZZ"]
+    window = store.panel(start="2021-01-01", end="2021-01-05")
+    assert window.index.min() >= pd.Timestamp("2021-01-01")
+    assert window.index.max() <= pd.Timestamp("2021-01-05")
@@ -0,0 +1,175 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from lib.backtester.backtester import backtest_multi_asset
+from lib.precision import DRIFT_TOL, as_compact, drift_report
+from lib.strat.portfolio_risk_scaled_strategy import PortfolioRiskScaledStrategy
+
+
+def _equity_over_time(t, positions, prices, initial_capital):
+    """Full-history O(t) equity, as used before the running-equity update."""
+    rets = prices.pct_change(fill_method=None).fillna(0.0)
+    port_ret = (positions.shift(1) * rets).sum(axis=1)
+    if t <= 1:
+        return float(initial_capital)
+    return float(initial_capital * (1.0 + port_ret.iloc[:t]).cumprod().iloc[-1])
+
+
+def reference_positions(strat, prices, initial_capital=1.0):
+    """Pre-optimisation position loop (pandas windows, full-history equity)."""
+    raw = strat.compute_vol_scaled_positions(prices, strat.target_vol)
+    returns = prices.pct_change(fill_method=None)
+    positions = pd.DataFrame(np.nan, index=raw.index, columns=raw.columns)
+    for t in range(1, len(raw)):
+        if t < strat.short_lookback or t < strat.long_lookback:
+            w0 = raw.iloc[t].copy()
+            nom = w0.abs().sum()
+            w0 = w0 / nom if nom > 0 else w0 * 0.0
+            positions.iloc[t] = w0.clip(upper=1.0)
+            continue
+        short_cov = returns.iloc[t - strat.short_lookback:t].cov()
+        long_cov = returns.iloc[t - strat.long_lookback:t].cov()
+        cov = ((1 - strat.lambda_) * long_cov + strat.lambda_ * short_cov).values
+        w = raw.iloc[t].values
+        vol = np.sqrt(w @ cov @ w) * np.sqrt(252)
+        scale = strat.target_vol / vol if vol > 0 else 1.0
+        if strat.rebalance:
+            scale *= initial_capital / _equity_over_time(t, positions, prices,
+                                                         initial_capital)
+        positions.iloc[t] = (raw.iloc[t] * scale).clip(upper=5.0)
+    return positions.fillna(0.0).ffill()
+
+
+@pytest.mark.parametrize("rebalance", [True, False])
+def test_running_equity_matches_full_history(panel, rebalance):
+    strat = PortfolioRiskScaledStrategy(trend_mode="none", rebalance=rebalance)
+    got = strat.generate_signals(panel)
+    want = reference_positions(strat, panel)
+    np.testing.assert_allclose(got.to_numpy(), want.to_numpy(), rtol=1e-10, atol=1e-12)
+
+
+def test_mask_overlay_applies_on_top(panel):
+    base = PortfolioRiskScaledStrategy(trend_mode="none").generate_signals(panel)
+    masked = PortfolioRiskScaledStrategy(trend_mode="mask").generate_signals(panel)
+    from lib.indicators.trending_indicator import trend_mask
+    want = (base * trend_mask(panel)).fillna(0.0)
+    np.testing.assert_allclose(masked.to_numpy(), want.to_numpy(), atol=1e-12)
+
+
+# ---------------------------------------------------------------------
+# forecast buffering  (lib.indicators.buffering)
+# ---------------------------------------------------------------------
+def reference_hysteresis(positions, forecast_df, threshold=0.05):
+    """Pre-vectorisation column × bar loop of trend_mode="strength"."""
+    rel_change = ((forecast_df - forecast_df.shift(1)).abs()
+                  / (forecast_df.shift(1).abs() + 1e-12))
+    update_mask = rel_change > threshold
+    new_positions = positions.copy()
+    new_positions.iloc[0] = positions.iloc[0] * forecast_df.iloc[0]
+    for col in positions.columns:
+        for t in range(1, len(positions)):
+            col_idx = positions.columns.get_loc(col)
+            if update_mask.iloc[t, col_idx]:
+                new_positions.iloc[t, col_idx] = (positions.iloc[t, col_idx]
+                                                  * forecast_df.iloc[t, col_idx])
+            else:
+                new_positions.iloc[t, col_idx] = new_positions.iloc[t - 1, col_idx]
+    return new_positions
+
+
+@pytest.mark.parametrize("threshold", [0.0, 0.05, 0.5])
+def test_forecast_hysteresis_matches_loop(panel, threshold):
+    from lib.indicators.buffering import forecast_hysteresis
+    strat = PortfolioRiskScaledStrategy(trend_mode="strength")
+    positions = strat.compute_vol_scaled_positions(panel, strat.target_vol)
+    forecast = strat._trend_strength_forecast(panel) / 10
+    # interior gaps on top of the late-starting columns
+    positions.iloc[100:104, 0] = np.nan
+    forecast.iloc[120:125, 2] = np.nan
+    got = forecast_hysteresis(positions, forecast, threshold)
+    want = reference_hysteresis(positions, forecast, threshold)
+    assert isinstance(got, pd.DataFrame)
+    np.testing.assert_array_equal(np.isnan(got.to_numpy()), np.isnan(want.to_numpy()))
+    np.testing.assert_allclose(got.to_numpy(), want.to_numpy(), rtol=0, atol=0)
+
+
+def test_forecast_hysteresis_threshold_crossing():
+    from lib.indicators.buffering import forecast_hysteresis
+    idx = pd.RangeIndex(6)
+    positions = pd.DataFrame({"a": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]}, index=idx)
+    # relative moves: +25% (not > 0.25), +60%, −25% (not >), NaN, from NaN
+    forecast = pd.DataFrame({"a": [1.0, 1.25, 2.0, 1.5, np.nan, 1.0]}, index=idx)
+    got = forecast_hysteresis(positions, forecast, threshold=0.25)
+    want = reference_hysteresis(positions, forecast, threshold=0.25)
+    np.testing.assert_array_equal(got["a"].to_numpy(), [1.0, 1.0, 6.0, 6.0, 6.0, 6.0])
+    np.testing.assert_array_equal(got.to_numpy(), want.to_numpy())
+
+
+def test_hold_unless_takes_row_zero_and_holds():
+    from lib.indicators.buffering import hold_unless
+    vals = np.array([5.0, 6.0, 7.0, 8.0])
+    got = hold_unless(vals, [False, True, False, False])
+    np.testing.assert_array_equal(got, [5.0, 6.0, 6.0, 6.0])
+    s = pd.Series(vals, name="x")
+    held = hold_unless(s, np.zeros(4, dtype=bool))
+    assert isinstance(held, pd.Series) and held.name == "x"
+    np.testing.assert_array_equal(held.to_numpy(), [5.0] * 4)
+
+
+def test_position_buffer_edges():
+    from lib.indicators.buffering import position_buffer
+    target = pd.DataFrame({
+        "in_band":  [1.0, 1.2, 0.9, 1.1],     # stays within ±0.5 of 1.0
+        "breakout": [1.0, 2.0, 2.2, 0.0],     # trades only to the nearest edge
+        "late":     [np.nan, np.nan, 3.0, 3.4],
+        "gap":      [1.0, np.nan, 4.0, 4.0],
+    })
+    got = position_buffer(target, 0.5)
+    np.testing.assert_allclose(got["in_band"], [1.0, 1.0, 1.0, 1.0])
+    np.testing.assert_allclose(got["breakout"], [1.0, 1.5, 1.7, 0.5])
+    # starts at the first target, then buffered
+    np.testing.assert_allclose(got["late"], [np.nan, np.nan, 3.0, 3.0])
+    # a missing target holds the position
+    np.testing.assert_allclose(got["gap"], [1.0, 1.0, 3.5, 3.5])
+
+
+def test_position_buffer_width_nan_or_zero_tracks_target():
+    from lib.indicators.buffering import position_buffer
+    target = np.array([[1.0], [2.0], [1.5], [3.0]])
+    np.testing.assert_array_equal(position_buffer(target, 0.0), target)
+    width = np.array([[np.nan], [np.nan], [1.0], [np.nan]])
+    np.testing.assert_array_equal(position_buffer(target, -width),
+                                  [[1.0], [2.0], [2.0], [3.0]])
+
+
+@pytest.mark.parametrize("cov_model", ["sample", "ledoit_wolf"])
+def test_float32_drift_within_tolerance(panel, cov_model):
+    signals = PortfolioRiskScaledStrategy(cov_model=cov_model).generate_signals(panel)
+    prices32 = as_compact(panel)
+    signals32 = PortfolioRiskScaledStrategy(
+        cov_model=cov_model, precision="float32").generate_signals(prices32)
+    assert (signals32.dtypes == np.float32).all()
+
+    results, metrics = backtest_multi_asset(panel, signals, 0.001)
+    results32, metrics32 = backtest_multi_asset(prices32, signals32, 0.001,
+                                                dtype=np.float32)
+    report = drift_report(
+        {"signals": signals, "portfolio_return": results["portfolio_return"],
+         "equity_curve": results["equity_curve"]},
+        {"signals": signals32, "portfolio_return": results32["portfolio_return"],
+         "equity_curve": results32["equity_curve"]})
+    assert report["ok"].all(), report
+    assert (report["max_rel"] < DRIFT_TOL).all()
+    assert report.loc["signals", "mb_compact"] == report.loc["signals", "mb_ref"] / 2
+    for key in ("total_return", "volatility", "sharpe", "max_drawdown"):
+        assert metrics32[key] == pytest.approx(metrics[key], rel=1e-3, abs=1e-6), key
+
+
+def test_drift_report_flags_nan_and_tolerance_breaches():
+    ref = np.array([1.0, 2.0, np.nan])
+    report = drift_report({"x": ref, "y": ref, "z": ref},
+                          {"x": ref + 1e-6, "y": ref + 1e-3,
+                           "z": np.array([1.0, np.nan, np.nan])})
+    assert report["ok"].tolist() == [True, False, False]
+    assert report.loc["z", "nan_diff"] == 1
@@ -0,0 +1,86 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+from importlib import metadata
+
+import pytest
+
+from lib import ENTRY_POINT_GROUP, STRATEGY_REGISTRY, StrategyRegistry, _BUILTIN
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+# Fresh interpreter: vendor SDKs and credentials are unavailable
+# (None in sys.modules makes any import of them fail).
+NO_VENDORS = textwrap.dedent("""
+    import json, sys
+    for name in ("nasdaqdatalink", "yfinance", "requests", "config.api"):
+        sys.modules[name] = None
+    import lib, lib.loaders
+    names = list(lib.STRATEGY_REGISTRY)
+    before = sorted(m for m in sys.modules if m.startswith("lib.strat"))
+    cls = lib.STRATEGY_REGISTRY["risk_scaled"]
+    after = sorted(m for m in sys.modules if m.startswith("lib.strat"))
+    try:
+        lib.loaders._yf()
+        vendor_blocked = False
+    except ImportError:
+        vendor_blocked = True
+    print(json.dumps({"names": names, "before": before, "after": after,
+                      "cls": cls.__name__, "vendor_blocked": vendor_blocked}))
+""")
+
+
+def test_import_needs_no_vendor_packages():
+    env = dict(os.environ, PYTHONPATH=SRC)
+    out = subprocess.run([sys.executable, "-c", NO_VENDORS], env=env, check=True,
+                         capture_output=True, text=True).stdout
+    got = json.loads(out.splitlines()[-1])
+    assert set(_BUILTIN) <= set(got["names"])
+    # listing names imports no strategy module; a lookup imports only its own
+    assert got["before"] == []
+    assert "lib.strat.risk_scaled_strategy" in got["after"]
+    assert "lib.strat.portfolio_risk_scaled_strategy" not in got["after"]
+    assert got["cls"] == "RiskScaledBuyAndHoldStrategy"
+    # the vendor SDK is only imported when that vendor is used
+    assert got["vendor_blocked"]
+
+
+@pytest.fixture
+def plugin(tmp_path, monkeypatch):
+    """An installed-looking entry point whose module is not imported yet."""
+    (tmp_path / "fake_trend_plugin.py").write_text(
+        "class FakeTrendStrategy:\n    pass\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    eps = [metadata.EntryPoint("fake_trend", "fake_trend_plugin:FakeTrendStrategy",
+                               ENTRY_POINT_GROUP),
+           metadata.EntryPoint("buy_and_hold", "fake_trend_plugin:FakeTrendStrategy",
+                               ENTRY_POINT_GROUP)]
+    monkeypatch.setattr(metadata, "entry_points",
+                        lambda group=None: eps if group == ENTRY_POINT_GROUP else [])
+    yield
+    sys.modules.pop("fake_trend_plugin", None)
+
+
+def test_entry_point_strategy_resolved_on_lookup(plugin):
+    registry = StrategyRegistry(_BUILTIN, group=ENTRY_POINT_GROUP)
+    assert "fake_trend" in registry
+    assert "fake_trend" in list(registry)
+    assert len(registry) == len(_BUILTIN) + 1
+    assert "fake_trend_plugin" not in sys.modules
+
+    cls = registry["fake_trend"]
+    assert cls.__name__ == "FakeTrendStrategy"
+    assert "fake_trend_plugin" in sys.modules
+    assert registry["fake_trend"] is cls
+    # built-ins win over a plugin of the same name
+    assert registry["buy_and_hold"].__name__ == "BuyAndHoldStrategy"
+
+
+def test_register_and_unknown_name():
+    registry = StrategyRegistry(_BUILTIN)
+    registry.register("alias", "lib.strat.buy_n_hold:BuyAndHoldStrategy")
+    assert registry["alias"] is STRATEGY_REGISTRY["buy_and_hold"]
+    with pytest.raises(KeyError):
+        registry["no_such_strategy"]
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from lib import STRATEGY_REGISTRY
+from lib.backtester.backtester import backtest_per_asset
+from lib.backtester.runner import detail_frame, run_per_symbol
+from lib.results_store import ResultsStore
+
+
+def wide_panel(panel: pd.DataFrame) -> pd.DataFrame:
+    """Eight symbols (two late starters, one interior hole): three chunks of ≤ 3."""
+    other = panel.iloc[:, ::-1] * 1.1
+    other.columns = [f"T{i}" for i in range(other.shape[1])]
+    wide = pd.concat([panel, other], axis=1)
+    wide.iloc[100:104, 2] = np.nan
+    return wide
+
+
+def test_parallel_runner_matches_serial_backtest(panel, tmp_path):
+    prices = wide_panel(panel)
+    path = str(tmp_path / "panel.parquet")
+    prices.to_parquet(path)
+    store = ResultsStore(str(tmp_path / "store"))
+
+    # parallel: workers stream their chunk's detail into the run's partitions
+    parallel = run_per_symbol(path, "risk_scaled", 0.001, workers=2, chunk_size=3,
+                              detail_dir=store.series_dir("parallel"))
+    store.append("risk_scaled", metrics=parallel, run_id="parallel")
+    assert len(list((tmp_path / "store" / "parallel" / "series").iterdir())) == 3
+
+    # serial: whole panel in one process, as scripts/test_strategy.py does
+    loaded = pd.read_parquet(path)
+    signals = STRATEGY_REGISTRY["risk_scaled"]().generate_signals(loaded)
+    res, serial = backtest_per_asset(loaded, signals, 0.001)
+    store.append("risk_scaled", metrics=serial, run_id="serial",
+                 series=detail_frame(loaded.index, loaded.columns, res))
+
+    pd.testing.assert_frame_equal(parallel, serial)
+    assert list(parallel.index) == list(prices.columns)
+    pd.testing.assert_frame_equal(store.read_series("parallel"),
+                                  store.read_series("serial"))
+    pd.testing.assert_frame_equal(store.read_metrics("parallel").droplevel("run_id"),
+                                  store.read_metrics("serial").droplevel("run_id"))
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+
+from lib.robustness import chunk_size
+from lib.shared_panel import attached_panel, panel_pool
+
+
+def _panel_sum(_):
+    return float(np.nansum(attached_panel().to_numpy()))
+
+
+def _panel_writeable(_):
+    return attached_panel().to_numpy().flags.writeable
+
+
+def test_workers_see_the_shared_panel_read_only(panel):
+    with panel_pool(panel, max_workers=2) as pool:
+        sums = list(pool.map(_panel_sum, range(4)))
+        writeable = list(pool.map(_panel_writeable, range(2)))
+    assert sums == [float(np.nansum(panel.to_numpy()))] * 4
+    assert not any(writeable)
+
+
+def test_chunk_size_accounts_for_per_worker_strategy_and_covariance():
+    T, N = 2_000, 500
+    # budget below one worker's fixed cost still runs one path at a time
+    assert chunk_size(T, N, 100, workers=4, max_bytes=2**20) == 1
+    small_n = chunk_size(T, 5, 10_000, workers=4, max_bytes=2**30)
+    big_n = chunk_size(T, N, 10_000, workers=4, max_bytes=2**30)
+    assert small_n > big_n >= 1
+    # never more than an even split of the paths
+    assert chunk_size(T, 5, 8, workers=4, max_bytes=2**30) == 2
@@ -0,0 +1,39 @@
+import json
+
+import pytest
+
+from lib.results_store import ResultsStore
+from lib.sweep import cell_key, run_sweep
+
+GRID = {"target_vol": [0.1, 0.2, 0.3], "trend_mode": ["none", "strength"]}
+
+
+def test_resumed_sweep_keeps_one_sweep_id(panel, tmp_path):
+    ckpt, root = str(tmp_path / "sweep.jsonl"), str(tmp_path / "store")
+    first = run_sweep(panel, "portfolio_risk_scaled", GRID, workers=2,
+                      checkpoint=ckpt, store=root)
+    sweep_id = first.attrs["sweep_id"]
+
+    # interrupt: only two cells made it to the checkpoint and the store
+    with open(ckpt) as fh:
+        lines = fh.readlines()
+    with open(ckpt, "w") as fh:
+        fh.writelines(lines[:2])
+    kept = {cell_key(json.loads(line)["params"]) for line in lines[:2]}
+    store = ResultsStore(root)
+    catalog = store.runs()
+    for run_id, params in zip(catalog["run_id"], catalog["params"]):
+        if cell_key(json.loads(params)) not in kept:
+            store.remove(run_id)
+    assert len(store.run_ids()) == 2
+
+    resumed = run_sweep(panel, "portfolio_risk_scaled", GRID, workers=2,
+                        checkpoint=ckpt, store=root)
+    assert resumed.attrs["sweep_id"] == sweep_id
+    runs = store.runs()
+    assert len(runs) == len(resumed) == 6
+    assert set(runs["sweep"]) == {sweep_id}
+    assert sorted(runs["run_id"]) == [f"{sweep_id}-{i:05d}" for i in range(6)]
+    with pytest.raises(ValueError, match="belongs to sweep"):
+        run_sweep(panel, "portfolio_risk_scaled", GRID, checkpoint=ckpt,
+                  store=root, sweep_id="other")
@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+from lib.walkforward import check_causal, run_walk_forward, walk_forward_windows
+
+
+def test_windows_are_consecutive_and_cover_the_tail():
+    wins = walk_forward_windows(100, train=40, test=25)
+    assert wins == [(0, 40, 40, 65), (25, 65, 65, 90), (50, 90, 90, 100)]
+    assert walk_forward_windows(100, 40, 25, anchored=True)[-1][0] == 0
+
+
+def test_full_sample_forecast_scalars_are_rejected(panel):
+    check_causal([{"forecast_speeds": [8, 32], "forecast_scalars": "expanding"},
+                  {"forecast_speeds": [8, 32], "forecast_scalars": [5.0, 2.5]}])
+    grid = {"forecast_speeds": [(8, 32)], "forecast_scalars": [None, "full"]}
+    with pytest.raises(ValueError, match="look-ahead"):
+        run_walk_forward(panel, "portfolio_risk_scaled", grid, train=80, test=40)
+
+
+def test_oos_returns_come_from_the_selected_variant(panel):
+    grid = {"target_vol": [0.1, 0.3]}
+    results_df, selections, _ = run_walk_forward(
+        panel, "portfolio_risk_scaled", grid, train=80, test=40)
+    assert len(selections) == 2
+    assert results_df.index[0] == panel.index[80]
+    assert np.isfinite(results_df["equity_curve"].iloc[-1])